@@ -0,0 +1,763 @@
+# benchmarks/run_benchmarks.py
+
+"""
+Benchmark suite for the spectralops kernels.
+
+Times every numba kernel and `apply_*_over_cube` wrapper over synthetic
+spectral cubes, sweeping cube shapes, band counts, dtypes and numba thread
+counts. Throughput is reported in pixels per second along with the peak
+memory allocated during a single call. Results can be saved as a baseline and
+later runs compared against it.
+
+`--check` runs consistency checks instead: kernels that share work between
+several outputs (sweeps, chunked runs) must match the same outputs computed
+one at a time.
+
+Usage
+-----
+    python benchmarks/run_benchmarks.py --quick
+    python benchmarks/run_benchmarks.py --check
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --baseline benchmarks/baseline.json
+
+Single-spectrum kernels (e.g. `moving_average_nb`) are timed over a sample of
+at most `--max-spectra` pixels from the cube, so their throughput is directly
+comparable to the cube wrappers.
+"""
+
+# Standard Libraries
+import argparse
+import json
+import platform
+import sys
+import tracemalloc
+from dataclasses import dataclass, asdict, field
+from pathlib import Path
+from time import perf_counter
+from typing import Callable, Optional
+
+# External Imports
+import numpy as np
+import numba
+
+# Local Imports
+import spectralops as spop
+from spectralops.smoothing import outlier_removal_nb, moving_average_nb
+from spectralops.smoothing import hampel_nb
+from spectralops.continuum_removal import double_line_nb
+from spectralops.band_parameters import (
+    calculate_area,
+    calculate_center,
+    calculate_depth,
+    fit_absorption
+)
+from spectralops.cube_ops import (
+    apply_over_cube,
+    apply_remove_outliers_over_cube,
+    apply_hampel_over_cube,
+    apply_smoothing_over_cube,
+    apply_continuum_removal_over_cube,
+    apply_polyfit_over_cube,
+    apply_calculate_area_over_cube,
+    apply_band_parameters_over_cube,
+    apply_weighted_band_parameters_over_cube,
+    apply_savitzky_golay_over_cube,
+    apply_finite_difference_over_cube,
+    apply_savgol_derivative_over_cube,
+    apply_count_bands_over_cube,
+    apply_detect_bands_over_cube,
+    apply_count_extrema_over_cube,
+    apply_find_extrema_over_cube,
+    apply_feature_sweep_over_cube,
+    apply_parameter_sweep_over_cube,
+    apply_monte_carlo_over_cube,
+    apply_bin_bands_over_cube
+)
+from spectralops.smoothing import (
+    savgol_coefficients,
+    apply_fft_smoothing_over_cube
+)
+from spectralops.band_parameters import AbsorptionWindow
+from spectralops.band_parameters.feature_sweep import pack_windows
+from spectralops.band_math import BandMath, apply_band_math_over_cube
+from spectralops.derivatives import (
+    derivative_coefficients,
+    wavelength_derivatives
+)
+from spectralops.binning import band_groups
+from spectralops.progress import run_in_chunks
+from spectralops.ragged import offsets_from_counts
+from spectralops.utils import find_wvl
+
+
+DEFAULT_BASELINE = Path(__file__).parent / "baseline.json"
+WVL_RANGE = (500.0, 2600.0)
+FEATURE_RANGE = (750.0, 1250.0)
+BAND_MATH_EXPRESSIONS = (
+    "R(950) / R(750)",
+    "1 - C(1000)",
+    "IBD(790, 1310)",
+    "(R(2200) - R(2100)) / (R(2200) + R(2100))"
+)
+FIT_ORDER = 4
+SAVGOL_WINDOW = 15
+SWEEP_FIT_ORDERS = (2, 4)
+SWEEP_THRESHOLDS = np.array([2.0, 3.0])
+SWEEP_WINDOW_SIZES = np.array([5, 9], dtype=np.int64)
+MONTE_CARLO_DRAWS = 16
+CHECK_SHAPE = (12, 9)
+CHECK_BANDS = 120
+# Features of the mixed fit order check, highest order first so that lower
+# order fits share a coefficient buffer sized for it.
+CHECK_FEATURES = ((750.0, 1300.0, 4), (1600.0, 2500.0, 2))
+CHECK_CHUNK_ROWS = 5
+
+
+@dataclass
+class BenchmarkCase:
+    """
+    One kernel timed over one synthetic cube configuration.
+
+    Attributes
+    ----------
+    kernel: str
+        Name of the timed kernel.
+    shape: tuple[int, int]
+        Spatial shape of the synthetic cube.
+    nbands: int
+        Number of spectral bands.
+    dtype: str
+        Data type of the synthetic cube.
+    threads: int
+        Number of numba threads used.
+    """
+    kernel: str
+    shape: tuple[int, int]
+    nbands: int
+    dtype: str
+    threads: int
+
+    @property
+    def key(self) -> str:
+        return (
+            f"{self.kernel}|{self.shape[0]}x{self.shape[1]}|{self.nbands}|"
+            f"{self.dtype}|{self.threads}"
+        )
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    Timing and memory result of a single `BenchmarkCase`.
+    """
+    case: BenchmarkCase
+    pixels: int = 0
+    best_time: float = np.nan
+    median_time: float = np.nan
+    compile_time: float = np.nan
+    pixels_per_second: float = np.nan
+    peak_memory_bytes: int = 0
+    error: Optional[str] = None
+    baseline_ratio: Optional[float] = field(default=None)
+
+    def to_dict(self) -> dict:
+        result = asdict(self)
+        result["key"] = self.case.key
+        return result
+
+
+def make_synthetic_cube(
+    shape: tuple[int, int],
+    nbands: int,
+    dtype: str,
+    seed: int = 0
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds a seeded synthetic lunar cube and its wavelengths.
+    """
+    wvl = np.linspace(*WVL_RANGE, nbands)
+    cube = spop.utils.create_synthetic_spectral_cube(
+        wvl, shape, seed=seed, dtype=dtype
+    )
+    return cube, wvl
+
+
+def _sample_spectra(cube: np.ndarray, max_spectra: int) -> np.ndarray:
+    flat = cube.reshape(-1, cube.shape[2])
+    return flat[:max_spectra]
+
+
+def build_kernels(
+    cube: np.ndarray,
+    wvl: np.ndarray,
+    max_spectra: int
+) -> dict[str, tuple[Callable[[], object], int]]:
+    """
+    Builds the registry of timed kernels for a given cube.
+
+    Returns
+    -------
+    kernels: dict
+        Maps kernel name to a zero-argument callable and the number of
+        pixels processed by one call.
+    """
+    npix = cube.shape[0] * cube.shape[1]
+    spectra = _sample_spectra(cube, max_spectra)
+    nspec = spectra.shape[0]
+    spec_res = float((wvl.max() - wvl.min()) / wvl.size)
+
+    lo_idx, _ = find_wvl(wvl, FEATURE_RANGE[0])
+    hi_idx, _ = find_wvl(wvl, FEATURE_RANGE[1])
+    window_wvl = wvl[lo_idx:hi_idx]
+    window_cube = np.ascontiguousarray(cube[:, :, lo_idx:hi_idx])
+    X = np.vander(window_wvl, FIT_ORDER + 1)
+    Xt = np.ascontiguousarray(X.T)
+    XtX = Xt @ X
+    savgol = savgol_coefficients(SAVGOL_WINDOW, 2)
+    window = AbsorptionWindow.from_range(
+        wvl, FEATURE_RANGE, FIT_ORDER, spec_res
+    )
+    sigma = np.abs(cube - np.median(cube, axis=2, keepdims=True)) + 1e-3
+    continuum = np.ones_like(cube)
+    normalized = cube / np.nanmax(cube)
+    indices = BandMath(BAND_MATH_EXPRESSIONS, wvl)
+    derivative_coeffs = derivative_coefficients(SAVGOL_WINDOW, 2)
+    wvl_derivs = wavelength_derivatives(wvl, derivative_coeffs)
+    bin_bands, bin_offsets = band_groups(wvl, 4)
+    sweep_windows = [
+        AbsorptionWindow.from_range(wvl, FEATURE_RANGE, order, spec_res)
+        for order in SWEEP_FIT_ORDERS
+    ]
+    packed_windows = pack_windows(sweep_windows)
+    pixel_ids = np.arange(npix).reshape(cube.shape[:2])
+
+    # The fit is shared by the center and depth benchmarks. It is built on
+    # the first (untimed) call so unsupported dtypes are reported per kernel.
+    fit_cache: dict[str, tuple[np.ndarray, ...]] = {}
+    # Inputs of the second pass of the CSR kernels, built the same way.
+    csr_cache: dict[str, tuple[np.ndarray, ...]] = {}
+
+    def fitted_window() -> tuple[np.ndarray, ...]:
+        if "fit" not in fit_cache:
+            fit_cache["fit"] = fit_absorption(
+                cube, wvl, FEATURE_RANGE, FIT_ORDER
+            )
+        return fit_cache["fit"]
+
+    def band_offsets() -> np.ndarray:
+        if "bands" not in csr_cache:
+            counts = apply_count_bands_over_cube(normalized, 0.02, 0.01)
+            csr_cache["bands"] = (offsets_from_counts(counts),)
+        return csr_cache["bands"][0]
+
+    def derivative_cubes() -> tuple[np.ndarray, ...]:
+        if "derivatives" not in csr_cache:
+            derivs = apply_finite_difference_over_cube(cube, wvl)
+            first = np.ascontiguousarray(derivs[:, :, :, 0])
+            second = np.ascontiguousarray(derivs[:, :, :, 1])
+            counts = apply_count_extrema_over_cube(first, second)
+            csr_cache["derivatives"] = (
+                first, second,
+                offsets_from_counts(counts[0]),
+                offsets_from_counts(counts[1])
+            )
+        return csr_cache["derivatives"]
+
+    def detect_bands():
+        offsets = band_offsets()
+        return apply_detect_bands_over_cube(
+            normalized, wvl, 0.02, 0.01, offsets
+        )
+
+    def count_extrema():
+        first, second, *_ = derivative_cubes()
+        return apply_count_extrema_over_cube(first, second)
+
+    def find_extrema():
+        return apply_find_extrema_over_cube(*derivative_cubes())
+
+    def parameter_sweep():
+        lo, hi, ncoef, _, matrix_offsets, *_ = packed_windows
+        return apply_parameter_sweep_over_cube(
+            cube, wvl, SWEEP_THRESHOLDS, SWEEP_WINDOW_SIZES, int(lo[0]),
+            int(hi[0]), ncoef, matrix_offsets, sweep_windows[0].wvl,
+            sweep_windows[0].spec_res,
+            np.concatenate([w.design.ravel() for w in sweep_windows]),
+            np.concatenate([w.projection.ravel() for w in sweep_windows])
+        )
+
+    def per_spectrum(func, *args):
+        def run():
+            for n in range(nspec):
+                func(spectra[n], *args)
+        return run
+
+    def cube_center():
+        fitted, absorption_cube, absorption_wvl = fitted_window()
+        return calculate_center(
+            wvl=wvl,
+            fitted_absorption=fitted,
+            absorption_spec=absorption_cube,
+            absorption_wvl=absorption_wvl
+        )
+
+    def cube_depth():
+        fitted, absorption_cube, absorption_wvl = fitted_window()
+        return calculate_depth(
+            wvl=wvl,
+            fitted_absorption=fitted,
+            absorption_spec=absorption_cube,
+            absorption_wvl=absorption_wvl
+        )
+
+    return {
+        "outlier_removal_nb": (per_spectrum(outlier_removal_nb), nspec),
+        "hampel_nb": (per_spectrum(hampel_nb), nspec),
+        "moving_average_nb": (per_spectrum(moving_average_nb), nspec),
+        "double_line_nb": (per_spectrum(double_line_nb, wvl), nspec),
+        "calculate_area": (
+            per_spectrum(calculate_area, wvl, *FEATURE_RANGE, spec_res),
+            nspec
+        ),
+        "polyfit": (
+            lambda: spop.polyfit(window_wvl, window_cube, FIT_ORDER), npix
+        ),
+        "calculate_center": (cube_center, npix),
+        "calculate_depth": (cube_depth, npix),
+        "apply_over_cube": (
+            lambda: apply_over_cube(
+                cube, moving_average_nb, cube.shape[2], 5
+            ),
+            npix
+        ),
+        "apply_remove_outliers_over_cube": (
+            lambda: apply_remove_outliers_over_cube(cube), npix
+        ),
+        "apply_hampel_over_cube": (
+            lambda: apply_hampel_over_cube(cube), npix
+        ),
+        "apply_smoothing_over_cube": (
+            lambda: apply_smoothing_over_cube(cube), npix
+        ),
+        "apply_savitzky_golay_over_cube": (
+            lambda: apply_savitzky_golay_over_cube(cube, savgol), npix
+        ),
+        "apply_fft_smoothing_over_cube": (
+            lambda: apply_fft_smoothing_over_cube(
+                cube, np.ascontiguousarray(savgol[SAVGOL_WINDOW // 2])
+            ),
+            npix
+        ),
+        "apply_finite_difference_over_cube": (
+            lambda: apply_finite_difference_over_cube(cube, wvl), npix
+        ),
+        "apply_savgol_derivative_over_cube": (
+            lambda: apply_savgol_derivative_over_cube(
+                cube, derivative_coeffs, wvl_derivs
+            ),
+            npix
+        ),
+        "apply_count_bands_over_cube": (
+            lambda: apply_count_bands_over_cube(normalized, 0.02, 0.01),
+            npix
+        ),
+        "apply_band_math_over_cube": (
+            lambda: apply_band_math_over_cube(
+                cube, normalized, indices.program, indices.program_offsets,
+                indices.constants, indices.stack_size
+            ),
+            npix
+        ),
+        "apply_detect_bands_over_cube": (detect_bands, npix),
+        "apply_count_extrema_over_cube": (count_extrema, npix),
+        "apply_find_extrema_over_cube": (find_extrema, npix),
+        "apply_bin_bands_over_cube": (
+            lambda: apply_bin_bands_over_cube(cube, bin_bands, bin_offsets),
+            npix
+        ),
+        "apply_continuum_removal_over_cube": (
+            lambda: apply_continuum_removal_over_cube(cube, wvl), npix
+        ),
+        "apply_polyfit_over_cube": (
+            lambda: apply_polyfit_over_cube(window_cube, X, Xt, XtX), npix
+        ),
+        "apply_calculate_area_over_cube": (
+            lambda: apply_calculate_area_over_cube(
+                cube, wvl, spec_res, *FEATURE_RANGE
+            ),
+            npix
+        ),
+        "apply_band_parameters_over_cube": (
+            lambda: apply_band_parameters_over_cube(
+                cube, window.lo_idx, window.hi_idx, window.wvl,
+                window.spec_res, window.design, window.projection
+            ),
+            npix
+        ),
+        "apply_weighted_band_parameters_over_cube": (
+            lambda: apply_weighted_band_parameters_over_cube(
+                cube, sigma, continuum, window.lo_idx,
+                window.hi_idx, window.wvl, window.spec_res, window.design,
+                window.projection
+            ),
+            npix
+        ),
+        "apply_feature_sweep_over_cube": (
+            lambda: apply_feature_sweep_over_cube(cube, *packed_windows),
+            npix
+        ),
+        "apply_parameter_sweep_over_cube": (parameter_sweep, npix),
+        "apply_monte_carlo_over_cube": (
+            lambda: apply_monte_carlo_over_cube(
+                cube, sigma, pixel_ids, wvl, 0, MONTE_CARLO_DRAWS,
+                window.lo_idx, window.hi_idx, window.wvl, window.spec_res,
+                window.design, window.projection
+            ),
+            npix
+        )
+    }
+
+
+def _assert_same(name: str, result: np.ndarray, expected: np.ndarray):
+    if not np.allclose(result, expected, equal_nan=True):
+        diff = np.nanmax(np.abs(result - expected))
+        raise AssertionError(f"{name} differs by up to {diff:.4g}.")
+
+
+def check_mixed_order_feature_sweep(cube: np.ndarray, wvl: np.ndarray):
+    """
+    Every feature of a sweep mixing fit orders matches the feature fit
+    alone.
+    """
+    spec_res = float((wvl.max() - wvl.min()) / wvl.size)
+    windows = [
+        AbsorptionWindow.from_range(wvl, (lo, hi), order, spec_res)
+        for lo, hi, order in CHECK_FEATURES
+    ]
+    swept = apply_feature_sweep_over_cube(cube, *pack_windows(windows))
+    for f, window in enumerate(windows):
+        alone = apply_band_parameters_over_cube(
+            cube, window.lo_idx, window.hi_idx, window.wvl,
+            window.spec_res, window.design, window.projection
+        )
+        _assert_same(f"Feature {f}", swept[f], alone)
+
+
+def check_mixed_order_parameter_sweep(cube: np.ndarray, wvl: np.ndarray):
+    """
+    Every fit order of a parameter sweep matches the order swept alone.
+    """
+    spec_res = float((wvl.max() - wvl.min()) / wvl.size)
+    orders = sorted({order for *_, order in CHECK_FEATURES}, reverse=True)
+
+    def sweep(fit_orders):
+        windows = [
+            AbsorptionWindow.from_range(wvl, FEATURE_RANGE, order, spec_res)
+            for order in fit_orders
+        ]
+        lo, hi, ncoef, _, matrix_offsets, *_ = pack_windows(windows)
+        return apply_parameter_sweep_over_cube(
+            cube, wvl, SWEEP_THRESHOLDS, SWEEP_WINDOW_SIZES, int(lo[0]),
+            int(hi[0]), ncoef, matrix_offsets, windows[0].wvl,
+            windows[0].spec_res,
+            np.concatenate([w.design.ravel() for w in windows]),
+            np.concatenate([w.projection.ravel() for w in windows])
+        )
+
+    swept = sweep(orders)
+    for o, order in enumerate(orders):
+        _assert_same(
+            f"Fit order {order}", swept[:, :, o], sweep([order])[:, :, 0]
+        )
+
+
+def check_chunked_pixel_args(cube: np.ndarray, wvl: np.ndarray):
+    """
+    Kernels reading per-pixel arrays give the same result in several
+    chunks as in one call, with and without a row offset.
+    """
+    derivs = apply_finite_difference_over_cube(cube, wvl)
+    first = np.ascontiguousarray(derivs[:, :, :, 0])
+    second = np.ascontiguousarray(derivs[:, :, :, 1])
+    _assert_same(
+        "Extremum counts",
+        run_in_chunks(
+            apply_count_extrema_over_cube, first, second,
+            chunk_rows=CHECK_CHUNK_ROWS, row_axis=1, pixel_args=1
+        ),
+        apply_count_extrema_over_cube(first, second)
+    )
+
+    spec_res = float((wvl.max() - wvl.min()) / wvl.size)
+    window = AbsorptionWindow.from_range(
+        wvl, FEATURE_RANGE, FIT_ORDER, spec_res
+    )
+    sigma = np.abs(cube - np.median(cube, axis=2, keepdims=True)) + 1e-3
+    continuum = np.ones_like(cube)
+    args = (
+        window.lo_idx, window.hi_idx, window.wvl, window.spec_res,
+        window.design, window.projection
+    )
+    _assert_same(
+        "Weighted band parameters",
+        run_in_chunks(
+            apply_weighted_band_parameters_over_cube, cube, sigma,
+            continuum, *args, chunk_rows=CHECK_CHUNK_ROWS, row_axis=1,
+            row_offset=True, pixel_args=2
+        ),
+        apply_weighted_band_parameters_over_cube(
+            cube, sigma, continuum, *args
+        )
+    )
+
+
+CHECKS = {
+    "mixed_order_feature_sweep": check_mixed_order_feature_sweep,
+    "mixed_order_parameter_sweep": check_mixed_order_parameter_sweep,
+    "chunked_pixel_args": check_chunked_pixel_args
+}
+
+
+def run_checks() -> int:
+    """
+    Runs every consistency check and returns the number of failures.
+    """
+    cube, wvl = make_synthetic_cube(CHECK_SHAPE, CHECK_BANDS, "float64")
+    cube = cube / np.nanmax(cube)
+    failures = 0
+    for name, check in CHECKS.items():
+        try:
+            check(cube, wvl)
+        except AssertionError as err:
+            print(f"{name:<72} FAIL {err}")
+            failures += 1
+        else:
+            print(f"{name:<72} ok")
+    return failures
+
+
+def time_kernel(
+    case: BenchmarkCase,
+    func: Callable[[], object],
+    pixels: int,
+    repeat: int
+) -> BenchmarkResult:
+    """
+    Times a kernel. The first call is reported as the compile time and is not
+    included in the timing statistics. Peak memory is measured on a separate
+    call so that tracing does not affect the timings.
+    """
+    result = BenchmarkResult(case=case, pixels=pixels)
+    try:
+        start = perf_counter()
+        func()
+        result.compile_time = perf_counter() - start
+
+        times = []
+        for _ in range(repeat):
+            start = perf_counter()
+            func()
+            times.append(perf_counter() - start)
+
+        tracemalloc.start()
+        try:
+            func()
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    except Exception as err:  # Unsupported configurations are reported.
+        result.error = f"{type(err).__name__}: {str(err).splitlines()[0]}"
+        return result
+
+    result.best_time = float(np.min(times))
+    result.median_time = float(np.median(times))
+    result.pixels_per_second = pixels / result.best_time
+    result.peak_memory_bytes = int(peak)
+    return result
+
+
+def run_suite(
+    shapes: list[tuple[int, int]],
+    band_counts: list[int],
+    dtypes: list[str],
+    thread_counts: list[int],
+    kernel_names: Optional[list[str]] = None,
+    repeat: int = 3,
+    max_spectra: int = 256
+) -> list[BenchmarkResult]:
+    """
+    Runs every kernel over every combination of the sweep parameters.
+    """
+    results = []
+    max_threads = numba.config.NUMBA_NUM_THREADS
+    for threads in thread_counts:
+        if threads > max_threads:
+            print(
+                f"Skipping {threads} threads (NUMBA_NUM_THREADS="
+                f"{max_threads})."
+            )
+            continue
+        numba.set_num_threads(threads)
+        for shape in shapes:
+            for nbands in band_counts:
+                for dtype in dtypes:
+                    cube, wvl = make_synthetic_cube(shape, nbands, dtype)
+                    kernels = build_kernels(cube, wvl, max_spectra)
+                    for name, (func, pixels) in kernels.items():
+                        if kernel_names and name not in kernel_names:
+                            continue
+                        case = BenchmarkCase(
+                            name, shape, nbands, dtype, threads
+                        )
+                        result = time_kernel(case, func, pixels, repeat)
+                        print_result(result)
+                        results.append(result)
+    return results
+
+
+def compare_to_baseline(
+    results: list[BenchmarkResult],
+    baseline: dict,
+    tolerance: float
+) -> list[BenchmarkResult]:
+    """
+    Annotates results with their throughput ratio to the baseline and returns
+    those that regressed by more than `tolerance`.
+    """
+    reference = {
+        entry["key"]: entry for entry in baseline.get("results", [])
+    }
+    regressions = []
+    for result in results:
+        entry = reference.get(result.case.key)
+        if entry is None or result.error is not None:
+            continue
+        base_rate = entry.get("pixels_per_second")
+        if not base_rate or not np.isfinite(base_rate):
+            continue
+        result.baseline_ratio = result.pixels_per_second / base_rate
+        if result.baseline_ratio < 1 - tolerance:
+            regressions.append(result)
+    return regressions
+
+
+def print_result(result: BenchmarkResult) -> None:
+    label = result.case.key
+    if result.error is not None:
+        print(f"{label:<72} ERROR {result.error}")
+    else:
+        print(
+            f"{label:<72} {result.pixels_per_second:>12.4g} px/s "
+            f"{result.peak_memory_bytes / 2**20:>9.2f} MiB"
+        )
+
+
+def print_comparison(results: list[BenchmarkResult]) -> None:
+    print("\nComparison to baseline (throughput ratio, >1 is faster):")
+    for result in results:
+        if result.baseline_ratio is None:
+            continue
+        print(f"{result.case.key:<72} {result.baseline_ratio:>7.2f}x")
+
+
+def _parse_shape(text: str) -> tuple[int, int]:
+    rows, cols = text.lower().split("x")
+    return int(rows), int(cols)
+
+
+def _parse_list(text: str, cast: Callable = str) -> list:
+    return [cast(i) for i in text.split(",") if i]
+
+
+def main(argv: Optional[list[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[1])
+    parser.add_argument("--shapes", default="32x32,128x128")
+    parser.add_argument("--bands", default="86,256")
+    parser.add_argument("--dtypes", default="float64,float32")
+    parser.add_argument(
+        "--threads", default=",".join(
+            str(i) for i in sorted({1, numba.config.NUMBA_NUM_THREADS})
+        )
+    )
+    parser.add_argument("--kernels", default="")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--max-spectra", type=int, default=256)
+    parser.add_argument(
+        "--quick", action="store_true",
+        help="Small sweep (one shape, band count, dtype and thread count)."
+    )
+    parser.add_argument("--baseline", type=Path, default=DEFAULT_BASELINE)
+    parser.add_argument(
+        "--save-baseline", action="store_true",
+        help="Write results to the baseline file instead of comparing."
+    )
+    parser.add_argument("--output", type=Path, default=None)
+    parser.add_argument("--tolerance", type=float, default=0.1)
+    parser.add_argument(
+        "--fail-on-regression", action="store_true",
+        help="Exit with status 1 if any kernel regressed past tolerance."
+    )
+    parser.add_argument(
+        "--check", action="store_true",
+        help="Run the consistency checks instead of the benchmarks."
+    )
+    args = parser.parse_args(argv)
+
+    if args.check:
+        return 1 if run_checks() else 0
+
+    if args.quick:
+        args.shapes, args.bands, args.dtypes = "32x32", "86", "float64"
+        args.threads = str(numba.config.NUMBA_NUM_THREADS)
+
+    results = run_suite(
+        shapes=_parse_list(args.shapes, _parse_shape),
+        band_counts=_parse_list(args.bands, int),
+        dtypes=_parse_list(args.dtypes),
+        thread_counts=_parse_list(args.threads, int),
+        kernel_names=_parse_list(args.kernels),
+        repeat=args.repeat,
+        max_spectra=args.max_spectra
+    )
+
+    report = {
+        "spectralops_version": getattr(spop, "__version__", "unknown"),
+        "numba_version": numba.__version__,
+        "numpy_version": np.__version__,
+        "python_version": platform.python_version(),
+        "machine": platform.machine(),
+        "processor": platform.processor(),
+        "numba_num_threads": numba.config.NUMBA_NUM_THREADS,
+        "results": [r.to_dict() for r in results]
+    }
+
+    exit_code = 0
+    if args.save_baseline:
+        args.baseline.write_text(json.dumps(report, indent=2))
+        print(f"\nBaseline written to {args.baseline}")
+    elif args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text())
+        regressions = compare_to_baseline(
+            results, baseline, args.tolerance
+        )
+        report["results"] = [r.to_dict() for r in results]
+        print_comparison(results)
+        if regressions:
+            print(f"\n{len(regressions)} kernel(s) regressed by more than "
+                  f"{args.tolerance:.0%}:")
+            for result in regressions:
+                print(f"  {result.case.key}")
+            if args.fail_on_regression:
+                exit_code = 1
+    else:
+        print(f"\nNo baseline found at {args.baseline}. Run with "
+              "--save-baseline to create one.")
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(report, indent=2))
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,10 +7,23 @@ Python.
 ### Available Modules:
 - smoothing
 - continuum_removal
+- profiling
+- progress
+- tiling
+- envi
+- layout
+- roi
+- execution
+- derivatives
+- ragged
+- band_math
+- masking
+- binning
 
 ### Base Classes:
 - Spectrum
 - SpectralCube
+- SpectrumCollection
 """
 
 from . import smoothing
@@ -19,14 +32,29 @@ from . import band_parameters
 from .band_parameters import AbsorptionFeature, AbsorptionFeatureCube
 from .spectral_classes import Spectrum
 from .spectral_classes import SpectralCube
+from .spectral_classes import SpectrumCollection
 from . import utils
 from . import cube_ops
+from . import profiling
+from . import progress
+from . import tiling
+from . import envi
+from . import layout
+from . import roi
+from . import execution
+from . import derivatives
+from . import ragged
+from . import band_math
+from . import masking
+from . import binning
+from .execution import execution_config
 from .polyfit import polyfit
 
 
 __all__ = [
     "Spectrum",
     "SpectralCube",
+    "SpectrumCollection",
     "AbsorptionFeature",
     "AbsorptionFeatureCube",
     "smoothing",
@@ -34,5 +62,18 @@ __all__ = [
     "band_parameters",
     "utils",
     "cube_ops",
+    "profiling",
+    "progress",
+    "tiling",
+    "envi",
+    "layout",
+    "roi",
+    "execution",
+    "derivatives",
+    "ragged",
+    "band_math",
+    "masking",
+    "binning",
+    "execution_config",
     "polyfit"
 ]
@@ -0,0 +1,492 @@
+# band_math.py
+
+"""
+Compiled band math for spectral indices.
+
+Indices are written as arithmetic expressions over wavelengths:
+
+- `R(950)`: value of the band closest to 950 in the reflectance cube.
+- `C(1000)`: value of the band closest to 1000 in the continuum-removed
+  cube.
+- `R(900, 1000)`, `C(900, 1000)`: mean over the bands closest to 900
+  through 1000.
+- `IBD(750, 1250)`: integrated band depth, the sum of `1 - C` over the
+  bands closest to 750 through 1250.
+- `+ - * / **`, numbers, parentheses and the functions `sqrt`, `log`,
+  `exp`, `abs`, `min` and `max`.
+
+Each expression is parsed once, its wavelengths are resolved to band
+indices with `find_wvl` and it is compiled into a small postfix program.
+All programs are then evaluated together by one parallel kernel that reads
+every pixel once and keeps intermediate values on a per-pixel stack, so no
+temporary cubes are created however many indices are computed.
+
+Examples
+--------
+>>> indices = BandMath({
+...     "bd1000": "1 - C(1000)",
+...     "ratio": "R(950) / R(750)",
+...     "ibd1000": "IBD(790, 1310)"
+... }, wvl)
+>>> maps = indices.evaluate(cube.smoothed, cube.contrem)
+>>> maps["ratio"]
+"""
+
+# Standard Libraries
+import ast
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional, Sequence, Union
+
+# External Imports
+import numpy as np
+from numba import njit, prange
+
+# Local Imports
+from spectralops.profiling import profile_step
+from spectralops.progress import run_in_chunks
+from spectralops.progress import CancellationToken, ProgressInfo
+from spectralops.masking import region_mask
+from spectralops.roi import RegionLike, as_roi, gather, scatter
+from spectralops.utils import find_wvl
+
+
+# Opcodes. Every instruction is `(opcode, a, b)`.
+OP_CONST = 0        # push constants[a]
+OP_R = 1            # push reflectance[a]
+OP_C = 2            # push contrem[a]
+OP_R_MEAN = 3       # push mean of reflectance[a:b + 1]
+OP_C_MEAN = 4       # push mean of contrem[a:b + 1]
+OP_IBD = 5          # push sum of 1 - contrem[a:b + 1]
+OP_ADD = 6
+OP_SUB = 7
+OP_MUL = 8
+OP_DIV = 9
+OP_POW = 10
+OP_MIN = 11
+OP_MAX = 12
+OP_NEG = 13
+OP_SQRT = 14
+OP_LOG = 15
+OP_EXP = 16
+OP_ABS = 17
+
+_BINARY_OPS = {
+    ast.Add: OP_ADD,
+    ast.Sub: OP_SUB,
+    ast.Mult: OP_MUL,
+    ast.Div: OP_DIV,
+    ast.Pow: OP_POW
+}
+_FUNCTIONS = {
+    "sqrt": OP_SQRT,
+    "log": OP_LOG,
+    "exp": OP_EXP,
+    "abs": OP_ABS,
+    "min": OP_MIN,
+    "max": OP_MAX
+}
+_BAND_FUNCTIONS = ("R", "C", "IBD")
+
+
+@dataclass(frozen=True)
+class BandExpression:
+    """
+    A compiled band math expression.
+
+    Attributes
+    ----------
+    source: str
+        Expression as written.
+    program: np.ndarray
+        `(ninstructions, 3)` postfix program of `(opcode, a, b)`.
+    constants: np.ndarray
+        Numbers referenced by `OP_CONST` instructions.
+    stack_size: int
+        Largest number of values on the stack during evaluation.
+    uses_contrem: bool
+        True if the expression reads the continuum-removed cube.
+    """
+    source: str
+    program: np.ndarray
+    constants: np.ndarray
+    stack_size: int
+    uses_contrem: bool
+
+
+class _Compiler():
+    def __init__(self, source: str, wvl: np.ndarray) -> None:
+        self.source = source
+        self.wvl = np.asarray(wvl, dtype=np.float64)
+        self.program: list = []
+        self.constants: list = []
+        self.depth = 0
+        self.stack_size = 0
+
+    def error(self, message: str) -> ValueError:
+        return ValueError(f"Invalid band math {self.source!r}: {message}")
+
+    def emit(self, opcode: int, a: int = 0, b: int = 0, pushes: int = 0):
+        self.program.append((opcode, a, b))
+        self.depth += pushes
+        self.stack_size = max(self.stack_size, self.depth)
+
+    def band(self, node: ast.AST) -> int:
+        if not (
+            isinstance(node, ast.Constant)
+            and isinstance(node.value, (int, float))
+            and not isinstance(node.value, bool)
+        ):
+            raise self.error("wavelengths must be numbers.")
+        idx, _ = find_wvl(self.wvl, float(node.value))
+        return int(idx)
+
+    def visit(self, node: ast.AST) -> None:
+        if isinstance(node, ast.Expression):
+            self.visit(node.body)
+        elif isinstance(node, ast.Constant):
+            if not isinstance(node.value, (int, float)) or isinstance(
+                node.value, bool
+            ):
+                raise self.error(f"unsupported constant {node.value!r}.")
+            self.constants.append(float(node.value))
+            self.emit(OP_CONST, len(self.constants) - 1, pushes=1)
+        elif isinstance(node, ast.BinOp) and type(node.op) in _BINARY_OPS:
+            self.visit(node.left)
+            self.visit(node.right)
+            self.emit(_BINARY_OPS[type(node.op)], pushes=-1)
+        elif isinstance(node, ast.UnaryOp) and isinstance(
+            node.op, (ast.USub, ast.UAdd)
+        ):
+            self.visit(node.operand)
+            if isinstance(node.op, ast.USub):
+                self.emit(OP_NEG)
+        elif isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
+            self.call(node.func.id, node.args, node.keywords)
+        else:
+            raise self.error(
+                f"unsupported syntax {ast.dump(node, annotate_fields=False)}."
+            )
+
+    def call(self, name: str, args: list, keywords: list) -> None:
+        if keywords:
+            raise self.error(f"{name}() takes no keyword arguments.")
+
+        if name in _BAND_FUNCTIONS:
+            nargs = (1, 2) if name != "IBD" else (2,)
+            if len(args) not in nargs:
+                raise self.error(
+                    f"{name}() takes {' or '.join(map(str, nargs))} "
+                    "wavelengths."
+                )
+            bands = sorted(self.band(arg) for arg in args)
+            if name == "IBD":
+                self.emit(OP_IBD, bands[0], bands[1], pushes=1)
+            elif len(bands) == 1:
+                opcode = OP_R if name == "R" else OP_C
+                self.emit(opcode, bands[0], pushes=1)
+            else:
+                opcode = OP_R_MEAN if name == "R" else OP_C_MEAN
+                self.emit(opcode, bands[0], bands[1], pushes=1)
+        elif name in _FUNCTIONS:
+            opcode = _FUNCTIONS[name]
+            nargs = 2 if opcode in (OP_MIN, OP_MAX) else 1
+            if len(args) != nargs:
+                raise self.error(f"{name}() takes {nargs} arguments.")
+            for arg in args:
+                self.visit(arg)
+            self.emit(opcode, pushes=1 - nargs)
+        else:
+            raise self.error(f"unknown function {name}().")
+
+
+def compile_expression(source: str, wvl: np.ndarray) -> BandExpression:
+    """
+    Compiles a band math expression for the wavelengths `wvl`.
+
+    Raises
+    ------
+    ValueError
+        If the expression is not valid band math.
+    """
+    try:
+        tree = ast.parse(source.strip(), mode="eval")
+    except SyntaxError as err:
+        raise ValueError(f"Invalid band math {source!r}: {err.msg}.") from None
+
+    compiler = _Compiler(source, wvl)
+    compiler.visit(tree)
+    program = np.array(compiler.program, dtype=np.int64).reshape(-1, 3)
+    return BandExpression(
+        source=source,
+        program=program,
+        constants=np.array(compiler.constants, dtype=np.float64),
+        stack_size=compiler.stack_size,
+        uses_contrem=bool(np.isin(
+            program[:, 0], (OP_C, OP_C_MEAN, OP_IBD)
+        ).any())
+    )
+
+
+@njit(error_model="numpy")
+def evaluate_program_nb(
+    program: np.ndarray,
+    constants: np.ndarray,
+    reflectance: np.ndarray,
+    contrem: np.ndarray,
+    stack: np.ndarray
+) -> float:
+    """
+    Evaluates a compiled band math program for one pixel.
+
+    Parameters
+    ----------
+    program: np.ndarray
+        `(ninstructions, 3)` program from `compile_expression`.
+    constants: np.ndarray
+        Constants referenced by the program.
+    reflectance, contrem: np.ndarray
+        Reflectance and continuum-removed spectrum of the pixel.
+    stack: np.ndarray
+        Work buffer of at least the program's stack size.
+    """
+    sp = 0
+    for n in range(program.shape[0]):
+        op = program[n, 0]
+        a = program[n, 1]
+        b = program[n, 2]
+        if op == OP_CONST:
+            stack[sp] = constants[a]
+            sp += 1
+        elif op == OP_R:
+            stack[sp] = reflectance[a]
+            sp += 1
+        elif op == OP_C:
+            stack[sp] = contrem[a]
+            sp += 1
+        elif op == OP_R_MEAN or op == OP_C_MEAN or op == OP_IBD:
+            acc = 0.0
+            for k in range(a, b + 1):
+                if op == OP_R_MEAN:
+                    acc += reflectance[k]
+                elif op == OP_C_MEAN:
+                    acc += contrem[k]
+                else:
+                    acc += 1 - contrem[k]
+            if op != OP_IBD:
+                acc /= b - a + 1
+            stack[sp] = acc
+            sp += 1
+        elif op <= OP_MAX:
+            sp -= 1
+            lhs = stack[sp - 1]
+            rhs = stack[sp]
+            if op == OP_ADD:
+                stack[sp - 1] = lhs + rhs
+            elif op == OP_SUB:
+                stack[sp - 1] = lhs - rhs
+            elif op == OP_MUL:
+                stack[sp - 1] = lhs * rhs
+            elif op == OP_DIV:
+                stack[sp - 1] = lhs / rhs
+            elif op == OP_POW:
+                stack[sp - 1] = lhs ** rhs
+            elif op == OP_MIN:
+                stack[sp - 1] = min(lhs, rhs)
+            else:
+                stack[sp - 1] = max(lhs, rhs)
+        else:
+            value = stack[sp - 1]
+            if op == OP_NEG:
+                stack[sp - 1] = -value
+            elif op == OP_SQRT:
+                stack[sp - 1] = np.sqrt(value)
+            elif op == OP_LOG:
+                stack[sp - 1] = np.log(value)
+            elif op == OP_EXP:
+                stack[sp - 1] = np.exp(value)
+            else:
+                stack[sp - 1] = abs(value)
+    return stack[0]
+
+
+@njit(parallel=True, nogil=True, error_model="numpy")
+def apply_band_math_over_cube(
+    cube,
+    contrem,
+    program,
+    program_offsets,
+    constants,
+    stack_size,
+    row0=0
+):
+    """
+    Applies evaluate_program_nb function for every program in one pass.
+    `contrem` covers the whole cube and `row0` is the cube's first row in
+    it. Returns `(nprograms, xsize, ysize)`.
+    """
+    xsize, ysize, nbands = cube.shape
+    nprograms = program_offsets.size - 1
+
+    analysis_result = np.empty((nprograms, xsize, ysize))
+
+    for i in prange(xsize):
+        stack = np.empty(stack_size)
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                for e in range(nprograms):
+                    analysis_result[e, i, j] = np.nan
+                continue
+            for e in range(nprograms):
+                analysis_result[e, i, j] = evaluate_program_nb(
+                    program[program_offsets[e]:program_offsets[e + 1]],
+                    constants,
+                    cube[i, j, :],
+                    contrem[row0 + i, j, :],
+                    stack
+                )
+
+    return analysis_result
+
+
+class BandMath():
+    """
+    A set of band math expressions compiled for one set of wavelengths and
+    evaluated together in a single pass.
+
+    Parameters
+    ----------
+    expressions: Mapping[str, str] or Sequence[str]
+        Expressions by name. A sequence is named by the expressions
+        themselves.
+    wvl: np.ndarray
+        Wavelengths of the cubes the expressions are evaluated on.
+
+    Attributes
+    ----------
+    names: tuple[str, ...]
+        Names of the expressions, in output order.
+    expressions: tuple[BandExpression, ...]
+        Compiled expressions.
+    uses_contrem: bool
+        True if any expression reads the continuum-removed cube.
+    program, program_offsets, constants, stack_size
+        Programs of all expressions packed for `apply_band_math_over_cube`.
+        Expression `e` is `program[program_offsets[e]:program_offsets[e +
+        1]]`, with indices into the shared `constants`.
+    """
+    def __init__(
+        self,
+        expressions: Union[Mapping[str, str], Sequence[str]],
+        wvl: np.ndarray
+    ) -> None:
+        if not isinstance(expressions, Mapping):
+            expressions = {source: source for source in expressions}
+        if not expressions:
+            raise ValueError("At least one expression is required.")
+
+        self.names = tuple(expressions)
+        self.expressions = tuple(
+            compile_expression(source, wvl)
+            for source in expressions.values()
+        )
+        self.uses_contrem = any(e.uses_contrem for e in self.expressions)
+
+        # Programs are packed into one array with constant indices shifted
+        # to a shared constant pool.
+        programs = []
+        constants = []
+        offsets = [0]
+        for expression in self.expressions:
+            program = expression.program.copy()
+            program[program[:, 0] == OP_CONST, 1] += len(constants)
+            constants.extend(expression.constants)
+            programs.append(program)
+            offsets.append(offsets[-1] + program.shape[0])
+        self.program = np.ascontiguousarray(np.concatenate(programs))
+        self.program_offsets = np.array(offsets, dtype=np.int64)
+        self.constants = np.array(constants, dtype=np.float64)
+        self.stack_size = max(e.stack_size for e in self.expressions)
+
+    def evaluate(
+        self,
+        reflectance: np.ndarray,
+        contrem: Optional[np.ndarray] = None,
+        verbose: bool = False,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        roi: Optional[RegionLike] = None,
+        compact: bool = False,
+        mask: Optional[np.ndarray] = None
+    ) -> Dict[str, np.ndarray]:
+        """
+        Evaluates every expression over a cube in one pass.
+
+        Parameters
+        ----------
+        reflectance: np.ndarray
+            Cube read by `R`.
+        contrem: np.ndarray, optional
+            Continuum-removed cube read by `C` and `IBD`. Only required if
+            an expression uses them.
+        verbose: bool, optional
+            If True, the runtime is printed. Default is False.
+        progress, cancel_token: optional
+            See `spectralops.progress.run_in_chunks`.
+        roi: optional
+            Region of interest (see `SpectralCube`). If given, only its
+            pixels are evaluated and the maps are NaN elsewhere.
+        compact: bool, optional
+            If True and `roi` is given, the maps are `(N, 1)` batches.
+        mask: np.ndarray, optional
+            Boolean map of the image, True for pixels that are skipped and
+            NaN in the maps.
+
+        Returns
+        -------
+        maps: dict[str, np.ndarray]
+            2-D map of every expression by name.
+        """
+        if contrem is None:
+            if self.uses_contrem:
+                raise ValueError(
+                    "C() and IBD() need the continuum-removed cube."
+                )
+            # Never read, but the kernel indexes it like the cube.
+            contrem = reflectance
+        elif contrem.shape[:2] != reflectance.shape[:2]:
+            raise ValueError(
+                f"Continuum-removed cube {contrem.shape} does not match the "
+                f"reflectance cube {reflectance.shape}."
+            )
+
+        npixels = reflectance.shape[0] * reflectance.shape[1]
+        if roi is not None:
+            roi = as_roi(reflectance.shape, roi)
+            mask = region_mask(mask, roi)
+            batch = gather(reflectance, roi)
+            contrem = batch if contrem is reflectance else gather(contrem, roi)
+            reflectance = batch
+            npixels = roi.size
+
+        with profile_step(
+            "Band math", npixels, verbose, nexpressions=len(self.names)
+        ):
+            maps = run_in_chunks(
+                apply_band_math_over_cube,
+                reflectance,
+                contrem,
+                self.program,
+                self.program_offsets,
+                self.constants,
+                self.stack_size,
+                progress=progress,
+                cancel_token=cancel_token,
+                step="Band math",
+                row_axis=1,
+                row_offset=True,
+                mask=mask,
+                pixel_args=1
+            )
+        if roi is not None and not compact:
+            maps = scatter(maps, roi, axis=1)
+        return dict(zip(self.names, maps))
@@ -3,6 +3,20 @@ from .fit_absorption import fit_absorption
 from .calculate_area import calculate_area
 from .calculate_center import calculate_center
 from .calculate_depth import calculate_depth
+from .calculate_minimum import calculate_minimum
+from .calculate_width import calculate_width
+from .calculate_asymmetry import calculate_asymmetry
+from .calculate_parameters import calculate_band_parameters_nb
+from .calculate_parameters import calculate_weighted_band_parameters_nb
+from .calculate_parameters import PARAMETER_NAMES
+from .absorption_window import AbsorptionWindow
+from .feature_sweep import sweep_absorption_features
+from .feature_sweep import FeatureDefinition, FeatureParameterStack
+from .parameter_sweep import parameter_sweep, ParameterSweep
+from .sweep_spectrum import sweep_spectrum_nb, SWEEP_FIELDS
+from .uncertainty import monte_carlo_parameters_nb
+from .detect_bands import count_bands_nb, detect_bands_nb, BAND_FIELDS
+from .band_detection import detect_absorption_bands, DetectedBands
 
 
 __all__ = [
@@ -11,5 +25,25 @@ __all__ = [
     "fit_absorption",
     "calculate_area",
     "calculate_center",
-    "calculate_depth"
+    "calculate_depth",
+    "calculate_minimum",
+    "calculate_width",
+    "calculate_asymmetry",
+    "calculate_band_parameters_nb",
+    "calculate_weighted_band_parameters_nb",
+    "PARAMETER_NAMES",
+    "AbsorptionWindow",
+    "sweep_absorption_features",
+    "FeatureDefinition",
+    "FeatureParameterStack",
+    "parameter_sweep",
+    "ParameterSweep",
+    "sweep_spectrum_nb",
+    "SWEEP_FIELDS",
+    "monte_carlo_parameters_nb",
+    "count_bands_nb",
+    "detect_bands_nb",
+    "BAND_FIELDS",
+    "detect_absorption_bands",
+    "DetectedBands"
 ]
@@ -1,7 +1,7 @@
 # band_parameters/absorption_band_stats.py
 
 # Standard Libraries
-from typing import Tuple, Optional
+from typing import Callable, Tuple, Optional
 
 # External Imports
 import numpy as np
@@ -10,12 +10,24 @@ import matplotlib.pyplot as plt
 # Local Imports
 from spectralops.spectral_classes import Spectrum
 from spectralops.spectral_classes import SpectralCube
-from spectralops.cube_ops import apply_calculate_area_over_cube
+from spectralops.cube_ops import apply_band_parameters_over_cube
+from spectralops.cube_ops import apply_weighted_band_parameters_over_cube
+from spectralops.cube_ops import apply_monte_carlo_over_cube
+from spectralops.profiling import profile_step
+from spectralops.progress import run_in_chunks
+from spectralops.progress import CancellationToken, ProgressInfo
+from spectralops.masking import region_mask
+from spectralops.roi import RegionLike, as_roi, gather, scatter
 
 from .fit_absorption import fit_absorption
 from .calculate_area import calculate_area
 from .calculate_center import calculate_center
 from .calculate_depth import calculate_depth
+from .calculate_minimum import calculate_minimum
+from .calculate_width import calculate_width
+from .calculate_asymmetry import calculate_asymmetry
+from .calculate_parameters import PARAMETER_NAMES
+from .absorption_window import AbsorptionWindow
 
 from spectralops.utils import rgb_composite
 
@@ -43,6 +55,14 @@ class AbsorptionFeature():
         Area of absorption feature.
     center: float
         Center wavelength of absorption feature.
+    depth: float
+        Depth of absorption feature.
+    minimum: float
+        Wavelength of the lowest continuum-removed value in the window.
+    width: float
+        Full width at half maximum of the fitted feature.
+    asymmetry: float
+        Band area asymmetry about the center.
     """
     def __init__(
         self,
@@ -81,58 +101,270 @@ class AbsorptionFeature():
             absorption_wvl=self.wvl
         )
 
+        self.minimum = calculate_minimum(self.spectrum, self.wvl)
+
+        if np.isnan(self.center):
+            self.width = np.nan
+            self.asymmetry = np.nan
+        else:
+            window = AbsorptionWindow.from_range(
+                spectrum.wvl, wvl_search_range, 4, spectrum.spec_res
+            )
+            center_idx = int(np.argmin(self.polyfit))
+            self.width = calculate_width(self.polyfit, self.wvl, center_idx)
+            self.asymmetry = calculate_asymmetry(
+                self.spectrum, window.spec_res, center_idx
+            )
+
 
 class AbsorptionFeatureCube():
+    """
+    Stores band parameter maps of an absorption feature across a spectral
+    cube.
+
+    The window is fit and all of its band parameters are calculated for
+    every pixel in a single compiled pass over the continuum-removed cube.
+    To find features without knowing their windows in advance, see
+    `detect_absorption_bands`.
+
+    Parameters
+    ----------
+    spectral_cube: SpectralCube
+        Spectral cube with continuum-removed data (`contrem`).
+    wvl_search_range: tuple[float, float]
+        Range of wavelengths to search for absorption feature.
+    fit_order: int, optional
+        Order of the polynomial fit. Default is 4.
+    weighted: bool, optional
+        If True, the window is fit by weighted least squares, weighting each
+        band by the inverse variance of the continuum-removed spectrum
+        (`err / continuum` of `spectral_cube`). Otherwise all bands are
+        weighted equally. Default is True.
+    verbose: bool, optional
+        If True (default), the runtime of the calculation is printed.
+    progress: Callable, optional
+        Progress callback. Defaults to the progress callback of
+        `spectral_cube`.
+    cancel_token: CancellationToken, optional
+        Cancellation token. Defaults to the token of `spectral_cube`.
+    roi: optional
+        Region of interest (see `SpectralCube`). If given, only its pixels
+        are calculated and the maps are NaN elsewhere.
+    compact: bool, optional
+        If True and `roi` is given, the parameter maps are `(N, 1)`
+        batches in the order of `self.roi` instead of full-size maps.
+    uncertainty_draws: int, optional
+        If positive, the uncertainty of every parameter is estimated from
+        this many Monte Carlo realizations of each pixel, drawn from the
+        smoothed spectrum (`smoothed`) and its spread (`err`) of
+        `spectral_cube`. Default is 0 (no uncertainty).
+    seed: int, optional
+        Seed of the Monte Carlo draws. Results depend only on the seed and
+        the pixel, not on chunking or threads. Default is 0.
+
+    Attributes
+    ----------
+    window: AbsorptionWindow
+        Band indices and fit factorization of the feature.
+    parameters: 3-D Array
+        Band parameter maps stacked in the order of `PARAMETER_NAMES`.
+    area: 2-D Array
+        Area of absorption feature.
+    center: 2-D Array
+        Center wavelength of absorption feature.
+    depth: 2-D Array
+        Depth of absorption feature.
+    minimum: 2-D Array
+        Wavelength of the lowest continuum-removed value in the window.
+    width: 2-D Array
+        Full width at half maximum of the fitted feature.
+    asymmetry: 2-D Array
+        Band area asymmetry about the center.
+    cube: 3-D Array
+        View of the continuum-removed cube over the feature window.
+    wvl: 1-D Array
+        Wavelength values of the feature window.
+    polyfit: 3-D Array
+        Polynomial fit of the feature. Computed when first accessed.
+    uncertainty: 3-D Array
+        Standard deviation of each parameter over the Monte Carlo draws,
+        stacked like `parameters`. Only set if `uncertainty_draws` > 0,
+        along with `area_err`, `center_err`, `depth_err`, etc.
+    monte_carlo_mean: 3-D Array
+        Mean of each parameter over the Monte Carlo draws.
+    """
     def __init__(
         self,
         spectral_cube: SpectralCube,
-        wvl_search_range: Tuple
+        wvl_search_range: Tuple,
+        fit_order: int = 4,
+        weighted: bool = True,
+        verbose: bool = True,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        roi: Optional[RegionLike] = None,
+        compact: bool = False,
+        uncertainty_draws: int = 0,
+        seed: int = 0
     ) -> None:
         self._original_spec = spectral_cube
         self._wvl_search_range = wvl_search_range
+        self._polyfit: Optional[np.ndarray] = None
+        self.weighted = weighted
+        self.verbose = verbose
 
-        fit_order = 4
-
-        self.polyfit, self.cube, self.wvl = \
-            fit_absorption(
-                spectral_cube.contrem,
-                spectral_cube.wvl,
-                self._wvl_search_range,
-                fit_order
-            )
-        print(f"Polynomial of order {fit_order} was fit to feature.")
-
-        area = apply_calculate_area_over_cube(
-            spectral_cube.contrem,
+        self.window = AbsorptionWindow.from_range(
             spectral_cube.wvl,
-            spectral_cube.spec_res,
-            *self._wvl_search_range
+            wvl_search_range,
+            fit_order,
+            spectral_cube.spec_res
         )
-        print("Feature area was calculated.")
+        self.cube = spectral_cube.contrem[
+            :, :, self.window.lo_idx:self.window.hi_idx
+        ]
+        self.wvl = self.window.wvl
+
+        if progress is None:
+            progress = spectral_cube.progress
+        if cancel_token is None:
+            cancel_token = spectral_cube.cancel_token
+
+        contrem = spectral_cube.contrem
+        npixels = spectral_cube.npixels
+        self.roi = None
+        if roi is not None:
+            self.roi = as_roi(contrem.shape, roi)
+            contrem = gather(contrem, self.roi)
+            npixels = self.roi.size
+        self._mask = region_mask(spectral_cube.masked_pixels, self.roi)
+
+        kernel = apply_band_parameters_over_cube
+        weights = ()
+        if weighted:
+            err, continuum = self._weight_cubes()
+            kernel = apply_weighted_band_parameters_over_cube
+            weights = (err, continuum)
+
+        with profile_step(
+            "Band parameters", npixels, verbose,
+            wvl_search_range=wvl_search_range, fit_order=fit_order,
+            weighted=weighted
+        ):
+            self.parameters = run_in_chunks(
+                kernel,
+                contrem,
+                *weights,
+                self.window.lo_idx,
+                self.window.hi_idx,
+                self.window.wvl,
+                self.window.spec_res,
+                self.window.design,
+                self.window.projection,
+                progress=progress,
+                cancel_token=cancel_token,
+                step="Band parameters",
+                row_axis=1,
+                row_offset=weighted,
+                mask=self._mask,
+                pixel_args=len(weights)
+            )
+        if self.roi is not None and not compact:
+            self.parameters = scatter(self.parameters, self.roi, axis=1)
 
-        center = calculate_center(
-            wvl=spectral_cube.wvl,
-            fitted_absorption=self.polyfit,
-            absorption_spec=self.cube,
-            absorption_wvl=self.wvl
-        )
-        print("Feature center was calculated.")
+        for n, name in enumerate(PARAMETER_NAMES):
+            setattr(self, name, self.parameters[n])
 
-        depth = calculate_depth(
-            wvl=spectral_cube.wvl,
-            fitted_absorption=self.polyfit,
-            absorption_spec=self.cube,
-            absorption_wvl=self.wvl
-        )
-        print("Feature depth was calculated.")
-
-        # Ensuring type stability.
-        if isinstance(area, np.ndarray):
-            self.area = area
-        if isinstance(center, np.ndarray):
-            self.center = center
-        if isinstance(depth, np.ndarray):
-            self.depth = depth
+        if uncertainty_draws > 0:
+            self._propagate_uncertainty(
+                uncertainty_draws, seed, progress, cancel_token, compact
+            )
+
+    def _weight_cubes(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Smoothing spread and continuum, gathered to the ROI if set."""
+        spectral_cube = self._original_spec
+        try:
+            err, continuum = spectral_cube.err, spectral_cube.continuum
+        except AttributeError:
+            raise ValueError(
+                "Weighted fits need the smoothing spread and the continuum. "
+                "Set `err` and `continuum` from `smooth_spectra` and "
+                "`remove_continuum` first, or pass `weighted=False`."
+            ) from None
+        if self.roi is not None:
+            err = gather(err, self.roi)
+            continuum = gather(continuum, self.roi)
+        return err, continuum
+
+    def _propagate_uncertainty(
+        self,
+        n_draws: int,
+        seed: int,
+        progress: Optional[Callable[[ProgressInfo], None]],
+        cancel_token: Optional[CancellationToken],
+        compact: bool
+    ) -> None:
+        spectral_cube = self._original_spec
+        try:
+            smoothed, err = spectral_cube.smoothed, spectral_cube.err
+        except AttributeError:
+            raise ValueError(
+                "Uncertainty needs the smoothed spectra and their spread. "
+                "Set `smoothed` and `err` from `smooth_spectra` first."
+            ) from None
+
+        xsize, ysize = smoothed.shape[:2]
+        if self.roi is None:
+            pixel_ids = np.arange(xsize * ysize).reshape(xsize, ysize)
+            npixels = spectral_cube.npixels
+        else:
+            smoothed = gather(smoothed, self.roi)
+            err = gather(err, self.roi)
+            pixel_ids = (self.roi.rows * ysize + self.roi.cols)[:, None]
+            npixels = self.roi.size
+
+        with profile_step(
+            "Band parameter uncertainty", npixels, self.verbose,
+            n_draws=n_draws
+        ):
+            stats = run_in_chunks(
+                apply_monte_carlo_over_cube,
+                smoothed,
+                err,
+                pixel_ids,
+                np.asarray(spectral_cube.wvl, dtype=np.float64),
+                seed,
+                n_draws,
+                self.window.lo_idx,
+                self.window.hi_idx,
+                self.window.wvl,
+                self.window.spec_res,
+                self.window.design,
+                self.window.projection,
+                progress=progress,
+                cancel_token=cancel_token,
+                step="Band parameter uncertainty",
+                row_axis=2,
+                row_offset=True,
+                mask=self._mask,
+                pixel_args=2
+            )
+        if self.roi is not None and not compact:
+            stats = scatter(stats, self.roi, axis=2)
+
+        self.monte_carlo_mean = stats[0]
+        self.uncertainty = stats[1]
+        for n, name in enumerate(PARAMETER_NAMES):
+            setattr(self, f"{name}_err", self.uncertainty[n])
+
+    @property
+    def polyfit(self) -> np.ndarray:
+        if self._polyfit is None:
+            spectral_cube = self._original_spec
+            sigma = None
+            if self.weighted:
+                sigma = spectral_cube.err / spectral_cube.continuum
+            self._polyfit = self.window.fit(spectral_cube.contrem, sigma)
+        return self._polyfit
 
     def plot_test_spectrum(
         self,
@@ -0,0 +1,127 @@
+# band_parameters/absorption_window.py
+
+# Standard Libraries
+from dataclasses import dataclass
+from typing import Optional, Tuple, Union
+
+# External Imports
+import numpy as np
+
+# Local Imports
+from spectralops.utils import find_wvl
+from spectralops.polyfit import polynomial_projection
+
+
+@dataclass
+class AbsorptionWindow:
+    """
+    Band indices and precomputed fit factorization of an absorption feature.
+
+    Attributes
+    ----------
+    lo_idx: int
+        Index of the first band of the window.
+    hi_idx: int
+        Index one past the last band of the window.
+    wvl: 1-D Array
+        Wavelengths of the window bands.
+    spec_res: 1-D Array
+        Spectral resolution of each window band.
+    fit_order: int
+        Order of the polynomial fit.
+    design: 2-D Array
+        Polynomial design matrix, `(nwindow, fit_order + 1)`.
+    projection: 2-D Array
+        Least-squares projection, `(fit_order + 1, nwindow)`.
+    """
+    lo_idx: int
+    hi_idx: int
+    wvl: np.ndarray
+    spec_res: np.ndarray
+    fit_order: int
+    design: np.ndarray
+    projection: np.ndarray
+
+    @classmethod
+    def from_range(
+        cls,
+        wvl: np.ndarray,
+        wvl_search_range: Tuple[float, float],
+        fit_order: int = 4,
+        spectral_resolution: Union[float, np.ndarray] = 1.0
+    ) -> "AbsorptionWindow":
+        """
+        Builds the window for a wavelength search range.
+
+        Parameters
+        ----------
+        wvl: np.ndarray
+            Wavelength values of the whole spectrum.
+        wvl_search_range: tuple[float, float]
+            Range of wavelengths to search for absorption feature. The window
+            is the same as the one used by `fit_absorption`.
+        fit_order: int, optional
+            Order of the polynomial fit. Default is 4.
+        spectral_resolution: float or np.ndarray, optional
+            Constant resolution or one value per band of `wvl`.
+        """
+        lo_idx, _ = find_wvl(wvl, wvl_search_range[0])
+        hi_idx, _ = find_wvl(wvl, wvl_search_range[1])
+        lo_idx, hi_idx = int(lo_idx), int(hi_idx)
+        window_wvl = np.ascontiguousarray(wvl[lo_idx:hi_idx], dtype=float)
+
+        if np.ndim(spectral_resolution) == 0:
+            spec_res = np.full(window_wvl.size, float(spectral_resolution))
+        else:
+            spec_res = np.asarray(spectral_resolution, dtype=float)
+            if spec_res.size == wvl.size:
+                spec_res = spec_res[lo_idx:hi_idx]
+            elif spec_res.size != window_wvl.size:
+                raise ValueError(
+                    "Spectral resolution must be a single value or have one "
+                    "value per band."
+                )
+            spec_res = np.ascontiguousarray(spec_res)
+
+        design, projection = polynomial_projection(window_wvl, fit_order)
+
+        return cls(
+            lo_idx, hi_idx, window_wvl, spec_res, fit_order, design,
+            projection
+        )
+
+    @property
+    def size(self) -> int:
+        return self.hi_idx - self.lo_idx
+
+    def fit(
+        self,
+        contrem: np.ndarray,
+        sigma: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """
+        Polynomial fit of the window for a spectrum or a whole cube.
+
+        If `sigma` (the per-band uncertainty of `contrem`, same shape) is
+        given, the fit is weighted by `1 / sigma**2` the same way as
+        `calculate_weighted_band_parameters_nb`.
+        """
+        window = contrem[..., self.lo_idx:self.hi_idx]
+        if sigma is None:
+            beta = np.einsum("ck,...k->...c", self.projection, window)
+            return np.einsum("kc,...c->...k", self.design, beta)
+
+        sigma = sigma[..., self.lo_idx:self.hi_idx]
+        with np.errstate(divide="ignore", invalid="ignore"):
+            weights = 1 / sigma**2
+        weights[~np.isfinite(weights) | ~(sigma > 0)] = 0.0
+        normal = np.einsum(
+            "...k,kc,kd->...cd", weights, self.design, self.design
+        )
+        rhs = np.einsum("...k,kc,...k->...c", weights, self.design, window)
+        beta = np.einsum("ck,...k->...c", self.projection, window)
+        solvable = np.linalg.matrix_rank(normal) == self.fit_order + 1
+        beta[solvable] = np.linalg.solve(
+            normal[solvable], rhs[solvable][..., np.newaxis]
+        )[..., 0]
+        return np.einsum("kc,...c->...k", self.design, beta)
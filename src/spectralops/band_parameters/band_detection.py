@@ -0,0 +1,149 @@
+# band_parameters/band_detection.py
+
+# Standard Libraries
+from typing import Callable, Optional, Tuple
+
+# External Imports
+import numpy as np
+
+# Local Imports
+from spectralops.spectral_classes import SpectralCube
+from spectralops.cube_ops import apply_count_bands_over_cube
+from spectralops.cube_ops import apply_detect_bands_over_cube
+from spectralops.profiling import profile_step
+from spectralops.progress import run_in_chunks
+from spectralops.progress import CancellationToken, ProgressInfo
+from spectralops.ragged import RaggedMap, offsets_from_counts
+from spectralops.masking import region_mask
+from spectralops.roi import RegionLike, as_roi, gather
+from spectralops.utils import find_wvl
+
+from .detect_bands import BAND_FIELDS
+
+
+class DetectedBands(RaggedMap):
+    """
+    Absorption bands detected in every pixel, stored as a `RaggedMap` with
+    the fields of `BAND_FIELDS`.
+
+    Examples
+    --------
+    >>> bands = detect_absorption_bands(cube)
+    >>> bands.pixel(10, 20)["center"]
+    >>> depth_map = bands.band_map(900, 1000)
+    """
+    def band_map(
+        self,
+        lo: float,
+        hi: float,
+        field: str = "depth",
+        reduce: str = "max"
+    ) -> np.ndarray:
+        """
+        2-D map of the bands centered in `[lo, hi)`, reduced per pixel, e.g.
+        the depth of the deepest band in a wavelength range. Pixels without
+        such a band are NaN.
+        """
+        return self.in_range("center", lo, hi).reduce(field, reduce)
+
+
+def detect_absorption_bands(
+    spectral_cube: SpectralCube,
+    min_depth: float = 0.02,
+    min_prominence: Optional[float] = None,
+    wvl_range: Optional[Tuple[float, float]] = None,
+    verbose: bool = True,
+    progress: Optional[Callable[[ProgressInfo], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    roi: Optional[RegionLike] = None,
+    compact: bool = False
+) -> DetectedBands:
+    """
+    Scans every continuum-removed pixel for significant absorption bands,
+    without knowing their wavelength windows in advance.
+
+    The bands of every pixel are counted in one parallel pass and written
+    in a second pass into flat arrays at CSR offsets, so a variable number
+    of bands per pixel is stored without padding.
+
+    Parameters
+    ----------
+    spectral_cube: SpectralCube
+        Spectral cube with continuum-removed data (`contrem`).
+    min_depth: float, optional
+        Minimum depth below the continuum. Default is 0.02.
+    min_prominence: float, optional
+        Minimum height of the lower shoulder above the band minimum.
+        Defaults to half of `min_depth`.
+    wvl_range: tuple[float, float], optional
+        Only search this range of wavelengths, including the bands closest
+        to both limits. Default is the whole spectrum.
+    verbose: bool, optional
+        If True (default), the runtime is printed.
+    progress: Callable, optional
+        Progress callback. Defaults to the callback of `spectral_cube`.
+    cancel_token: CancellationToken, optional
+        Cancellation token. Defaults to the token of `spectral_cube`.
+    roi: optional
+        Region of interest (see `SpectralCube`). If given, only its pixels
+        are scanned and the other pixels have no bands.
+    compact: bool, optional
+        If True and `roi` is given, the result covers an `(N, 1)` image of
+        the region's pixels instead of the whole image.
+
+    Returns
+    -------
+    bands: DetectedBands
+    """
+    if min_prominence is None:
+        min_prominence = min_depth / 2
+
+    wvl = np.asarray(spectral_cube.wvl, dtype=np.float64)
+    lo_idx, hi_idx = 0, wvl.size
+    if wvl_range is not None:
+        lo_idx, _ = find_wvl(wvl, wvl_range[0])
+        hi_idx, _ = find_wvl(wvl, wvl_range[1])
+        # Inclusive of the band at the upper limit, like band math ranges.
+        lo_idx, hi_idx = int(lo_idx), int(hi_idx) + 1
+
+    contrem = spectral_cube.contrem
+    npixels = spectral_cube.npixels
+    if roi is not None:
+        roi = as_roi(contrem.shape, roi)
+        contrem = gather(contrem, roi)
+        npixels = roi.size
+    mask = region_mask(spectral_cube.masked_pixels, roi)
+    contrem = contrem[:, :, lo_idx:hi_idx]
+    wvl = np.ascontiguousarray(wvl[lo_idx:hi_idx])
+
+    with profile_step(
+        "Band detection", npixels, verbose,
+        min_depth=min_depth, min_prominence=min_prominence
+    ):
+        counts = run_in_chunks(
+            apply_count_bands_over_cube,
+            contrem,
+            min_depth,
+            min_prominence,
+            progress=(
+                spectral_cube.progress if progress is None else progress
+            ),
+            cancel_token=(
+                spectral_cube.cancel_token if cancel_token is None
+                else cancel_token
+            ),
+            step="Band detection",
+            mask=mask
+        )
+        # Masked pixels have no bands, so the second pass skips them.
+        offsets = offsets_from_counts(counts)
+        values = apply_detect_bands_over_cube(
+            contrem, wvl, min_depth, min_prominence, offsets
+        )
+
+    bands = DetectedBands(
+        offsets, dict(zip(BAND_FIELDS, values)), contrem.shape[:2]
+    )
+    if roi is not None and not compact:
+        bands = bands.scatter(roi)
+    return bands
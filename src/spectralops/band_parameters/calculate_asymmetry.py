@@ -0,0 +1,52 @@
+# band_parameters/calculate_asymmetry.py
+
+# External Imports
+import numpy as np
+from numba import njit
+
+
+@njit
+def calculate_asymmetry(
+    absorption_spec: np.ndarray,
+    absorption_res: np.ndarray,
+    center_idx: int
+) -> float:
+    """
+    Calculates the band area asymmetry: the difference between the band area
+    on the long and short wavelength sides of the center, divided by the
+    total band area. The center band is split evenly between both sides.
+
+    Parameters
+    ----------
+    absorption_spec: np.ndarray
+        Continuum-removed spectrum over the absorption window.
+    absorption_res: np.ndarray
+        Spectral resolution of each band of the absorption window.
+    center_idx: int
+        Index of the band center within the window.
+
+    Returns
+    -------
+    asymmetry: float
+        Positive values mean more area on the long wavelength side. It is
+        between -1 and 1 only if the whole window is below the continuum;
+        bands above it (e.g. in clipped or lopsided windows) count as
+        negative area and can push it outside that range. NaN if the total
+        area is zero.
+    """
+    left = 0.0
+    right = 0.0
+    for k in range(absorption_spec.size):
+        component = (1 - absorption_spec[k]) * absorption_res[k]
+        if k < center_idx:
+            left += component
+        elif k > center_idx:
+            right += component
+        else:
+            left += component / 2
+            right += component / 2
+
+    total = left + right
+    if total == 0:
+        return np.nan
+    return (right - left) / total
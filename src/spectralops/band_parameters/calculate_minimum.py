@@ -0,0 +1,40 @@
+# band_parameters/calculate_minimum.py
+
+# External Imports
+import numpy as np
+from numba import njit
+
+
+@njit
+def calculate_minimum(
+    absorption_spec: np.ndarray,
+    absorption_wvl: np.ndarray
+) -> float:
+    """
+    Calculates the band minimum: the wavelength of the lowest measured
+    continuum-removed value in the absorption window. Unlike the band center,
+    no fit is involved.
+
+    Parameters
+    ----------
+    absorption_spec: np.ndarray
+        Continuum-removed spectrum over the absorption window.
+    absorption_wvl: np.ndarray
+        Wavelengths of the absorption window.
+
+    Returns
+    -------
+    minimum: float
+        Wavelength of the band minimum. NaN if the minimum falls on either
+        edge of the window or the window contains no valid values.
+    """
+    min_idx = -1
+    min_val = np.inf
+    for k in range(absorption_spec.size):
+        if absorption_spec[k] < min_val:
+            min_val = absorption_spec[k]
+            min_idx = k
+
+    if (min_idx <= 0) or (min_idx == absorption_spec.size - 1):
+        return np.nan
+    return absorption_wvl[min_idx]
@@ -0,0 +1,252 @@
+# band_parameters/calculate_parameters.py
+
+# External Imports
+import numpy as np
+from numba import njit
+
+# Local Imports
+from .calculate_minimum import calculate_minimum
+from .calculate_width import calculate_width
+from .calculate_asymmetry import calculate_asymmetry
+
+
+PARAMETER_NAMES = ("area", "center", "depth", "minimum", "width", "asymmetry")
+
+
+@njit
+def calculate_band_parameters_nb(
+    contrem_spectrum: np.ndarray,
+    lo_idx: int,
+    hi_idx: int,
+    window_wvl: np.ndarray,
+    window_res: np.ndarray,
+    design: np.ndarray,
+    projection: np.ndarray,
+    beta: np.ndarray,
+    fit: np.ndarray,
+    out: np.ndarray
+) -> None:
+    """
+    Fits an absorption window and calculates all of its band parameters in a
+    single pass.
+
+    Parameters
+    ----------
+    contrem_spectrum: np.ndarray
+        Continuum-removed spectral data for a single spectrum.
+    lo_idx, hi_idx: int
+        Band indices bounding the absorption window (`hi_idx` exclusive).
+    window_wvl: np.ndarray
+        Wavelengths of the window bands.
+    window_res: np.ndarray
+        Spectral resolution of each window band.
+    design: np.ndarray
+        Polynomial design matrix of the window, `(nwindow, ncoef)`.
+    projection: np.ndarray
+        Least-squares projection of the window, `(ncoef, nwindow)`, so that
+        the fit coefficients are `projection @ spectrum[lo_idx:hi_idx]`.
+    beta: np.ndarray
+        Work buffer of at least `ncoef` values for the fit coefficients.
+    fit: np.ndarray
+        Work buffer of at least `nwindow` values for the fitted line.
+    out: np.ndarray
+        Output array, filled in the order of `PARAMETER_NAMES`.
+
+    Notes
+    -----
+    The center is the wavelength of the minimum of the fit. As with
+    `calculate_center`, the center and depth are NaN when the minimum falls
+    on the first band of the window. The width and asymmetry are NaN
+    whenever the center is.
+    """
+    nwindow = hi_idx - lo_idx
+    ncoef = projection.shape[0]
+
+    area = 0.0
+    for k in range(nwindow):
+        area += (1 - contrem_spectrum[lo_idx + k]) * window_res[k]
+
+    for c in range(ncoef):
+        acc = 0.0
+        for k in range(nwindow):
+            acc += projection[c, k] * contrem_spectrum[lo_idx + k]
+        beta[c] = acc
+
+    _parameters_from_fit(
+        contrem_spectrum, lo_idx, hi_idx, window_wvl, window_res, design,
+        beta, fit, area, out
+    )
+
+
+@njit
+def _parameters_from_fit(
+    contrem_spectrum: np.ndarray,
+    lo_idx: int,
+    hi_idx: int,
+    window_wvl: np.ndarray,
+    window_res: np.ndarray,
+    design: np.ndarray,
+    beta: np.ndarray,
+    fit: np.ndarray,
+    area: float,
+    out: np.ndarray
+) -> None:
+    """
+    Evaluates the fit coefficients `beta` over the window and fills `out`
+    with the band parameters. Only the first `design.shape[1]` values of
+    `beta` are used, so it may be a buffer shared by fits of higher order.
+    """
+    nwindow = hi_idx - lo_idx
+    ncoef = design.shape[1]
+
+    min_idx = 0
+    min_val = np.inf
+    for k in range(nwindow):
+        fit_val = 0.0
+        for c in range(ncoef):
+            fit_val += design[k, c] * beta[c]
+        fit[k] = fit_val
+        if fit_val < min_val:
+            min_val = fit_val
+            min_idx = k
+
+    window_spec = contrem_spectrum[lo_idx:hi_idx]
+
+    out[0] = area
+    out[3] = calculate_minimum(window_spec, window_wvl)
+    if min_idx == 0:
+        out[1] = np.nan
+        out[2] = np.nan
+        out[4] = np.nan
+        out[5] = np.nan
+    else:
+        out[1] = window_wvl[min_idx]
+        out[2] = 1 - min_val
+        out[4] = calculate_width(fit[:nwindow], window_wvl, min_idx)
+        out[5] = calculate_asymmetry(window_spec, window_res, min_idx)
+
+
+@njit
+def _cholesky_solve(normal: np.ndarray, beta: np.ndarray) -> bool:
+    """
+    Solves `normal @ x = beta` in place for a small symmetric positive
+    definite `normal`, overwriting its lower triangle with the Cholesky
+    factor and `beta` with the solution. Returns False if `normal` is not
+    positive definite.
+    """
+    n = beta.size
+    for c in range(n):
+        diag = normal[c, c]
+        for m in range(c):
+            diag -= normal[c, m] * normal[c, m]
+        if not diag > 0.0:
+            return False
+        diag = np.sqrt(diag)
+        normal[c, c] = diag
+        for r in range(c + 1, n):
+            acc = normal[r, c]
+            for m in range(c):
+                acc -= normal[r, m] * normal[c, m]
+            normal[r, c] = acc / diag
+
+    for r in range(n):
+        acc = beta[r]
+        for m in range(r):
+            acc -= normal[r, m] * beta[m]
+        beta[r] = acc / normal[r, r]
+    for r in range(n - 1, -1, -1):
+        acc = beta[r]
+        for m in range(r + 1, n):
+            acc -= normal[m, r] * beta[m]
+        beta[r] = acc / normal[r, r]
+    return True
+
+
+@njit
+def calculate_weighted_band_parameters_nb(
+    contrem_spectrum: np.ndarray,
+    err: np.ndarray,
+    continuum: np.ndarray,
+    lo_idx: int,
+    hi_idx: int,
+    window_wvl: np.ndarray,
+    window_res: np.ndarray,
+    design: np.ndarray,
+    projection: np.ndarray,
+    moments: np.ndarray,
+    normal: np.ndarray,
+    beta: np.ndarray,
+    fit: np.ndarray,
+    out: np.ndarray
+) -> None:
+    """
+    Same as `calculate_band_parameters_nb`, but the window is fit by
+    weighted least squares with weights `1 / sigma**2`.
+
+    The uncertainty of the continuum-removed spectrum is `sigma = err /
+    continuum`. Since the design matrix is a Vandermonde matrix, the
+    weighted normal equations only depend on the `2 * ncoef - 1` weighted
+    power sums of the scaled wavelengths, which are accumulated in one pass
+    over the window. The equations are solved by Cholesky decomposition in
+    the `normal` buffer, so no arrays are allocated.
+
+    Parameters
+    ----------
+    contrem_spectrum: np.ndarray
+        Continuum-removed spectral data for a single spectrum.
+    err: np.ndarray
+        Per-band standard deviation of the smoothed spectrum.
+    continuum: np.ndarray
+        Continuum of the spectrum.
+    lo_idx, hi_idx, window_wvl, window_res, design, projection
+        Absorption window, see `calculate_band_parameters_nb`. `design`
+        must have increasing powers, as built by `polynomial_projection`.
+    moments: np.ndarray
+        Work buffer of length `2 * ncoef - 1`.
+    normal: np.ndarray
+        `(ncoef, ncoef)` work buffer for the normal equations.
+    beta, fit, out: np.ndarray
+        See `calculate_band_parameters_nb`.
+
+    Notes
+    -----
+    Bands with a non-finite or non-positive sigma get no weight. If the
+    remaining bands cannot determine the fit, the unweighted fit is used.
+    """
+    nwindow = hi_idx - lo_idx
+    ncoef = projection.shape[0]
+
+    area = 0.0
+    for k in range(nwindow):
+        area += (1 - contrem_spectrum[lo_idx + k]) * window_res[k]
+
+    moments[:] = 0.0
+    beta[:] = 0.0
+    for k in range(nwindow):
+        sigma = err[lo_idx + k] / continuum[lo_idx + k]
+        if not (sigma > 0.0 and np.isfinite(sigma)):
+            continue
+        t = design[k, 1] if ncoef > 1 else 0.0
+        value = contrem_spectrum[lo_idx + k]
+        power = 1.0 / (sigma * sigma)
+        for m in range(2 * ncoef - 1):
+            moments[m] += power
+            if m < ncoef:
+                beta[m] += power * value
+            power *= t
+
+    for r in range(ncoef):
+        for c in range(r + 1):
+            normal[r, c] = moments[r + c]
+
+    if not _cholesky_solve(normal, beta):
+        for c in range(ncoef):
+            acc = 0.0
+            for k in range(nwindow):
+                acc += projection[c, k] * contrem_spectrum[lo_idx + k]
+            beta[c] = acc
+
+    _parameters_from_fit(
+        contrem_spectrum, lo_idx, hi_idx, window_wvl, window_res, design,
+        beta, fit, area, out
+    )
@@ -0,0 +1,57 @@
+# band_parameters/calculate_width.py
+
+# External Imports
+import numpy as np
+from numba import njit
+
+
+@njit
+def calculate_width(
+    fitted_absorption: np.ndarray,
+    absorption_wvl: np.ndarray,
+    center_idx: int
+) -> float:
+    """
+    Calculates the full width at half maximum (FWHM) of a fitted absorption
+    feature. The half-depth crossings on either side of the center are
+    linearly interpolated between bands.
+
+    Parameters
+    ----------
+    fitted_absorption: np.ndarray
+        Fitted continuum-removed absorption feature.
+    absorption_wvl: np.ndarray
+        Wavelengths of the absorption window.
+    center_idx: int
+        Index of the fit minimum within the window.
+
+    Returns
+    -------
+    width: float
+        FWHM in wavelength units. NaN if the feature does not rise back above
+        half depth on both sides within the window.
+    """
+    min_val = fitted_absorption[center_idx]
+    half_level = 1 - (1 - min_val) / 2
+    if not (min_val < half_level):
+        return np.nan
+
+    left = np.nan
+    for k in range(center_idx, 0, -1):
+        if fitted_absorption[k - 1] >= half_level:
+            frac = (half_level - fitted_absorption[k]) /\
+                (fitted_absorption[k - 1] - fitted_absorption[k])
+            left = absorption_wvl[k] +\
+                frac * (absorption_wvl[k - 1] - absorption_wvl[k])
+            break
+
+    right = np.nan
+    for k in range(center_idx, fitted_absorption.size - 1):
+        if fitted_absorption[k + 1] >= half_level:
+            frac = (half_level - fitted_absorption[k]) /\
+                (fitted_absorption[k + 1] - fitted_absorption[k])
+            right = absorption_wvl[k] +\
+                frac * (absorption_wvl[k + 1] - absorption_wvl[k])
+            break
+
+    return right - left
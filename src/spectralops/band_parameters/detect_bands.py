@@ -0,0 +1,154 @@
+# band_parameters/detect_bands.py
+
+# Standard Libraries
+from typing import Tuple
+
+# External Imports
+import numpy as np
+from numba import njit
+
+
+BAND_FIELDS = ("center", "depth", "width", "start", "stop")
+
+
+@njit
+def _shoulders(contrem: np.ndarray, k: int) -> Tuple[int, int]:
+    """
+    Shoulders of the local minimum at band `k`: the highest band on each
+    side before the spectrum drops below the minimum again (or ends).
+    """
+    nbands = contrem.size
+    value = contrem[k]
+
+    left = k
+    n = k - 1
+    while n >= 0 and contrem[n] >= value:
+        if contrem[n] > contrem[left]:
+            left = n
+        n -= 1
+
+    right = k
+    n = k + 1
+    while n < nbands and contrem[n] >= value:
+        if contrem[n] > contrem[right]:
+            right = n
+        n += 1
+
+    return left, right
+
+
+@njit
+def _rises_to(contrem: np.ndarray, k: int, step: int, level: float) -> bool:
+    """
+    Whether the spectrum reaches `level` going from band `k` in direction
+    `step` before it drops below the value at `k` (or ends).
+    """
+    value = contrem[k]
+    n = k + step
+    while 0 <= n < contrem.size and contrem[n] >= value:
+        if contrem[n] >= level:
+            return True
+        n += step
+    return False
+
+
+@njit
+def _is_band(
+    contrem: np.ndarray,
+    k: int,
+    min_depth: float,
+    min_prominence: float
+) -> bool:
+    if not (contrem[k] < contrem[k - 1] and contrem[k] <= contrem[k + 1]):
+        return False
+    if 1 - contrem[k] < min_depth:
+        return False
+    # Both shoulders must rise by the prominence, so each side can stop
+    # scanning as soon as it does.
+    level = contrem[k] + min_prominence
+    return (
+        _rises_to(contrem, k, -1, level) and _rises_to(contrem, k, 1, level)
+    )
+
+
+@njit
+def count_bands_nb(
+    contrem: np.ndarray,
+    min_depth: float,
+    min_prominence: float
+) -> int:
+    """
+    Counts the absorption bands of a continuum-removed spectrum found by
+    `detect_bands_nb`.
+    """
+    count = 0
+    for k in range(1, contrem.size - 1):
+        if _is_band(contrem, k, min_depth, min_prominence):
+            count += 1
+    return count
+
+
+@njit
+def detect_bands_nb(
+    contrem: np.ndarray,
+    wvl: np.ndarray,
+    min_depth: float,
+    min_prominence: float,
+    out: np.ndarray
+) -> None:
+    """
+    Finds the significant absorption bands of a continuum-removed spectrum.
+
+    A band is a local minimum at least `min_depth` below the continuum (1)
+    that is bounded by continuum shoulders: the highest bands on either
+    side before the spectrum drops lower than the minimum. The lower
+    shoulder must be at least `min_prominence` above the minimum, so noise
+    wiggles inside a band are not counted as bands of their own.
+
+    Parameters
+    ----------
+    contrem: np.ndarray
+        Continuum-removed spectrum.
+    wvl: np.ndarray
+        Wavelengths of the spectrum.
+    min_depth, min_prominence: float
+        Detection thresholds.
+    out: np.ndarray
+        `(len(BAND_FIELDS), count_bands_nb(...))` output. Every column is a
+        band, in order of wavelength, with its center (wavelength of the
+        minimum), depth (`1 - minimum`), width (full width at half depth,
+        linearly interpolated and clipped to the shoulders) and the
+        wavelengths of its left and right shoulders.
+    """
+    b = 0
+    for k in range(1, contrem.size - 1):
+        if not _is_band(contrem, k, min_depth, min_prominence):
+            continue
+        left, right = _shoulders(contrem, k)
+        depth = 1 - contrem[k]
+        half = 1 - depth / 2
+
+        lo_wvl = wvl[left]
+        n = k
+        while n > left:
+            if contrem[n - 1] >= half:
+                frac = (half - contrem[n]) / (contrem[n - 1] - contrem[n])
+                lo_wvl = wvl[n] + frac * (wvl[n - 1] - wvl[n])
+                break
+            n -= 1
+
+        hi_wvl = wvl[right]
+        n = k
+        while n < right:
+            if contrem[n + 1] >= half:
+                frac = (half - contrem[n]) / (contrem[n + 1] - contrem[n])
+                hi_wvl = wvl[n] + frac * (wvl[n + 1] - wvl[n])
+                break
+            n += 1
+
+        out[0, b] = wvl[k]
+        out[1, b] = depth
+        out[2, b] = hi_wvl - lo_wvl
+        out[3, b] = wvl[left]
+        out[4, b] = wvl[right]
+        b += 1
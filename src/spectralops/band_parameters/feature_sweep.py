@@ -0,0 +1,221 @@
+# band_parameters/feature_sweep.py
+
+# Standard Libraries
+from dataclasses import dataclass
+from typing import Callable, Iterable, Optional, Sequence, Tuple, Union
+
+# External Imports
+import numpy as np
+
+# Local Imports
+from spectralops.spectral_classes import SpectralCube
+from spectralops.cube_ops import apply_feature_sweep_over_cube
+from spectralops.profiling import profile_step
+from spectralops.progress import run_in_chunks
+from spectralops.progress import CancellationToken, ProgressInfo
+from spectralops.masking import region_mask
+from spectralops.roi import RegionLike, as_roi, gather, scatter
+
+from .absorption_window import AbsorptionWindow
+from .calculate_parameters import PARAMETER_NAMES
+
+
+@dataclass
+class FeatureDefinition:
+    """
+    Named absorption feature to include in a feature sweep.
+
+    Attributes
+    ----------
+    name: str
+        Name of the feature, e.g. `"1um"`.
+    wvl_search_range: tuple[float, float]
+        Range of wavelengths to search for the absorption feature.
+    fit_order: int
+        Order of the polynomial fit. Default is 4.
+    """
+    name: str
+    wvl_search_range: Tuple[float, float]
+    fit_order: int = 4
+
+
+FeatureLike = Union[
+    FeatureDefinition,
+    Tuple[str, Tuple[float, float]],
+    Tuple[str, Tuple[float, float], int]
+]
+
+
+class FeatureParameterStack():
+    """
+    Band parameters of several absorption features, stacked into a single
+    product.
+
+    Attributes
+    ----------
+    data: 4-D Array
+        Parameter maps, `(nfeatures, nparameters, xsize, ysize)`.
+    features: list[FeatureDefinition]
+        Features in the order of the first axis of `data`.
+    windows: list[AbsorptionWindow]
+        Window of each feature.
+    parameter_names: tuple[str, ...]
+        Parameters in the order of the second axis of `data`.
+    """
+    def __init__(
+        self,
+        data: np.ndarray,
+        features: list[FeatureDefinition],
+        windows: list[AbsorptionWindow]
+    ) -> None:
+        self.data = data
+        self.features = features
+        self.windows = windows
+        self.parameter_names = PARAMETER_NAMES
+
+    @property
+    def feature_names(self) -> list[str]:
+        return [f.name for f in self.features]
+
+    def __getitem__(self, feature: str) -> np.ndarray:
+        return self.data[self.feature_names.index(feature)]
+
+    def get(self, feature: str, parameter: str) -> np.ndarray:
+        """
+        Returns the 2-D map of one parameter of one feature.
+        """
+        return self[feature][self.parameter_names.index(parameter)]
+
+    def as_dict(self) -> dict[str, np.ndarray]:
+        """
+        Returns every map keyed by `"<feature>_<parameter>"`.
+        """
+        return {
+            f"{feature}_{parameter}": self.get(feature, parameter)
+            for feature in self.feature_names
+            for parameter in self.parameter_names
+        }
+
+
+def _as_definition(feature: FeatureLike) -> FeatureDefinition:
+    if isinstance(feature, FeatureDefinition):
+        return feature
+    return FeatureDefinition(*feature)
+
+
+def pack_windows(
+    windows: Sequence[AbsorptionWindow]
+) -> tuple[np.ndarray, ...]:
+    """
+    Packs absorption windows into the flat arrays used by
+    `apply_feature_sweep_over_cube`.
+    """
+    nwindow = np.array([w.size for w in windows], dtype=np.int64)
+    ncoef = np.array([w.fit_order + 1 for w in windows], dtype=np.int64)
+    window_offsets = np.concatenate([[0], np.cumsum(nwindow)[:-1]])
+    matrix_offsets = np.concatenate([[0], np.cumsum(nwindow * ncoef)[:-1]])
+
+    return (
+        np.array([w.lo_idx for w in windows], dtype=np.int64),
+        np.array([w.hi_idx for w in windows], dtype=np.int64),
+        ncoef,
+        window_offsets.astype(np.int64),
+        matrix_offsets.astype(np.int64),
+        np.concatenate([w.wvl for w in windows]),
+        np.concatenate([w.spec_res for w in windows]),
+        np.concatenate([w.design.ravel() for w in windows]),
+        np.concatenate([w.projection.ravel() for w in windows])
+    )
+
+
+def sweep_absorption_features(
+    spectral_cube: SpectralCube,
+    features: Iterable[FeatureLike],
+    verbose: bool = True,
+    progress: Optional[Callable[[ProgressInfo], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    roi: Optional[RegionLike] = None,
+    compact: bool = False
+) -> FeatureParameterStack:
+    """
+    Calculates the band parameters of several absorption features in a
+    single parallel pass over the continuum-removed cube. Fits weight all
+    bands equally, as `AbsorptionFeatureCube(weighted=False)`.
+
+    Parameters
+    ----------
+    spectral_cube: SpectralCube
+        Spectral cube with continuum-removed data (`contrem`).
+    features: iterable
+        `FeatureDefinition` objects or `(name, wvl_search_range)` /
+        `(name, wvl_search_range, fit_order)` tuples.
+    verbose: bool, optional
+        If True (default), the runtime is printed.
+    progress: Callable, optional
+        Progress callback. Defaults to the callback of `spectral_cube`.
+    cancel_token: CancellationToken, optional
+        Cancellation token. Defaults to the token of `spectral_cube`.
+    roi: optional
+        Region of interest (see `SpectralCube`). If given, only its pixels
+        are calculated and the maps are NaN elsewhere.
+    compact: bool, optional
+        If True and `roi` is given, the maps are `(N, 1)` batches in the
+        order of the region's pixels instead of full-size maps.
+
+    Returns
+    -------
+    stack: FeatureParameterStack
+        Parameter maps of every feature.
+
+    Examples
+    --------
+    >>> stack = sweep_absorption_features(
+    ...     cube, [("1um", (750, 1250)), ("2um", (1600, 2500), 3)]
+    ... )
+    >>> stack.get("2um", "depth")
+    """
+    definitions = [_as_definition(f) for f in features]
+    if len(definitions) == 0:
+        raise ValueError("At least one feature must be specified.")
+
+    windows = [
+        AbsorptionWindow.from_range(
+            spectral_cube.wvl,
+            f.wvl_search_range,
+            f.fit_order,
+            spectral_cube.spec_res
+        )
+        for f in definitions
+    ]
+
+    contrem = spectral_cube.contrem
+    npixels = spectral_cube.npixels
+    if roi is not None:
+        roi = as_roi(contrem.shape, roi)
+        contrem = gather(contrem, roi)
+        npixels = roi.size
+    mask = region_mask(spectral_cube.masked_pixels, roi)
+
+    with profile_step(
+        "Feature sweep", npixels, verbose,
+        features=[f.name for f in definitions]
+    ):
+        data = run_in_chunks(
+            apply_feature_sweep_over_cube,
+            contrem,
+            *pack_windows(windows),
+            progress=(
+                spectral_cube.progress if progress is None else progress
+            ),
+            cancel_token=(
+                spectral_cube.cancel_token if cancel_token is None
+                else cancel_token
+            ),
+            step="Feature sweep",
+            row_axis=2,
+            mask=mask
+        )
+    if roi is not None and not compact:
+        data = scatter(data, roi, axis=2)
+
+    return FeatureParameterStack(data, definitions, windows)
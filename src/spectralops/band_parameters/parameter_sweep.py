@@ -0,0 +1,220 @@
+# band_parameters/parameter_sweep.py
+
+# Standard Libraries
+from typing import Callable, Optional, Sequence, Tuple
+
+# External Imports
+import numpy as np
+
+# Local Imports
+from spectralops.spectral_classes import SpectralCube
+from spectralops.cube_ops import apply_parameter_sweep_over_cube
+from spectralops.profiling import profile_step
+from spectralops.progress import run_in_chunks
+from spectralops.progress import CancellationToken, ProgressInfo
+from spectralops.masking import region_mask
+from spectralops.roi import RegionLike, as_roi, gather, scatter
+
+from .absorption_window import AbsorptionWindow
+from .feature_sweep import pack_windows
+from .sweep_spectrum import SWEEP_FIELDS
+
+
+class ParameterSweep():
+    """
+    Per-pixel results of a sweep over processing settings.
+
+    Attributes
+    ----------
+    data: 6-D Array
+        `(nthresholds, nwindows, norders, len(SWEEP_FIELDS), xsize, ysize)`
+        maps. The fields are the RMS smoothing residual, the RMS residual of
+        the absorption fit and every band parameter.
+    thresholds: np.ndarray
+        Outlier removal thresholds.
+    window_sizes: np.ndarray
+        Smoothing window sizes.
+    fit_orders: np.ndarray
+        Absorption fit orders.
+    field_names: tuple[str, ...]
+        Fields in the order of the fourth axis of `data`.
+    """
+    def __init__(
+        self,
+        data: np.ndarray,
+        thresholds: np.ndarray,
+        window_sizes: np.ndarray,
+        fit_orders: np.ndarray
+    ) -> None:
+        self.data = data
+        self.thresholds = thresholds
+        self.window_sizes = window_sizes
+        self.fit_orders = fit_orders
+        self.field_names = SWEEP_FIELDS
+
+    def _index(self, threshold, window_size, fit_order) -> Tuple[int, ...]:
+        def lookup(values, value, name):
+            matches = np.flatnonzero(np.isclose(values, value))
+            if matches.size == 0:
+                raise KeyError(f"{name} {value} was not part of the sweep.")
+            return int(matches[0])
+
+        return (
+            lookup(self.thresholds, threshold, "Threshold"),
+            lookup(self.window_sizes, window_size, "Window size"),
+            lookup(self.fit_orders, fit_order, "Fit order")
+        )
+
+    def get(
+        self,
+        threshold: float,
+        window_size: int,
+        fit_order: int,
+        field: str
+    ) -> np.ndarray:
+        """
+        Returns the 2-D map of one field for one combination of settings.
+        """
+        index = self._index(threshold, window_size, fit_order)
+        return self.data[index][self.field_names.index(field)]
+
+    def summary(self, statistic: Callable = np.nanmedian) -> list[dict]:
+        """
+        Summarizes every combination of settings with `statistic` over
+        pixels.
+
+        Returns
+        -------
+        rows: list[dict]
+            One row per combination with the settings and the statistic of
+            every field.
+        """
+        rows = []
+        for t, threshold in enumerate(self.thresholds):
+            for w, window_size in enumerate(self.window_sizes):
+                for o, fit_order in enumerate(self.fit_orders):
+                    row = {
+                        "threshold": float(threshold),
+                        "window_size": int(window_size),
+                        "fit_order": int(fit_order)
+                    }
+                    for f, name in enumerate(self.field_names):
+                        row[name] = float(statistic(self.data[t, w, o, f]))
+                    rows.append(row)
+        return rows
+
+
+def parameter_sweep(
+    spectral_cube: SpectralCube,
+    wvl_search_range: Tuple[float, float],
+    thresholds: Sequence[float] = (2,),
+    window_sizes: Sequence[int] = (5,),
+    fit_orders: Sequence[int] = (4,),
+    verbose: bool = True,
+    progress: Optional[Callable[[ProgressInfo], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    roi: Optional[RegionLike] = None,
+    compact: bool = False
+) -> ParameterSweep:
+    """
+    Runs outlier removal, smoothing, continuum removal and band parameter
+    calculation for every combination of settings in one pass over the
+    cube.
+
+    Work is shared between settings: the outlier z-scores are computed once
+    per pixel, prefix sums serve every smoothing window and each fit order
+    is factorized once for the whole cube. Settings are those of
+    `remove_outliers(method="zscore")`, `smooth_spectra(method=
+    "moving_average")` and `AbsorptionFeatureCube(weighted=False)`.
+
+    Parameters
+    ----------
+    spectral_cube: SpectralCube
+        Spectral cube with the original data in `cube`.
+    wvl_search_range: tuple[float, float]
+        Range of wavelengths to search for the absorption feature.
+    thresholds: Sequence[float], optional
+        Outlier removal z-score thresholds. Default is `(2,)`.
+    window_sizes: Sequence[int], optional
+        Odd smoothing window sizes. Default is `(5,)`.
+    fit_orders: Sequence[int], optional
+        Absorption fit orders. Default is `(4,)`.
+    verbose: bool, optional
+        If True (default), the runtime is printed.
+    progress: Callable, optional
+        Progress callback. Defaults to the callback of `spectral_cube`.
+    cancel_token: CancellationToken, optional
+        Cancellation token. Defaults to the token of `spectral_cube`.
+    roi: optional
+        Region of interest (see `SpectralCube`). If given, only its pixels
+        are processed and the maps are NaN elsewhere.
+    compact: bool, optional
+        If True and `roi` is given, the maps are `(N, 1)` batches in the
+        order of the region's pixels instead of full-size maps.
+
+    Returns
+    -------
+    sweep: ParameterSweep
+    """
+    thresholds = np.asarray(thresholds, dtype=np.float64)
+    window_sizes = np.asarray(window_sizes, dtype=np.int64)
+    fit_orders = np.asarray(fit_orders, dtype=np.int64)
+    if min(thresholds.size, window_sizes.size, fit_orders.size) == 0:
+        raise ValueError("Every setting needs at least one value.")
+    if np.any(window_sizes % 2 == 0) or np.any(window_sizes < 1):
+        raise ValueError(
+            f"Window sizes must be odd, got {window_sizes.tolist()}."
+        )
+
+    windows = [
+        AbsorptionWindow.from_range(
+            spectral_cube.wvl,
+            wvl_search_range,
+            fit_order,
+            spectral_cube.spec_res
+        )
+        for fit_order in fit_orders
+    ]
+    lo_idx, hi_idx, ncoef, _, matrix_offsets, *_ = pack_windows(windows)
+
+    cube = spectral_cube.cube
+    npixels = spectral_cube.npixels
+    if roi is not None:
+        roi = as_roi(cube.shape, roi)
+        cube = gather(cube, roi)
+        npixels = roi.size
+    mask = region_mask(spectral_cube.masked_pixels, roi)
+
+    with profile_step(
+        "Parameter sweep", npixels, verbose,
+        nsettings=thresholds.size * window_sizes.size * fit_orders.size
+    ):
+        data = run_in_chunks(
+            apply_parameter_sweep_over_cube,
+            cube,
+            np.asarray(spectral_cube.wvl, dtype=np.float64),
+            thresholds,
+            window_sizes,
+            int(lo_idx[0]),
+            int(hi_idx[0]),
+            ncoef,
+            matrix_offsets,
+            windows[0].wvl,
+            windows[0].spec_res,
+            np.concatenate([w.design.ravel() for w in windows]),
+            np.concatenate([w.projection.ravel() for w in windows]),
+            progress=(
+                spectral_cube.progress if progress is None else progress
+            ),
+            cancel_token=(
+                spectral_cube.cancel_token if cancel_token is None
+                else cancel_token
+            ),
+            step="Parameter sweep",
+            row_axis=4,
+            mask=mask
+        )
+    if roi is not None and not compact:
+        data = scatter(data, roi, axis=4)
+
+    return ParameterSweep(data, thresholds, window_sizes, fit_orders)
@@ -0,0 +1,170 @@
+# band_parameters/sweep_spectrum.py
+
+# External Imports
+import numpy as np
+from numba import njit
+
+# Local Imports
+from spectralops.smoothing import moving_average_nb
+from spectralops.continuum_removal import double_line_nb
+from spectralops.utils import fit_line
+from .calculate_parameters import calculate_band_parameters_nb
+from .calculate_parameters import PARAMETER_NAMES
+
+
+SWEEP_FIELDS = ("smoothing_rms", "fit_rms") + PARAMETER_NAMES
+
+
+@njit
+def _outlier_window(nbands: int) -> int:
+    """Moving average window used by `outlier_removal_nb`."""
+    r = round(nbands * 0.1, 0)
+    if r % 2 == 0:
+        if (nbands - r) != 0:
+            r = int(r + ((nbands - r) / abs(nbands - r)))
+        else:
+            r = int(r - 1)
+    else:
+        r = int(r)
+    return max(r, 3)
+
+
+@njit
+def _extend_spectrum(spectrum: np.ndarray, pad: int, ext: np.ndarray) -> None:
+    """
+    Writes `spectrum` into `ext` with `pad` bands linearly extrapolated on
+    each side, the same way as `moving_average_nb`.
+    """
+    nbands = spectrum.size
+    edge_length = int(np.maximum(round(nbands * 0.1, 0), 1))
+    left_idx = np.arange(0, 1 + edge_length)
+    right_idx = np.arange(nbands - edge_length, nbands)
+
+    ext[:pad] = fit_line(left_idx, spectrum[left_idx], np.arange(-pad, 0))
+    ext[pad:pad + nbands] = spectrum
+    ext[pad + nbands:pad + nbands + pad] = fit_line(
+        right_idx, spectrum[right_idx], np.arange(nbands, nbands + pad)
+    )
+
+
+@njit
+def sweep_spectrum_nb(
+    spectrum: np.ndarray,
+    wvl: np.ndarray,
+    thresholds: np.ndarray,
+    window_sizes: np.ndarray,
+    lo_idx: int,
+    hi_idx: int,
+    ncoef: np.ndarray,
+    matrix_offsets: np.ndarray,
+    window_wvl: np.ndarray,
+    window_res: np.ndarray,
+    design: np.ndarray,
+    projection: np.ndarray,
+    work: np.ndarray,
+    beta: np.ndarray,
+    fit: np.ndarray,
+    params: np.ndarray,
+    out: np.ndarray
+) -> None:
+    """
+    Runs outlier removal, moving average smoothing, continuum removal and
+    band parameter calculation for every combination of outlier threshold,
+    smoothing window and fit order, sharing work between settings.
+
+    - The outlier z-scores do not depend on the threshold, so they are
+      computed once.
+    - The smoothing windows are evaluated from one set of prefix sums per
+      threshold, so each window costs O(bands).
+    - Each fit order uses its precomputed projection.
+
+    Parameters
+    ----------
+    spectrum: np.ndarray
+        Single spectrum.
+    wvl: np.ndarray
+        Wavelengths of the spectrum.
+    thresholds: np.ndarray
+        Z-score thresholds of `outlier_removal_nb`.
+    window_sizes: np.ndarray
+        Odd window sizes of `moving_average_nb`.
+    lo_idx, hi_idx: int
+        Band indices bounding the absorption window.
+    ncoef, matrix_offsets: np.ndarray
+        Number of coefficients and offset into `design` and `projection` of
+        each fit order, as packed by `pack_windows`.
+    window_wvl, window_res: np.ndarray
+        Wavelengths and spectral resolution of the absorption window.
+    design, projection: np.ndarray
+        Flat packed design and projection matrices of every fit order.
+    work: np.ndarray
+        `(3, nbands + 2 * max(window_sizes) + 1)` work buffer.
+    beta, fit, params: np.ndarray
+        Work buffers of `calculate_band_parameters_nb`.
+    out: np.ndarray
+        `(nthresholds, nwindows, norders, len(SWEEP_FIELDS))` output.
+    """
+    nbands = spectrum.size
+    nwindow = hi_idx - lo_idx
+    pad = window_sizes.max()
+    ext = work[0, :nbands + 2 * pad]
+    csum = work[1, :nbands + 2 * pad + 1]
+    cleaned = work[2, :nbands]
+
+    mu0, sig0 = moving_average_nb(spectrum, _outlier_window(nbands))
+
+    for t in range(thresholds.size):
+        for n in range(nbands):
+            cleaned[n] = spectrum[n]
+            if np.abs((spectrum[n] - mu0[n]) / sig0[n]) > thresholds[t]:
+                left = spectrum[n - 1] if n > 0 else np.nan
+                right = spectrum[n + 1] if n < nbands - 1 else np.nan
+                if np.isnan(left):
+                    cleaned[n] = right
+                elif np.isnan(right):
+                    cleaned[n] = left
+                else:
+                    cleaned[n] = (left + right) / 2
+
+        _extend_spectrum(cleaned, pad, ext)
+        csum[0] = 0.0
+        for k in range(ext.size):
+            csum[k + 1] = csum[k] + ext[k]
+
+        for w in range(window_sizes.size):
+            window_size = window_sizes[w]
+            half = window_size // 2
+            smoothed = np.empty(nbands)
+            resid = 0.0
+            for n in range(nbands):
+                smoothed[n] = (
+                    csum[pad + n + half + 1] - csum[pad + n - half]
+                ) / window_size
+                resid += (cleaned[n] - smoothed[n]) ** 2
+            smoothing_rms = np.sqrt(resid / nbands)
+
+            contrem, _ = double_line_nb(smoothed, wvl)
+
+            for o in range(ncoef.size):
+                m0 = matrix_offsets[o]
+                m1 = m0 + nwindow * ncoef[o]
+                calculate_band_parameters_nb(
+                    contrem,
+                    lo_idx,
+                    hi_idx,
+                    window_wvl,
+                    window_res,
+                    design[m0:m1].reshape((nwindow, ncoef[o])),
+                    projection[m0:m1].reshape((ncoef[o], nwindow)),
+                    beta,
+                    fit,
+                    params
+                )
+                fit_resid = 0.0
+                for k in range(nwindow):
+                    fit_resid += (contrem[lo_idx + k] - fit[k]) ** 2
+
+                out[t, w, o, 0] = smoothing_rms
+                out[t, w, o, 1] = np.sqrt(fit_resid / nwindow)
+                for k in range(params.size):
+                    out[t, w, o, 2 + k] = params[k]
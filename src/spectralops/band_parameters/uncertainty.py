@@ -0,0 +1,110 @@
+# band_parameters/uncertainty.py
+
+# External Imports
+import numpy as np
+from numba import njit
+
+# Local Imports
+from spectralops.continuum_removal import double_line_nb
+from .calculate_parameters import calculate_band_parameters_nb
+
+
+@njit
+def splitmix64(x: np.uint64) -> np.uint64:
+    """SplitMix64 hash, used as a counter-based random number generator."""
+    x = x + np.uint64(0x9E3779B97F4A7C15)
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+    return x ^ (x >> np.uint64(31))
+
+
+@njit
+def _uniform(key: np.uint64, counter: np.uint64) -> float:
+    """Uniform double in (0, 1] for a key and counter."""
+    bits = splitmix64(key ^ splitmix64(counter)) >> np.uint64(11)
+    return (float(bits) + 1.0) / 9007199254740992.0
+
+
+@njit
+def standard_normal(key: np.uint64, counter: np.uint64) -> float:
+    """
+    Standard normal draw for a key and counter (Box-Muller). The same key
+    and counter always give the same value, on any thread.
+    """
+    u1 = _uniform(key, np.uint64(2) * counter)
+    u2 = _uniform(key, np.uint64(2) * counter + np.uint64(1))
+    return np.sqrt(-2.0 * np.log(u1)) * np.cos(2.0 * np.pi * u2)
+
+
+@njit
+def monte_carlo_parameters_nb(
+    smoothed: np.ndarray,
+    err: np.ndarray,
+    wvl: np.ndarray,
+    key: np.uint64,
+    n_draws: int,
+    lo_idx: int,
+    hi_idx: int,
+    window_wvl: np.ndarray,
+    window_res: np.ndarray,
+    design: np.ndarray,
+    projection: np.ndarray,
+    realization: np.ndarray,
+    beta: np.ndarray,
+    fit: np.ndarray,
+    params: np.ndarray,
+    count: np.ndarray,
+    mean: np.ndarray,
+    m2: np.ndarray
+) -> None:
+    """
+    Propagates per-band uncertainty to band parameters by Monte Carlo.
+
+    Each draw perturbs `smoothed` by independent normal noise with standard
+    deviation `err`, then removes the continuum and calculates the band
+    parameters. Draws are reduced with Welford's streaming mean and
+    variance, so they are never stored. NaN parameters (e.g. a center on the
+    window edge) are left out of the statistics.
+
+    Parameters
+    ----------
+    smoothed, err: np.ndarray
+        Smoothed spectrum and its per-band standard deviation.
+    wvl: np.ndarray
+        Wavelengths of the spectrum.
+    key: np.uint64
+        Random key of the pixel.
+    n_draws: int
+        Number of realizations.
+    lo_idx, hi_idx, window_wvl, window_res, design, projection
+        Absorption window, see `calculate_band_parameters_nb`.
+    realization, beta, fit, params: np.ndarray
+        Work buffers.
+    count, mean, m2: np.ndarray
+        Outputs: number of finite draws, mean and sum of squared
+        deviations of each parameter.
+    """
+    nbands = smoothed.size
+    count[:] = 0
+    mean[:] = 0.0
+    m2[:] = 0.0
+
+    for d in range(n_draws):
+        for b in range(nbands):
+            z = standard_normal(key, np.uint64(d * nbands + b))
+            realization[b] = smoothed[b] + err[b] * z
+
+        contrem, _ = double_line_nb(realization, wvl)
+        calculate_band_parameters_nb(
+            contrem, lo_idx, hi_idx, window_wvl, window_res, design,
+            projection, beta, fit, params
+        )
+
+        for k in range(params.size):
+            value = params[k]
+            if np.isnan(value):
+                continue
+            count[k] += 1
+            delta = value - mean[k]
+            mean[k] += delta / count[k]
+            m2[k] += delta * (value - mean[k])
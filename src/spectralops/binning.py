@@ -0,0 +1,143 @@
+# binning.py
+
+"""
+Bad-band exclusion and spectral binning.
+
+Bands are reduced in one pass: the bands kept after removing bad bands are
+split into groups of adjacent bands, and every group is averaged into one
+output band. Groups are stored in CSR form, `bands[offsets[g]:offsets[g +
+1]]` being the input bands of output band `g`. Groups never span removed
+bands, so every output band averages bands that were adjacent in the
+original spectrum.
+"""
+
+# Standard Libraries
+from typing import Optional, Sequence, Tuple, Union
+
+# External Imports
+import numpy as np
+from numba import njit
+
+
+BandSelection = Union[np.ndarray, Sequence[int]]
+
+
+@njit
+def bin_bands_nb(
+    spectrum: np.ndarray,
+    bands: np.ndarray,
+    offsets: np.ndarray,
+    out: np.ndarray
+) -> None:
+    """
+    Averages groups of bands of a spectrum.
+
+    Parameters
+    ----------
+    spectrum: np.ndarray
+        Single spectrum.
+    bands: np.ndarray
+        Input band of every group member, grouped in order.
+    offsets: np.ndarray
+        `(ngroups + 1,)` start of every group in `bands`.
+    out: np.ndarray
+        `(ngroups,)` output for the group means.
+    """
+    for g in range(offsets.size - 1):
+        acc = 0.0
+        for k in range(offsets[g], offsets[g + 1]):
+            acc += spectrum[bands[k]]
+        out[g] = acc / (offsets[g + 1] - offsets[g])
+
+
+def band_groups(
+    wvl: np.ndarray,
+    bin_size: int = 1,
+    bad_bands: Optional[BandSelection] = None,
+    bad_ranges: Optional[Sequence[Tuple[float, float]]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Groups of bands to average, after removing bad bands.
+
+    Parameters
+    ----------
+    wvl: np.ndarray
+        Wavelengths of the bands.
+    bin_size: int, optional
+        Number of adjacent bands averaged into one. The last group of every
+        run of kept bands may be smaller. Default is 1 (no binning).
+    bad_bands: np.ndarray or Sequence[int], optional
+        Bands to remove, as band indices or a boolean array that is True
+        for bad bands.
+    bad_ranges: Sequence[tuple[float, float]], optional
+        Wavelength ranges `(lo, hi)` to remove, e.g. atmospheric water
+        absorptions. Both ends are included.
+
+    Returns
+    -------
+    bands, offsets: np.ndarray
+        Group members and CSR offsets, see `bin_bands_nb`.
+    """
+    if bin_size < 1:
+        raise ValueError(f"Bin size must be at least 1, got {bin_size}.")
+
+    wvl = np.asarray(wvl)
+    good = np.ones(wvl.size, dtype=bool)
+    if bad_bands is not None:
+        bad_bands = np.asarray(bad_bands)
+        if bad_bands.dtype == bool:
+            if bad_bands.size != wvl.size:
+                raise ValueError(
+                    f"Bad band mask has {bad_bands.size} values for "
+                    f"{wvl.size} bands."
+                )
+            good &= ~bad_bands
+        else:
+            good[bad_bands.astype(np.intp)] = False
+    for lo, hi in bad_ranges or ():
+        good &= (wvl < lo) | (wvl > hi)
+
+    bands = np.flatnonzero(good)
+    if bands.size == 0:
+        raise ValueError("Every band is excluded.")
+
+    # Runs of adjacent kept bands, each split into bins of `bin_size`.
+    run_start = np.ones(bands.size, dtype=bool)
+    run_start[1:] = np.diff(bands) > 1
+    run_id = np.cumsum(run_start) - 1
+    position = np.arange(bands.size) - np.flatnonzero(run_start)[run_id]
+    group_start = run_start | (position % bin_size == 0)
+
+    offsets = np.append(np.flatnonzero(group_start), bands.size)
+    return bands.astype(np.int64), offsets.astype(np.int64)
+
+
+def binned_wavelengths(
+    wvl: np.ndarray,
+    bands: np.ndarray,
+    offsets: np.ndarray
+) -> np.ndarray:
+    """Mean wavelength of every group."""
+    members = np.asarray(wvl, dtype=np.float64)[bands]
+    return np.add.reduceat(members, offsets[:-1]) / np.diff(offsets)
+
+
+def binned_resolution(
+    wvl: np.ndarray,
+    spectral_resolution: Union[np.ndarray, float],
+    bands: np.ndarray,
+    offsets: np.ndarray
+) -> np.ndarray:
+    """
+    Spectral resolution of every group: the wavelength span of its members
+    plus their mean resolution, which is the resolution itself for groups
+    of one band.
+    """
+    wvl = np.asarray(wvl, dtype=np.float64)
+    resolution = np.broadcast_to(
+        np.asarray(spectral_resolution, dtype=np.float64), wvl.shape
+    )
+    first = bands[offsets[:-1]]
+    last = bands[offsets[1:] - 1]
+    mean = np.add.reduceat(resolution[bands], offsets[:-1]) / np.diff(offsets)
+    return np.abs(wvl[last] - wvl[first]) + mean
@@ -6,11 +6,42 @@ from numba import njit, prange
 
 from spectralops.smoothing import outlier_removal_nb
 from spectralops.smoothing import moving_average_nb
+from spectralops.smoothing import savitzky_golay_nb
+from spectralops.smoothing import hampel_filter_nb
 from spectralops.continuum_removal import double_line_nb
+from spectralops.binning import bin_bands_nb
+from spectralops.derivatives import (
+    finite_difference_nb,
+    savgol_derivative_nb,
+    count_extrema_nb,
+    find_extrema_nb
+)
 from spectralops.band_parameters.calculate_area import calculate_area
-
-
-@njit(parallel=True)
+from spectralops.band_parameters.calculate_parameters import (
+    calculate_band_parameters_nb,
+    calculate_weighted_band_parameters_nb,
+    PARAMETER_NAMES
+)
+from spectralops.band_parameters.uncertainty import (
+    monte_carlo_parameters_nb,
+    splitmix64
+)
+from spectralops.band_parameters.detect_bands import (
+    count_bands_nb,
+    detect_bands_nb,
+    BAND_FIELDS
+)
+from spectralops.band_parameters.sweep_spectrum import (
+    sweep_spectrum_nb,
+    SWEEP_FIELDS
+)
+
+NPARAMETERS = len(PARAMETER_NAMES)
+NSWEEP_FIELDS = len(SWEEP_FIELDS)
+NBAND_FIELDS = len(BAND_FIELDS)
+
+
+@njit(parallel=True, nogil=True)
 def apply_over_cube(cube, func, output_size, *args) -> np.ndarray:
     """
     Applies a spectral processing function over an entire cube.
@@ -58,8 +89,8 @@ def apply_over_cube(cube, func, output_size, *args) -> np.ndarray:
     return analysis_result
 
 
-@njit(parallel=True)
-def apply_remove_outliers_over_cube(cube):
+@njit(parallel=True, nogil=True)
+def apply_remove_outliers_over_cube(cube, threshold=2):
     """Applies remove_outliers function"""
     xsize, ysize, nbands = cube.shape
 
@@ -73,14 +104,38 @@ def apply_remove_outliers_over_cube(cube):
                 for k in range(nbands):
                     analysis_result[i, j, k] = np.nan
             else:
-                result = outlier_removal_nb(cube[i, j, :])
+                result = outlier_removal_nb(cube[i, j, :], threshold)
                 analysis_result[i, j, :] = result
 
     return analysis_result
 
 
-@njit(parallel=True)
-def apply_smoothing_over_cube(cube):
+@njit(parallel=True, nogil=True)
+def apply_hampel_over_cube(cube, window_size=7, threshold=3):
+    """Applies hampel_filter_nb function"""
+    xsize, ysize, nbands = cube.shape
+
+    analysis_result = np.empty(
+        (xsize, ysize, nbands), dtype=cube.dtype
+    )
+
+    for i in prange(xsize):
+        buf = np.empty(2 * (window_size // 2) + 1)
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                for k in range(nbands):
+                    analysis_result[i, j, k] = np.nan
+            else:
+                hampel_filter_nb(
+                    cube[i, j, :], analysis_result[i, j, :], buf,
+                    window_size, threshold
+                )
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_smoothing_over_cube(cube, window_size=5):
     """Applies moving_average_nb function"""
     xsize, ysize, nbands = cube.shape
 
@@ -94,14 +149,167 @@ def apply_smoothing_over_cube(cube):
                 for k in range(nbands):
                     analysis_result[i, j, k] = np.nan
             else:
-                result = moving_average_nb(cube[i, j, :])
+                result = moving_average_nb(cube[i, j, :], window_size)
+                analysis_result[i, j, :, 0] = result[0]
+                analysis_result[i, j, :, 1] = result[1]
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_savitzky_golay_over_cube(cube, coeffs):
+    """Applies savitzky_golay_nb function"""
+    xsize, ysize, nbands = cube.shape
+
+    analysis_result = np.empty(
+        (xsize, ysize, nbands, 2), dtype=cube.dtype
+    )
+
+    for i in prange(xsize):
+        for j in prange(ysize):
+            if np.isnan(cube[i, j, 0]):
+                for k in range(nbands):
+                    analysis_result[i, j, k] = np.nan
+            else:
+                result = savitzky_golay_nb(cube[i, j, :], coeffs)
                 analysis_result[i, j, :, 0] = result[0]
                 analysis_result[i, j, :, 1] = result[1]
 
     return analysis_result
 
 
-@njit(parallel=True)
+@njit(parallel=True, nogil=True)
+def apply_bin_bands_over_cube(cube, bands, offsets):
+    """
+    Applies bin_bands_nb function. Returns the float64 binned cube,
+    `(xsize, ysize, ngroups)`. Pixels are skipped if their first kept band
+    is NaN, since bad bands are often NaN everywhere.
+    """
+    xsize, ysize, _ = cube.shape
+    ngroups = offsets.size - 1
+
+    # Means of integer cubes (e.g. int16 reflectance) are not integers.
+    analysis_result = np.empty((xsize, ysize, ngroups), dtype=np.float64)
+
+    for i in prange(xsize):
+        out = np.empty(ngroups)
+        for j in range(ysize):
+            if np.isnan(cube[i, j, bands[0]]):
+                analysis_result[i, j] = np.nan
+            else:
+                bin_bands_nb(cube[i, j, :], bands, offsets, out)
+                analysis_result[i, j] = out
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_finite_difference_over_cube(cube, wvl):
+    """
+    Applies finite_difference_nb function. Returns the first and second
+    derivatives, `(xsize, ysize, nbands, 2)`.
+    """
+    xsize, ysize, nbands = cube.shape
+
+    analysis_result = np.empty(
+        (xsize, ysize, nbands, 2), dtype=cube.dtype
+    )
+
+    for i in prange(xsize):
+        out = np.empty((nbands, 2))
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                analysis_result[i, j] = np.nan
+            else:
+                finite_difference_nb(cube[i, j, :], wvl, out)
+                analysis_result[i, j] = out
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_savgol_derivative_over_cube(cube, coeffs, wvl_derivs):
+    """
+    Applies savgol_derivative_nb function. Returns the first and second
+    derivatives, `(xsize, ysize, nbands, 2)`.
+    """
+    xsize, ysize, nbands = cube.shape
+
+    analysis_result = np.empty(
+        (xsize, ysize, nbands, 2), dtype=cube.dtype
+    )
+
+    for i in prange(xsize):
+        out = np.empty((nbands, 2))
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                analysis_result[i, j] = np.nan
+            else:
+                savgol_derivative_nb(cube[i, j, :], coeffs, wvl_derivs, out)
+                analysis_result[i, j] = out
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_count_extrema_over_cube(first, second):
+    """
+    Applies count_extrema_nb function to derivative cubes. Returns the
+    number of minima and inflection points of every pixel,
+    `(2, xsize, ysize)`.
+    """
+    xsize, ysize, nbands = first.shape
+
+    counts = np.zeros((2, xsize, ysize), dtype=np.int64)
+
+    for i in prange(xsize):
+        for j in range(ysize):
+            if not np.isnan(first[i, j, 0]):
+                counts[0, i, j], counts[1, i, j] = count_extrema_nb(
+                    first[i, j, :], second[i, j, :]
+                )
+
+    return counts
+
+
+@njit(parallel=True, nogil=True)
+def apply_find_extrema_over_cube(
+    first,
+    second,
+    minima_offsets,
+    inflection_offsets
+):
+    """
+    Applies find_extrema_nb function to derivative cubes, filling flat band
+    index arrays at the CSR offsets built from
+    `apply_count_extrema_over_cube`. Returns the minima and inflection point
+    indices. Pixels without entries (e.g. masked pixels) are skipped.
+    """
+    xsize, ysize, nbands = first.shape
+
+    minima = np.empty(minima_offsets[-1], dtype=np.int32)
+    inflections = np.empty(inflection_offsets[-1], dtype=np.int32)
+
+    for i in prange(xsize):
+        for j in range(ysize):
+            p = i * ysize + j
+            empty = (
+                minima_offsets[p + 1] == minima_offsets[p]
+                and inflection_offsets[p + 1] == inflection_offsets[p]
+            )
+            if empty or np.isnan(first[i, j, 0]):
+                continue
+            find_extrema_nb(
+                first[i, j, :],
+                second[i, j, :],
+                minima[minima_offsets[p]:minima_offsets[p + 1]],
+                inflections[inflection_offsets[p]:inflection_offsets[p + 1]]
+            )
+
+    return minima, inflections
+
+
+@njit(parallel=True, nogil=True)
 def apply_continuum_removal_over_cube(cube, wvls):
     """Applies double_line_nb function"""
     xsize, ysize, nbands = cube.shape
@@ -123,7 +331,7 @@ def apply_continuum_removal_over_cube(cube, wvls):
     return analysis_result
 
 
-@njit(parallel=True)
+@njit(parallel=True, nogil=True)
 def apply_polyfit_over_cube(cube, X, Xt, XtX):
     """Applies polynomial absorption fitting function"""
     xsize, ysize, nbands = cube.shape
@@ -146,7 +354,7 @@ def apply_polyfit_over_cube(cube, X, Xt, XtX):
     return analysis_result
 
 
-@njit(parallel=True)
+@njit(parallel=True, nogil=True)
 def apply_calculate_area_over_cube(
     cube,
     wvls,
@@ -171,3 +379,310 @@ def apply_calculate_area_over_cube(
                 )
 
     return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_band_parameters_over_cube(
+    cube,
+    lo_idx,
+    hi_idx,
+    window_wvl,
+    window_res,
+    design,
+    projection
+):
+    """
+    Applies calculate_band_parameters_nb function. Returns one 2-D map per
+    band parameter, `(len(PARAMETER_NAMES), xsize, ysize)`.
+    """
+    xsize, ysize, nbands = cube.shape
+
+    analysis_result = np.empty(
+        (NPARAMETERS, xsize, ysize), dtype=cube.dtype
+    )
+
+    for i in prange(xsize):
+        beta = np.empty(projection.shape[0])
+        fit = np.empty(projection.shape[1])
+        params = np.empty(NPARAMETERS)
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                for k in range(NPARAMETERS):
+                    analysis_result[k, i, j] = np.nan
+            else:
+                calculate_band_parameters_nb(
+                    cube[i, j, :], lo_idx, hi_idx, window_wvl, window_res,
+                    design, projection, beta, fit, params
+                )
+                for k in range(NPARAMETERS):
+                    analysis_result[k, i, j] = params[k]
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_weighted_band_parameters_over_cube(
+    cube,
+    err,
+    continuum,
+    lo_idx,
+    hi_idx,
+    window_wvl,
+    window_res,
+    design,
+    projection,
+    row0=0
+):
+    """
+    Applies calculate_weighted_band_parameters_nb function. `err` and
+    `continuum` cover the whole cube and `row0` is the cube's first row in
+    them. Returns `(len(PARAMETER_NAMES), xsize, ysize)`.
+    """
+    xsize, ysize, nbands = cube.shape
+    ncoef = projection.shape[0]
+
+    analysis_result = np.empty(
+        (NPARAMETERS, xsize, ysize), dtype=cube.dtype
+    )
+
+    for i in prange(xsize):
+        moments = np.empty(2 * ncoef - 1)
+        normal = np.empty((ncoef, ncoef))
+        beta = np.empty(ncoef)
+        fit = np.empty(projection.shape[1])
+        params = np.empty(NPARAMETERS)
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                for k in range(NPARAMETERS):
+                    analysis_result[k, i, j] = np.nan
+            else:
+                calculate_weighted_band_parameters_nb(
+                    cube[i, j, :], err[row0 + i, j, :],
+                    continuum[row0 + i, j, :], lo_idx, hi_idx, window_wvl,
+                    window_res, design, projection, moments, normal, beta, fit,
+                    params
+                )
+                for k in range(NPARAMETERS):
+                    analysis_result[k, i, j] = params[k]
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_feature_sweep_over_cube(
+    cube,
+    lo_idx,
+    hi_idx,
+    ncoef,
+    window_offsets,
+    matrix_offsets,
+    window_wvl,
+    window_res,
+    design,
+    projection
+):
+    """
+    Applies calculate_band_parameters_nb for several absorption windows in
+    one pass over the cube. Window data is packed into flat arrays indexed by
+    `window_offsets` (per band) and `matrix_offsets` (per matrix element).
+    Returns `(nfeatures, len(PARAMETER_NAMES), xsize, ysize)`.
+    """
+    xsize, ysize, nbands = cube.shape
+    nfeatures = lo_idx.size
+
+    analysis_result = np.empty(
+        (nfeatures, NPARAMETERS, xsize, ysize), dtype=cube.dtype
+    )
+
+    for i in prange(xsize):
+        beta = np.empty(ncoef.max())
+        fit = np.empty((hi_idx - lo_idx).max())
+        params = np.empty(NPARAMETERS)
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                for f in range(nfeatures):
+                    for k in range(NPARAMETERS):
+                        analysis_result[f, k, i, j] = np.nan
+                continue
+
+            spectrum = cube[i, j, :]
+            for f in range(nfeatures):
+                nwindow = hi_idx[f] - lo_idx[f]
+                w0 = window_offsets[f]
+                m0 = matrix_offsets[f]
+                m1 = m0 + nwindow * ncoef[f]
+                calculate_band_parameters_nb(
+                    spectrum,
+                    lo_idx[f],
+                    hi_idx[f],
+                    window_wvl[w0:w0 + nwindow],
+                    window_res[w0:w0 + nwindow],
+                    design[m0:m1].reshape((nwindow, ncoef[f])),
+                    projection[m0:m1].reshape((ncoef[f], nwindow)),
+                    beta,
+                    fit,
+                    params
+                )
+                for k in range(NPARAMETERS):
+                    analysis_result[f, k, i, j] = params[k]
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_parameter_sweep_over_cube(
+    cube,
+    wvl,
+    thresholds,
+    window_sizes,
+    lo_idx,
+    hi_idx,
+    ncoef,
+    matrix_offsets,
+    window_wvl,
+    window_res,
+    design,
+    projection
+):
+    """
+    Applies sweep_spectrum_nb function. Returns
+    `(nthresholds, nwindows, norders, len(SWEEP_FIELDS), xsize, ysize)`.
+    """
+    xsize, ysize, nbands = cube.shape
+    nt = thresholds.size
+    nw = window_sizes.size
+    no = ncoef.size
+    pad = window_sizes.max()
+
+    analysis_result = np.empty(
+        (nt, nw, no, NSWEEP_FIELDS, xsize, ysize), dtype=cube.dtype
+    )
+
+    for i in prange(xsize):
+        work = np.empty((3, nbands + 2 * pad + 1))
+        beta = np.empty(ncoef.max())
+        fit = np.empty(hi_idx - lo_idx)
+        params = np.empty(NPARAMETERS)
+        out = np.empty((nt, nw, no, NSWEEP_FIELDS))
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                analysis_result[:, :, :, :, i, j] = np.nan
+            else:
+                sweep_spectrum_nb(
+                    cube[i, j, :], wvl, thresholds, window_sizes, lo_idx,
+                    hi_idx, ncoef, matrix_offsets, window_wvl, window_res,
+                    design, projection, work, beta, fit, params, out
+                )
+                analysis_result[:, :, :, :, i, j] = out
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_monte_carlo_over_cube(
+    cube,
+    err,
+    pixel_ids,
+    wvl,
+    seed,
+    n_draws,
+    lo_idx,
+    hi_idx,
+    window_wvl,
+    window_res,
+    design,
+    projection,
+    row0=0
+):
+    """
+    Applies monte_carlo_parameters_nb function to a smoothed cube. `err` and
+    `pixel_ids` cover the whole cube and `row0` is the cube's first row in
+    them. Returns the mean and standard deviation of every band parameter,
+    `(2, len(PARAMETER_NAMES), xsize, ysize)`.
+    """
+    xsize, ysize, nbands = cube.shape
+
+    analysis_result = np.empty(
+        (2, NPARAMETERS, xsize, ysize), dtype=cube.dtype
+    )
+    seed_key = splitmix64(np.uint64(seed))
+
+    for i in prange(xsize):
+        realization = np.empty(nbands)
+        beta = np.empty(projection.shape[0])
+        fit = np.empty(projection.shape[1])
+        params = np.empty(NPARAMETERS)
+        count = np.empty(NPARAMETERS, dtype=np.int64)
+        mean = np.empty(NPARAMETERS)
+        m2 = np.empty(NPARAMETERS)
+        for j in range(ysize):
+            if np.isnan(cube[i, j, 0]):
+                analysis_result[:, :, i, j] = np.nan
+                continue
+
+            key = splitmix64(seed_key ^ np.uint64(pixel_ids[row0 + i, j]))
+            monte_carlo_parameters_nb(
+                cube[i, j, :], err[row0 + i, j, :], wvl, key, n_draws,
+                lo_idx, hi_idx, window_wvl, window_res, design, projection,
+                realization, beta, fit, params, count, mean, m2
+            )
+            for k in range(NPARAMETERS):
+                if count[k] < 2:
+                    analysis_result[0, k, i, j] = np.nan
+                    analysis_result[1, k, i, j] = np.nan
+                else:
+                    analysis_result[0, k, i, j] = mean[k]
+                    analysis_result[1, k, i, j] = np.sqrt(
+                        m2[k] / (count[k] - 1)
+                    )
+
+    return analysis_result
+
+
+@njit(parallel=True, nogil=True)
+def apply_count_bands_over_cube(cube, min_depth, min_prominence):
+    """
+    Applies count_bands_nb function to a continuum-removed cube. Returns the
+    number of detected bands of every pixel, `(xsize, ysize)`.
+    """
+    xsize, ysize, nbands = cube.shape
+
+    counts = np.zeros((xsize, ysize), dtype=np.int64)
+
+    for i in prange(xsize):
+        for j in range(ysize):
+            if not np.isnan(cube[i, j, 0]):
+                counts[i, j] = count_bands_nb(
+                    cube[i, j, :], min_depth, min_prominence
+                )
+
+    return counts
+
+
+@njit(parallel=True, nogil=True)
+def apply_detect_bands_over_cube(
+    cube,
+    wvl,
+    min_depth,
+    min_prominence,
+    offsets
+):
+    """
+    Applies detect_bands_nb function to a continuum-removed cube, writing
+    the bands of every pixel at the CSR offsets built from
+    `apply_count_bands_over_cube`. Returns `(len(BAND_FIELDS), nbands)`.
+    """
+    xsize, ysize, nbands = cube.shape
+
+    analysis_result = np.empty((NBAND_FIELDS, offsets[-1]))
+
+    for i in prange(xsize):
+        for j in range(ysize):
+            p = i * ysize + j
+            if offsets[p + 1] > offsets[p]:
+                detect_bands_nb(
+                    cube[i, j, :], wvl, min_depth, min_prominence,
+                    analysis_result[:, offsets[p]:offsets[p + 1]]
+                )
+
+    return analysis_result
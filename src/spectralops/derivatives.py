@@ -0,0 +1,249 @@
+# derivatives.py
+
+"""
+Spectral derivatives and local extrema.
+
+First and second derivatives with respect to wavelength are computed either
+by finite differences (for spectra that are already smooth) or with
+Savitzky-Golay derivative filters, which smooth and differentiate in the
+same pass over the window. Local minima and inflection points are found
+from sign changes of the derivatives.
+"""
+
+# External Imports
+import numpy as np
+from numba import njit
+
+# Local Imports
+from spectralops.smoothing import savgol_coefficients
+from spectralops.utils import get_options_errors, round_to_odd
+
+
+DERIVATIVE_METHODS = ("finite_difference", "savitzky_golay")
+
+
+@njit
+def finite_difference_nb(
+    spectrum: np.ndarray,
+    wvl: np.ndarray,
+    out: np.ndarray
+) -> None:
+    """
+    First and second derivatives of a spectrum with respect to wavelength
+    by finite differences.
+
+    Interior bands use three-point differences, which are second-order
+    accurate on unevenly spaced wavelengths and match `np.gradient`. The
+    first derivative uses one-sided differences at the ends and the second
+    derivative repeats its neighbor.
+
+    Parameters
+    ----------
+    spectrum: np.ndarray
+        Single spectrum with at least three bands.
+    wvl: np.ndarray
+        Wavelengths of the spectrum.
+    out: np.ndarray
+        `(nbands, 2)` output for the first and second derivatives.
+    """
+    nbands = spectrum.size
+    for n in range(1, nbands - 1):
+        h0 = wvl[n] - wvl[n - 1]
+        h1 = wvl[n + 1] - wvl[n]
+        s0 = (spectrum[n] - spectrum[n - 1]) / h0
+        s1 = (spectrum[n + 1] - spectrum[n]) / h1
+        out[n, 0] = (h1 * s0 + h0 * s1) / (h0 + h1)
+        out[n, 1] = 2 * (s1 - s0) / (h0 + h1)
+
+    out[0, 0] = (spectrum[1] - spectrum[0]) / (wvl[1] - wvl[0])
+    out[nbands - 1, 0] = (
+        (spectrum[nbands - 1] - spectrum[nbands - 2])
+        / (wvl[nbands - 1] - wvl[nbands - 2])
+    )
+    out[0, 1] = out[1, 1]
+    out[nbands - 1, 1] = out[nbands - 2, 1]
+
+
+@njit
+def savgol_derivative_nb(
+    spectrum: np.ndarray,
+    coeffs: np.ndarray,
+    wvl_derivs: np.ndarray,
+    out: np.ndarray
+) -> None:
+    """
+    First and second derivatives of a spectrum with respect to wavelength
+    from Savitzky-Golay derivative filters.
+
+    Both filters are evaluated in the same pass over each window, with the
+    edge rows of the coefficients at the ends of the spectrum as in
+    `savitzky_golay_nb`. Per-band derivatives are converted to wavelength
+    units with the chain rule, so smoothly varying band spacing is handled.
+
+    Parameters
+    ----------
+    spectrum: np.ndarray
+        Single spectrum. Must have at least as many bands as the window.
+    coeffs: np.ndarray
+        `(2, window_size, window_size)` coefficients of the first and
+        second derivative from `savgol_coefficients`.
+    wvl_derivs: np.ndarray
+        `(nbands, 2)` first and second derivatives of the wavelengths with
+        respect to band index, see `wavelength_derivatives`.
+    out: np.ndarray
+        `(nbands, 2)` output for the first and second derivatives.
+    """
+    nbands = spectrum.size
+    window_size = coeffs.shape[1]
+    half = window_size // 2
+
+    for n in range(nbands):
+        if n < half:
+            row = n
+            start = 0
+        elif n >= nbands - half:
+            row = window_size - (nbands - n)
+            start = nbands - window_size
+        else:
+            row = half
+            start = n - half
+        d1 = 0.0
+        d2 = 0.0
+        for k in range(window_size):
+            value = spectrum[start + k]
+            d1 += coeffs[0, row, k] * value
+            d2 += coeffs[1, row, k] * value
+
+        dwvl = wvl_derivs[n, 0]
+        first = d1 / dwvl
+        out[n, 0] = first
+        out[n, 1] = (d2 - first * wvl_derivs[n, 1]) / (dwvl * dwvl)
+
+
+def wavelength_derivatives(wvl: np.ndarray, coeffs: np.ndarray) -> np.ndarray:
+    """
+    First and second derivatives of the wavelengths with respect to band
+    index, evaluated with the same filters as the spectra.
+
+    Returns
+    -------
+    wvl_derivs: np.ndarray
+        `(nbands, 2)` array for `savgol_derivative_nb`.
+    """
+    wvl_derivs = np.empty((wvl.size, 2))
+    # Unit band spacing leaves the per-band derivatives unchanged.
+    identity = np.zeros((wvl.size, 2))
+    identity[:, 0] = 1.0
+    savgol_derivative_nb(
+        np.ascontiguousarray(wvl, dtype=np.float64), coeffs, identity,
+        wvl_derivs
+    )
+    return wvl_derivs
+
+
+def derivative_coefficients(window_size: int, polyorder: int) -> np.ndarray:
+    """
+    Stacked first and second derivative Savitzky-Golay coefficients, as
+    used by `savgol_derivative_nb`. Even sizes are rounded to odd.
+    """
+    window_size = round_to_odd(window_size)
+    return np.stack([
+        savgol_coefficients(window_size, polyorder, deriv)
+        for deriv in (1, 2)
+    ])
+
+
+def spectral_derivatives(
+    spectrum: np.ndarray,
+    wvl: np.ndarray,
+    method: str = "savitzky_golay",
+    window_size: int = 5,
+    polyorder: int = 2
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    First and second derivatives of a spectrum with respect to wavelength.
+
+    Parameters
+    ----------
+    spectrum: np.ndarray
+        Single spectrum.
+    wvl: np.ndarray
+        Wavelengths of the spectrum.
+    method: str, optional
+        `"savitzky_golay"` (default) or `"finite_difference"`.
+    window_size, polyorder: int, optional
+        Savitzky-Golay window and polynomial order. Defaults are 5 and 2.
+
+    Returns
+    -------
+    first, second: np.ndarray
+        Derivatives at every band.
+    """
+    spectrum = np.ascontiguousarray(spectrum, dtype=np.float64)
+    out = np.empty((spectrum.size, 2))
+    if method == "finite_difference":
+        finite_difference_nb(spectrum, np.asarray(wvl, dtype=float), out)
+    elif method == "savitzky_golay":
+        coeffs = derivative_coefficients(window_size, polyorder)
+        if coeffs.shape[1] > spectrum.size:
+            raise ValueError(
+                f"Window size ({coeffs.shape[1]}) is larger than the "
+                f"spectrum ({spectrum.size} bands)."
+            )
+        savgol_derivative_nb(
+            spectrum, coeffs, wavelength_derivatives(wvl, coeffs), out
+        )
+    else:
+        raise ValueError(
+            get_options_errors(method, DERIVATIVE_METHODS, "derivative method")
+        )
+    return out[:, 0], out[:, 1]
+
+
+@njit
+def count_extrema_nb(first: np.ndarray, second: np.ndarray) -> tuple[int, int]:
+    """
+    Counts the local minima (first derivative turning from negative to
+    non-negative) and inflection points (second derivative changing sign)
+    of a spectrum.
+
+    Parameters
+    ----------
+    first, second: np.ndarray
+        First and second derivatives of the spectrum.
+    """
+    nminima = 0
+    ninflections = 0
+    for n in range(1, first.size):
+        if first[n - 1] < 0 and first[n] >= 0:
+            nminima += 1
+        if (second[n - 1] < 0) != (second[n] < 0):
+            ninflections += 1
+    return nminima, ninflections
+
+
+@njit
+def find_extrema_nb(
+    first: np.ndarray,
+    second: np.ndarray,
+    minima: np.ndarray,
+    inflections: np.ndarray
+) -> None:
+    """
+    Writes the band indices of the local minima and inflection points of a
+    spectrum, in the order counted by `count_extrema_nb`. Each is placed on
+    whichever of the two bands around the sign change has the derivative
+    closest to zero.
+    """
+    m = 0
+    f = 0
+    for n in range(1, first.size):
+        if first[n - 1] < 0 and first[n] >= 0:
+            minima[m] = n - 1 if -first[n - 1] < first[n] else n
+            m += 1
+        if (second[n - 1] < 0) != (second[n] < 0):
+            if abs(second[n - 1]) < abs(second[n]):
+                inflections[f] = n - 1
+            else:
+                inflections[f] = n
+            f += 1
@@ -0,0 +1,486 @@
+# envi.py
+
+"""
+Reading and writing ENVI image files.
+
+Data files are memory-mapped in their stored interleave (BSQ, BIL or BIP)
+and exposed as band-last views, so `cube[i, j, :]` indexing matches the rest
+of spectralops. Tile reads through `spectralops.tiling` copy each tile into
+a contiguous band-last block with `spectralops.layout.to_band_last`, which
+is where any transpose happens.
+"""
+
+# Standard Libraries
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Optional, Sequence, Union
+
+# External Imports
+import numpy as np
+
+# Local Imports
+from spectralops.layout import to_band_last
+from spectralops.masking import fill_mask
+from spectralops.utils import get_options_errors
+
+
+PathLike = Union[str, Path]
+
+INTERLEAVES = ["bsq", "bil", "bip"]
+
+# ENVI data type codes.
+ENVI_DTYPES = {
+    1: np.uint8,
+    2: np.int16,
+    3: np.int32,
+    4: np.float32,
+    5: np.float64,
+    6: np.complex64,
+    9: np.complex128,
+    12: np.uint16,
+    13: np.uint32,
+    14: np.int64,
+    15: np.uint64
+}
+ENVI_CODES = {np.dtype(v): k for k, v in ENVI_DTYPES.items()}
+
+DATA_EXTENSIONS = ["", ".img", ".dat", ".raw", ".bsq", ".bil", ".bip"]
+
+# Axes of the stored array that hold (lines, samples, bands).
+_BAND_LAST_AXES = {"bsq": (1, 2, 0), "bil": (0, 2, 1), "bip": (0, 1, 2)}
+
+
+@dataclass
+class EnviHeader:
+    """
+    Contents of an ENVI header file.
+
+    Attributes
+    ----------
+    lines, samples, bands: int
+        Rows, columns and bands of the image.
+    interleave: str
+        `"bsq"`, `"bil"` or `"bip"`.
+    dtype: np.dtype
+        Data type of the data file, including byte order.
+    header_offset: int
+        Bytes to skip at the start of the data file.
+    wavelength: np.ndarray or None
+        Band center wavelengths.
+    fwhm: np.ndarray or None
+        Band full widths at half maximum.
+    wavelength_units: str or None
+    band_names: list of str or None
+    ignore_value: float or None
+        The "data ignore value" field.
+    fields: dict
+        Every field of the header as a string or list of strings, with
+        lowercase keys.
+    """
+    lines: int
+    samples: int
+    bands: int
+    interleave: str = "bsq"
+    dtype: np.dtype = np.dtype(np.float32)
+    header_offset: int = 0
+    wavelength: Optional[np.ndarray] = None
+    fwhm: Optional[np.ndarray] = None
+    wavelength_units: Optional[str] = None
+    band_names: Optional[list] = None
+    ignore_value: Optional[float] = None
+    fields: dict = field(default_factory=dict)
+
+    @property
+    def shape(self) -> tuple:
+        """Band-last `(lines, samples, bands)` shape."""
+        return self.lines, self.samples, self.bands
+
+    @property
+    def stored_shape(self) -> tuple:
+        """Shape of the data as it is stored in the file."""
+        if self.interleave == "bsq":
+            return self.bands, self.lines, self.samples
+        if self.interleave == "bil":
+            return self.lines, self.bands, self.samples
+        return self.lines, self.samples, self.bands
+
+
+def _parse_fields(text: str) -> dict:
+    if not text.lstrip().startswith("ENVI"):
+        raise ValueError("Not an ENVI header: missing \"ENVI\" signature.")
+
+    fields = {}
+    # Values in braces may span several lines.
+    pattern = re.compile(r"^\s*([^=\n]+?)\s*=\s*(\{[^}]*\}|[^\n]*)", re.M)
+    for key, value in pattern.findall(text):
+        value = value.strip()
+        if value.startswith("{"):
+            value = [
+                item.strip() for item in value[1:-1].split(",")
+                if item.strip()
+            ]
+        fields[key.strip().lower()] = value
+    return fields
+
+
+def _float_array(value) -> Optional[np.ndarray]:
+    if value is None:
+        return None
+    return np.array([float(v) for v in value])
+
+
+def read_envi_header(path: PathLike) -> EnviHeader:
+    """
+    Parses an ENVI header file.
+
+    Parameters
+    ----------
+    path: str or Path
+        Path to the `.hdr` file.
+
+    Returns
+    -------
+    header: EnviHeader
+    """
+    fields = _parse_fields(Path(path).read_text())
+
+    missing = [k for k in ("lines", "samples", "bands") if k not in fields]
+    if missing:
+        raise ValueError(f"ENVI header is missing {', '.join(missing)}.")
+
+    interleave = fields.get("interleave", "bsq").lower()
+    if interleave not in INTERLEAVES:
+        raise ValueError(
+            get_options_errors(interleave, INTERLEAVES, "interleave")
+        )
+
+    data_type = int(fields.get("data type", 4))
+    if data_type not in ENVI_DTYPES:
+        raise ValueError(f"Unsupported ENVI data type {data_type}.")
+    byte_order = ">" if int(fields.get("byte order", 0)) == 1 else "<"
+    dtype = np.dtype(ENVI_DTYPES[data_type]).newbyteorder(byte_order)
+
+    ignore_value = fields.get("data ignore value")
+
+    return EnviHeader(
+        lines=int(fields["lines"]),
+        samples=int(fields["samples"]),
+        bands=int(fields["bands"]),
+        interleave=interleave,
+        dtype=dtype,
+        header_offset=int(fields.get("header offset", 0)),
+        wavelength=_float_array(fields.get("wavelength")),
+        fwhm=_float_array(fields.get("fwhm")),
+        wavelength_units=fields.get("wavelength units"),
+        band_names=fields.get("band names"),
+        ignore_value=None if ignore_value is None else float(ignore_value),
+        fields=fields
+    )
+
+
+def _format_value(value) -> str:
+    if isinstance(value, str):
+        return value
+    if np.ndim(value) == 0:
+        return str(value)
+    return "{" + ", ".join(str(v) for v in value) + "}"
+
+
+def write_envi_header(path: PathLike, header: EnviHeader) -> None:
+    """
+    Writes an ENVI header file. Fields in `header.fields` that are not
+    attributes of `EnviHeader` are written as they are.
+    """
+    fields = {
+        "samples": header.samples,
+        "lines": header.lines,
+        "bands": header.bands,
+        "header offset": header.header_offset,
+        "data type": ENVI_CODES[header.dtype.newbyteorder("=")],
+        "interleave": header.interleave,
+        "byte order": int(header.dtype.byteorder == ">"),
+    }
+    optional = {
+        "wavelength units": header.wavelength_units,
+        "wavelength": header.wavelength,
+        "fwhm": header.fwhm,
+        "band names": header.band_names,
+        "data ignore value": header.ignore_value,
+    }
+    fields.update({k: v for k, v in optional.items() if v is not None})
+    for key, value in header.fields.items():
+        fields.setdefault(key, value)
+
+    lines = ["ENVI"] + [f"{k} = {_format_value(v)}" for k, v in fields.items()]
+    Path(path).write_text("\n".join(lines) + "\n")
+
+
+def header_path_for(path: PathLike) -> Path:
+    """
+    Header path for a data file: `image.img` -> `image.hdr`, and
+    `image` -> `image.hdr`.
+    """
+    path = Path(path)
+    if path.suffix.lower() == ".hdr":
+        return path
+    return path.with_suffix(".hdr") if path.suffix else Path(f"{path}.hdr")
+
+
+def _find_data_file(header_path: Path) -> Path:
+    stem = header_path.with_suffix("")
+    for ext in DATA_EXTENSIONS:
+        for candidate in (Path(f"{stem}{ext}"), Path(f"{stem}{ext.upper()}")):
+            if candidate.is_file() and candidate != header_path:
+                return candidate
+    raise FileNotFoundError(f"No data file found for {header_path}.")
+
+
+class EnviCube():
+    """
+    Memory-mapped ENVI image.
+
+    Parameters
+    ----------
+    path: str or Path
+        Path to the header or to the data file.
+    mode: str, optional
+        Memory-map mode, `"r"` (default), `"r+"` or `"c"`.
+
+    Attributes
+    ----------
+    header: EnviHeader
+    data: np.memmap
+        Data in its stored interleave.
+    cube: np.memmap
+        Band-last `(lines, samples, bands)` view of `data`. Nothing is read
+        until it is indexed.
+    wvl: np.ndarray or None
+        Band wavelengths from the header.
+    spectral_resolution: np.ndarray or None
+        Band FWHM from the header.
+    """
+    def __init__(self, path: PathLike, mode: str = "r"):
+        path = Path(path)
+        if path.suffix.lower() == ".hdr":
+            self.header_path = path
+            self.data_path = _find_data_file(path)
+        else:
+            self.header_path = header_path_for(path)
+            self.data_path = path
+
+        self.header = read_envi_header(self.header_path)
+        self.data = np.memmap(
+            self.data_path,
+            dtype=self.header.dtype,
+            mode=mode,
+            offset=self.header.header_offset,
+            shape=self.header.stored_shape
+        )
+        self.cube = self.data.transpose(
+            _BAND_LAST_AXES[self.header.interleave]
+        )
+        self.wvl = self.header.wavelength
+        self.spectral_resolution = self.header.fwhm
+
+    @property
+    def shape(self) -> tuple:
+        return self.header.shape
+
+    def read_tile(
+        self,
+        rows: slice,
+        cols: slice,
+        dtype: Optional[np.dtype] = None
+    ) -> np.ndarray:
+        """
+        Reads a band-last, C-contiguous block of the image, replacing the
+        header's data ignore value with NaN for floating point `dtype`.
+        """
+        block = to_band_last(self.cube[rows, cols], copy=True)
+        if dtype is not None:
+            block = block.astype(dtype, copy=False)
+        ignore = self.header.ignore_value
+        if ignore is not None and np.issubdtype(block.dtype, np.floating):
+            block[block == ignore] = np.nan
+        return block
+
+    def ignore_mask(self) -> Optional[np.ndarray]:
+        """
+        Boolean `(lines, samples)` map of the fill pixels, where every band
+        equals the header's data ignore value, or None if the header has no
+        ignore value. The image is read once, in blocks of rows.
+        """
+        ignore = self.header.ignore_value
+        if ignore is None:
+            return None
+        return fill_mask(self.cube, ignore)
+
+    def __getitem__(self, key):
+        return self.cube[key]
+
+
+def open_envi(path: PathLike, mode: str = "r") -> EnviCube:
+    """
+    Opens an ENVI image. See `EnviCube`.
+    """
+    return EnviCube(path, mode)
+
+
+class EnviWriter():
+    """
+    Creates a memory-mapped ENVI file to be filled tile by tile, e.g. as the
+    `out` array of `spectralops.tiling.run_tile_pipeline`.
+
+    Parameters
+    ----------
+    path: str or Path
+        Path to the data file. The header is written next to it.
+    shape: Sequence[int]
+        Band-last `(lines, samples, bands)` shape.
+    dtype: np.dtype, optional
+        Data type. Default is float32.
+    interleave: str, optional
+        `"bsq"` (default), `"bil"` or `"bip"`.
+    wavelength, fwhm: np.ndarray, optional
+        Band wavelengths and FWHM to store in the header.
+    band_names: Sequence[str], optional
+    wavelength_units: str, optional
+    ignore_value: float, optional
+        Stored as the "data ignore value".
+    fields: dict, optional
+        Extra header fields, e.g. `{"description": "..."}`.
+
+    Attributes
+    ----------
+    cube: np.memmap
+        Band-last view of the file to write into.
+    """
+    def __init__(
+        self,
+        path: PathLike,
+        shape: Sequence[int],
+        dtype: np.dtype = np.float32,
+        interleave: str = "bsq",
+        wavelength: Optional[np.ndarray] = None,
+        fwhm: Optional[np.ndarray] = None,
+        band_names: Optional[Sequence[str]] = None,
+        wavelength_units: Optional[str] = None,
+        ignore_value: Optional[float] = None,
+        fields: Optional[dict] = None
+    ):
+        interleave = interleave.lower()
+        if interleave not in INTERLEAVES:
+            raise ValueError(
+                get_options_errors(interleave, INTERLEAVES, "interleave")
+            )
+        dtype = np.dtype(dtype)
+        if dtype.newbyteorder("=") not in ENVI_CODES:
+            raise ValueError(f"{dtype} has no ENVI data type.")
+
+        lines, samples, bands = shape
+        self.data_path = Path(path)
+        self.header_path = header_path_for(path)
+        self.header = EnviHeader(
+            lines=lines,
+            samples=samples,
+            bands=bands,
+            interleave=interleave,
+            dtype=dtype,
+            wavelength=wavelength,
+            fwhm=fwhm,
+            wavelength_units=wavelength_units,
+            band_names=None if band_names is None else list(band_names),
+            ignore_value=ignore_value,
+            fields={} if fields is None else dict(fields)
+        )
+        write_envi_header(self.header_path, self.header)
+
+        self.data = np.memmap(
+            self.data_path,
+            dtype=dtype,
+            mode="w+",
+            shape=self.header.stored_shape
+        )
+        self.cube = self.data.transpose(_BAND_LAST_AXES[interleave])
+
+    def __setitem__(self, key, value) -> None:
+        self.cube[key] = value
+
+    def flush(self) -> None:
+        self.data.flush()
+
+    def close(self) -> None:
+        self.flush()
+        del self.cube
+        del self.data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def write_envi(
+    path: PathLike,
+    data: np.ndarray,
+    wvl: Optional[np.ndarray] = None,
+    fwhm: Optional[np.ndarray] = None,
+    band_names: Optional[Sequence[str]] = None,
+    interleave: str = "bsq",
+    bands_first: bool = False,
+    dtype: Optional[np.dtype] = None,
+    chunk_rows: int = 64,
+    **kwargs
+) -> Path:
+    """
+    Writes a cube or stack of maps to an ENVI file, `chunk_rows` rows at a
+    time, so `data` can itself be memory-mapped.
+
+    Parameters
+    ----------
+    path: str or Path
+        Path to the data file. The header is written next to it.
+    data: np.ndarray
+        `(lines, samples, bands)` cube, or `(bands, lines, samples)` if
+        `bands_first`, e.g. `AbsorptionFeatureCube.parameters`. 2-D arrays
+        are written as a single band.
+    wvl, fwhm: np.ndarray, optional
+        Band wavelengths and FWHM to store in the header.
+    band_names: Sequence[str], optional
+        E.g. `PARAMETER_NAMES` for band-parameter maps.
+    interleave: str, optional
+        `"bsq"` (default), `"bil"` or `"bip"`.
+    bands_first: bool, optional
+        If True, the bands of `data` are in the first axis.
+    dtype: np.dtype, optional
+        Data type of the file. Default is the data type of `data`.
+    chunk_rows: int, optional
+        Rows copied per chunk. Default is 64.
+    **kwargs
+        Remaining arguments to pass to `EnviWriter`.
+
+    Returns
+    -------
+    header_path: Path
+    """
+    if data.ndim == 2:
+        data = data[:, :, np.newaxis]
+    elif bands_first:
+        data = np.moveaxis(data, 0, 2)
+
+    with EnviWriter(
+        path,
+        data.shape,
+        dtype=data.dtype if dtype is None else dtype,
+        interleave=interleave,
+        wavelength=wvl,
+        fwhm=fwhm,
+        band_names=band_names,
+        **kwargs
+    ) as writer:
+        for row0 in range(0, data.shape[0], chunk_rows):
+            rows = slice(row0, row0 + chunk_rows)
+            writer[rows] = data[rows]
+        return writer.header_path
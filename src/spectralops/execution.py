@@ -0,0 +1,220 @@
+# execution.py
+
+"""
+Threading and scheduling configuration of the numba kernels.
+
+Every `cube_ops` kernel runs its rows with `prange` on numba's thread pool.
+`execution_config` sets, for the duration of a `with` block, how many of
+the pool's threads the kernels use, how finely their rows are handed out
+to threads and how many threads BLAS may use in the matrix-product paths
+(e.g. `np.linalg` and `einsum` calls in `polyfit`), so several pipelines
+can share a node without oversubscribing its cores.
+
+Examples
+--------
+>>> from spectralops import execution
+>>> with execution.execution_config(num_threads=4, chunksize=8):
+...     cube = SpectralCube(data, wvl, init_pipeline=True)
+
+Notes
+-----
+numba's thread count and chunk size are per calling thread: the settings
+apply to kernels launched from the thread that entered the context, which
+includes the tile pipeline of `tiling`, since it computes on the calling
+thread. The threading layer is global and can only be chosen before the
+first parallel kernel runs.
+"""
+
+# Standard Libraries
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Iterator, Optional
+
+# External Imports
+import numba
+
+try:
+    from threadpoolctl import threadpool_info, threadpool_limits
+except ImportError:
+    threadpool_info = threadpool_limits = None
+
+# Local Imports
+from spectralops.utils import get_options_errors
+
+
+THREADING_LAYERS = (
+    "default", "safe", "forksafe", "threadsafe", "tbb", "omp", "workqueue"
+)
+
+
+@dataclass(frozen=True)
+class ExecutionConfig:
+    """
+    Execution settings of the calling thread.
+
+    Attributes
+    ----------
+    num_threads: int
+        Number of threads used by parallel kernels.
+    max_threads: int
+        Size of numba's thread pool, the upper limit of `num_threads`.
+    threading_layer: str
+        Active threading layer, or the requested one if no parallel kernel
+        has run yet.
+    chunksize: int
+        Number of `prange` iterations handed to a thread at a time. Zero
+        means numba's default static split.
+    blas_threads: int or None
+        Thread limit of the BLAS libraries, or None if unknown (e.g.
+        `threadpoolctl` is not installed).
+    """
+    num_threads: int
+    max_threads: int
+    threading_layer: str
+    chunksize: int
+    blas_threads: Optional[int] = None
+
+
+def _active_threading_layer() -> str:
+    try:
+        return numba.threading_layer()
+    except ValueError:
+        # No parallel kernel has run, so the layer is still selectable.
+        return numba.config.THREADING_LAYER
+
+
+def _blas_threads() -> Optional[int]:
+    if threadpool_info is None:
+        return None
+    limits = [
+        pool["num_threads"] for pool in threadpool_info()
+        if pool["user_api"] == "blas"
+    ]
+    return min(limits) if limits else None
+
+
+def get_execution_config() -> ExecutionConfig:
+    """
+    Returns the execution settings of the calling thread.
+    """
+    return ExecutionConfig(
+        num_threads=numba.get_num_threads(),
+        max_threads=numba.config.NUMBA_NUM_THREADS,
+        threading_layer=_active_threading_layer(),
+        chunksize=numba.get_parallel_chunksize(),
+        blas_threads=_blas_threads()
+    )
+
+
+def set_threading_layer(layer: str) -> None:
+    """
+    Selects numba's threading layer.
+
+    Parameters
+    ----------
+    layer: str
+        One of `THREADING_LAYERS`: a layer name (`"tbb"`, `"omp"`,
+        `"workqueue"`) or a selection policy (`"default"`, `"safe"`,
+        `"forksafe"`, `"threadsafe"`).
+
+    Raises
+    ------
+    RuntimeError
+        If a parallel kernel has already started a different layer. The
+        layer is fixed once numba's thread pool is launched.
+    """
+    if layer not in THREADING_LAYERS:
+        raise ValueError(
+            get_options_errors(layer, THREADING_LAYERS, "threading layer")
+        )
+
+    try:
+        active = numba.threading_layer()
+    except ValueError:
+        numba.config.THREADING_LAYER = layer
+        return
+
+    policies = ("default", "safe", "forksafe", "threadsafe")
+    if layer != active and layer not in policies:
+        raise RuntimeError(
+            f"The {active!r} threading layer is already running and cannot "
+            f"be switched to {layer!r}. Select the layer before the first "
+            "parallel kernel runs."
+        )
+
+
+@contextmanager
+def execution_config(
+    num_threads: Optional[int] = None,
+    threading_layer: Optional[str] = None,
+    chunksize: Optional[int] = None,
+    blas_threads: Optional[int] = None
+) -> Iterator[ExecutionConfig]:
+    """
+    Sets the execution settings of every kernel run inside the context and
+    restores the previous settings on exit. Contexts can be nested.
+
+    Parameters
+    ----------
+    num_threads: int, optional
+        Number of threads used by parallel kernels, at most the size of
+        numba's thread pool (`NUMBA_NUM_THREADS`). If None, it is unchanged.
+    threading_layer: str, optional
+        numba threading layer, see `set_threading_layer`. If None, it is
+        unchanged.
+    chunksize: int, optional
+        Number of `prange` iterations (cube rows) handed to a thread at a
+        time. Small chunks balance uneven rows (e.g. many NaN pixels), zero
+        restores numba's static split. If None, it is unchanged.
+    blas_threads: int, optional
+        Thread limit of the BLAS libraries used by the matrix-product
+        paths. If None, BLAS follows `num_threads` when that is given.
+        Requires `threadpoolctl`; without it, only an explicit
+        `blas_threads` is an error.
+
+    Yields
+    ------
+    config: ExecutionConfig
+        The settings in effect inside the context.
+    """
+    max_threads = numba.config.NUMBA_NUM_THREADS
+    if num_threads is not None and not 1 <= num_threads <= max_threads:
+        raise ValueError(
+            f"Number of threads must be between 1 and {max_threads}, got "
+            f"{num_threads}."
+        )
+    if chunksize is not None and chunksize < 0:
+        raise ValueError(f"Chunk size must be non-negative, got {chunksize}.")
+    if blas_threads is not None and blas_threads < 1:
+        raise ValueError(
+            f"Number of BLAS threads must be positive, got {blas_threads}."
+        )
+    if blas_threads is not None and threadpool_limits is None:
+        raise ImportError(
+            "Limiting BLAS threads requires `threadpoolctl`."
+        )
+
+    if threading_layer is not None:
+        set_threading_layer(threading_layer)
+
+    previous_threads = numba.get_num_threads()
+    previous_chunksize = numba.get_parallel_chunksize()
+    if blas_threads is None:
+        blas_threads = num_threads
+    blas_limits = None
+
+    try:
+        if num_threads is not None:
+            numba.set_num_threads(num_threads)
+        if chunksize is not None:
+            numba.set_parallel_chunksize(chunksize)
+        if blas_threads is not None and threadpool_limits is not None:
+            blas_limits = threadpool_limits(
+                limits=blas_threads, user_api="blas"
+            )
+        yield get_execution_config()
+    finally:
+        if blas_limits is not None:
+            blas_limits.restore_original_limits()
+        numba.set_parallel_chunksize(previous_chunksize)
+        numba.set_num_threads(previous_threads)
@@ -0,0 +1,102 @@
+# layout.py
+
+"""
+Memory layout of spectral cubes.
+
+The cube kernels read whole spectra with `cube[i, j, :]`, which is fastest
+when bands are contiguous in memory (BIP order). `to_band_last` converts
+band-first (BSQ) and band-interleaved-by-line (BIL) data into that layout
+with a parallel, cache-blocked copy.
+"""
+
+# External Imports
+import numpy as np
+from numba import njit, prange
+
+
+DEFAULT_BLOCK = 32
+
+
+def detect_layout(cube: np.ndarray) -> str:
+    """
+    Detects how a band-last `(rows, cols, bands)` array is stored in memory.
+
+    Parameters
+    ----------
+    cube: np.ndarray
+        Spectral cube, or a view of one, with the spectral dimension in the
+        third axis.
+
+    Returns
+    -------
+    layout: str
+        `"bip"` if bands vary fastest in memory, `"bsq"` if they vary
+        slowest and `"bil"` if they vary between columns and rows.
+    """
+    strides = [abs(s) for s in cube.strides[:3]]
+    if strides[2] <= min(strides[0], strides[1]):
+        return "bip"
+    if strides[2] >= max(strides[0], strides[1]):
+        return "bsq"
+    return "bil"
+
+
+@njit(parallel=True, nogil=True)
+def blocked_copy_nb(src: np.ndarray, dst: np.ndarray, block: int) -> None:
+    """
+    Copies a strided `(rows, cols, bands)` array into `dst` in
+    `block` x `block` tiles of columns and bands, so each cache line read
+    from `src` is reused across the tile before it is evicted.
+    """
+    xsize, ysize, nbands = src.shape
+    for i in prange(xsize):
+        for j0 in range(0, ysize, block):
+            j1 = min(j0 + block, ysize)
+            for b0 in range(0, nbands, block):
+                b1 = min(b0 + block, nbands)
+                for j in range(j0, j1):
+                    for b in range(b0, b1):
+                        dst[i, j, b] = src[i, j, b]
+
+
+def to_band_last(
+    cube: np.ndarray,
+    bands_axis: int = 2,
+    block: int = DEFAULT_BLOCK,
+    copy: bool = False
+) -> np.ndarray:
+    """
+    Returns a C-contiguous `(rows, cols, bands)` copy of a cube, or the cube
+    itself if it already is one and `copy` is False.
+
+    Parameters
+    ----------
+    cube: np.ndarray
+        Spectral cube in any layout.
+    bands_axis: int, optional
+        Axis of `cube` that holds the bands. Default is 2.
+    block: int, optional
+        Tile size of the blocked copy. Default is `DEFAULT_BLOCK`.
+    copy: bool, optional
+        If True, a copy is made even if `cube` is already band-contiguous,
+        e.g. to read a memory-mapped tile into memory. Default is False.
+
+    Returns
+    -------
+    band_last: np.ndarray
+        Band-contiguous cube in native byte order.
+    """
+    if bands_axis % cube.ndim == 2:
+        band_last = cube
+    else:
+        band_last = np.moveaxis(cube, bands_axis, 2)
+    if band_last.flags.c_contiguous and band_last.dtype.isnative:
+        return np.array(band_last) if copy else band_last
+    if not band_last.dtype.isnative or detect_layout(band_last) == "bip":
+        return np.ascontiguousarray(
+            band_last, dtype=band_last.dtype.newbyteorder("=")
+        )
+
+    out = np.empty(band_last.shape, dtype=band_last.dtype)
+    blocked_copy_nb(band_last, out, block)
+    return out
@@ -0,0 +1,130 @@
+# masking.py
+
+"""
+Lazy pixel masks.
+
+`fill_mask` finds fill pixels (e.g. of an ENVI data ignore value) in
+blocks of rows, so it can run on memory-mapped data. `MaskedView` reads a
+cube (or any array with the image's rows and columns in its first two
+axes) as if its masked pixels were NaN, without copying it. Only the
+elements that are indexed are copied and masked, so applying a mask costs
+no memory until the data is used.
+"""
+
+# Standard Libraries
+from typing import Optional, Tuple
+
+# External Imports
+import numpy as np
+
+# Local Imports
+from spectralops.progress import chunk_rows_for
+from spectralops.roi import ROI
+
+
+def fill_mask(data: np.ndarray, value: float) -> np.ndarray:
+    """
+    Boolean map of the pixels of band-last `data` whose every band equals
+    `value`. `data` is read in blocks of rows.
+    """
+    lines, samples = data.shape[:2]
+    mask = np.empty((lines, samples), dtype=bool)
+    step = chunk_rows_for(samples)
+    for row0 in range(0, lines, step):
+        block = data[row0:row0 + step]
+        mask[row0:row0 + step] = np.all(block == value, axis=2)
+    return mask
+
+
+def with_fill(
+    pixel_mask: Optional[np.ndarray],
+    data: np.ndarray,
+    value: Optional[float]
+) -> Optional[np.ndarray]:
+    """
+    `pixel_mask` (=1 for masked pixels, may be None) with the fill pixels of
+    `data` (see `fill_mask`) added, as uint8. Unchanged if `value` is None.
+    """
+    if value is None:
+        return pixel_mask
+    fill = fill_mask(data, value)
+    if pixel_mask is not None:
+        fill |= np.asarray(pixel_mask) == 1
+    return fill.astype(np.uint8)
+
+
+def region_mask(
+    mask: Optional[np.ndarray],
+    roi: Optional[ROI] = None
+) -> Optional[np.ndarray]:
+    """
+    Masked pixels of the data a step runs on: `mask` itself, or its
+    `(N, 1)` batch if the step is gathered to `roi`. None without a mask.
+    """
+    if mask is None or roi is None:
+        return mask
+    return mask[roi.rows, roi.cols][:, np.newaxis]
+
+
+class MaskedView:
+    """
+    Read-only view of an array whose masked pixels read as NaN. Integer
+    data reads as floating point, at least float32.
+
+    Parameters
+    ----------
+    data: np.ndarray
+        Array with the image's rows and columns in its first two axes. May
+        be memory-mapped.
+    mask: np.ndarray
+        Boolean array of the image's rows and columns, True for masked
+        pixels.
+
+    Examples
+    --------
+    >>> view = MaskedView(cube, mask)
+    >>> spectrum = view[10, 20]      # NaN if pixel (10, 20) is masked
+    >>> block = view[:100]           # copies and masks only 100 rows
+    >>> full = np.asarray(view)      # masks the whole array
+    """
+    def __init__(self, data: np.ndarray, mask: np.ndarray):
+        mask = np.asarray(mask, dtype=bool)
+        if mask.shape != data.shape[:2]:
+            raise ValueError(
+                f"Mask {mask.shape} does not match the image "
+                f"{data.shape[:2]}."
+            )
+        self.data = data
+        self.mask = mask
+
+    @property
+    def shape(self) -> Tuple[int, ...]:
+        return self.data.shape
+
+    @property
+    def ndim(self) -> int:
+        return self.data.ndim
+
+    @property
+    def dtype(self) -> np.dtype:
+        return np.result_type(self.data.dtype, np.float32)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def _element_mask(self) -> np.ndarray:
+        # Zero-copy broadcast of the pixel mask over the remaining axes.
+        mask = self.mask.reshape(self.mask.shape + (1,) * (self.ndim - 2))
+        return np.broadcast_to(mask, self.shape)
+
+    def __getitem__(self, key) -> np.ndarray:
+        values = np.array(self.data[key], dtype=self.dtype)
+        masked = self._element_mask()[key]
+        if values.ndim == 0:
+            return values.dtype.type(np.nan) if masked else values[()]
+        values[masked] = np.nan
+        return values
+
+    def __array__(self, dtype=None, copy=None) -> np.ndarray:
+        values = self[...]
+        return values if dtype is None else values.astype(dtype, copy=False)
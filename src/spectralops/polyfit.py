@@ -9,6 +9,7 @@ from numba import njit
 
 # Local imports
 from .cube_ops import apply_polyfit_over_cube
+from .profiling import profiled
 
 
 def polyfit_single(
@@ -93,6 +94,41 @@ def polyfit_single_nb(
     return fit_line, np.full(fit_line.shape, np.nan)
 
 
+def polynomial_projection(
+    wvl: np.ndarray,
+    order: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Builds the design matrix and least-squares projection for polynomial
+    fits over `wvl`. Wavelengths are centered and scaled before building the
+    design matrix, which keeps high order fits well conditioned without
+    changing the fitted values.
+
+    Parameters
+    ----------
+    wvl: np.ndarray
+        X Data. Wavelengths.
+    order: int
+        Order of polynomial fit.
+
+    Returns
+    -------
+    X: np.ndarray
+        Design matrix, `(wvl.size, order + 1)`.
+    P: np.ndarray
+        Projection matrix, `(order + 1, wvl.size)`. The fit coefficients of a
+        spectrum `y` are `P @ y` and the fit line is `X @ (P @ y)`.
+    """
+    scale = np.ptp(wvl) / 2
+    if scale == 0:
+        scale = 1.0
+    t = (wvl - wvl.mean()) / scale
+    X = np.vander(t, order + 1, increasing=True)
+    P = np.linalg.pinv(X)
+    return np.ascontiguousarray(X), np.ascontiguousarray(P)
+
+
+@profiled("Polyfit over cube")
 def polyfit_spectral_cube(
     spectral_cube: np.ndarray,
     wvl: np.ndarray,
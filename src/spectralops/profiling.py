@@ -0,0 +1,286 @@
+# profiling.py
+
+"""
+Instrumentation for pipeline steps and cube kernels.
+
+Every instrumented step produces a `StepRecord` with its wall time, the
+number of pixels processed, throughput and memory use. Records are passed to
+every registered callback, so they can be forwarded to external monitoring
+without parsing stdout.
+
+Examples
+--------
+>>> from spectralops import profiling
+>>> with profiling.collect() as collector:
+...     cube = SpectralCube(data, wvl, init_pipeline=True)
+>>> collector.to_csv("pipeline_profile.csv")
+"""
+
+# Standard Libraries
+import csv
+import io
+import json
+import tracemalloc
+from contextlib import contextmanager
+from functools import wraps
+from dataclasses import dataclass, field, asdict, fields
+from pathlib import Path
+from time import perf_counter, time
+from typing import Callable, Iterator, Optional, Union
+
+# Local Imports
+from spectralops.utils import pretty_print_runtime
+
+
+@dataclass
+class StepRecord:
+    """
+    Profiling record of a single pipeline step or kernel call.
+
+    Attributes
+    ----------
+    name: str
+        Name of the step.
+    pixels: int
+        Number of pixels (spectra) processed.
+    wall_time: float
+        Wall time of the step in seconds.
+    pixels_per_second: float
+        Throughput of the step.
+    bytes_allocated: int
+        Net change in traced memory over the step, i.e. the size of the
+        results it left allocated. Zero if memory tracking is off.
+    peak_memory: int
+        Peak traced memory above the starting level during the step. Zero if
+        memory tracking is off.
+    start_time: float
+        Unix timestamp at which the step started.
+    parent: str, optional
+        Name of the enclosing step, if the step is nested.
+    metadata: dict
+        Additional information supplied by the step.
+    """
+    name: str
+    pixels: int = 0
+    wall_time: float = 0.0
+    pixels_per_second: float = 0.0
+    bytes_allocated: int = 0
+    peak_memory: int = 0
+    start_time: float = 0.0
+    parent: Optional[str] = None
+    metadata: dict = field(default_factory=dict)
+
+    def to_dict(self) -> dict:
+        return asdict(self)
+
+
+class ProfileCollector():
+    """
+    Callback that stores every `StepRecord` it receives.
+
+    Attributes
+    ----------
+    records: list[StepRecord]
+        Collected records, in order of completion.
+    """
+    def __init__(self) -> None:
+        self.records: list[StepRecord] = []
+
+    def __call__(self, record: StepRecord) -> None:
+        self.records.append(record)
+
+    def clear(self) -> None:
+        self.records.clear()
+
+    def to_json(self, path: Union[None, str, Path] = None) -> str:
+        """
+        Serializes the records to JSON. If `path` is given, the JSON is also
+        written to that file.
+        """
+        text = json.dumps([r.to_dict() for r in self.records], indent=2)
+        if path is not None:
+            Path(path).write_text(text)
+        return text
+
+    def to_csv(self, path: Union[None, str, Path] = None) -> str:
+        """
+        Serializes the records to CSV, with `metadata` as a JSON column. If
+        `path` is given, the CSV is also written to that file.
+        """
+        buffer = io.StringIO()
+        names = [f.name for f in fields(StepRecord)]
+        writer = csv.DictWriter(buffer, fieldnames=names)
+        writer.writeheader()
+        for record in self.records:
+            row = record.to_dict()
+            row["metadata"] = json.dumps(row["metadata"])
+            writer.writerow(row)
+        text = buffer.getvalue()
+        if path is not None:
+            Path(path).write_text(text)
+        return text
+
+
+_callbacks: list[Callable[[StepRecord], None]] = []
+_track_memory: list[bool] = []
+_active_steps: list["_ActiveStep"] = []
+
+
+def add_callback(callback: Callable[[StepRecord], None]) -> None:
+    """
+    Registers a function that is called with every completed `StepRecord`.
+    """
+    _callbacks.append(callback)
+
+
+def remove_callback(callback: Callable[[StepRecord], None]) -> None:
+    """
+    Unregisters a callback added with `add_callback`.
+    """
+    _callbacks.remove(callback)
+
+
+@contextmanager
+def collect(
+    track_memory: bool = True
+) -> Iterator[ProfileCollector]:
+    """
+    Collects the records of every step run inside the context.
+
+    Parameters
+    ----------
+    track_memory: bool, optional
+        If True (default), memory is traced with `tracemalloc` while the
+        context is active. Numba allocations are included in the trace.
+
+    Yields
+    ------
+    collector: ProfileCollector
+    """
+    collector = ProfileCollector()
+    add_callback(collector)
+    _track_memory.append(track_memory)
+    started_tracing = track_memory and not tracemalloc.is_tracing()
+    if started_tracing:
+        tracemalloc.start()
+    try:
+        yield collector
+    finally:
+        if started_tracing:
+            tracemalloc.stop()
+        _track_memory.pop()
+        remove_callback(collector)
+
+
+class _ActiveStep():
+    __slots__ = ("record", "start_memory", "peak")
+
+    def __init__(self, record: StepRecord, start_memory: int) -> None:
+        self.record = record
+        self.start_memory = start_memory
+        self.peak = start_memory
+
+
+def _memory_tracked() -> bool:
+    return any(_track_memory) and tracemalloc.is_tracing()
+
+
+@contextmanager
+def profile_step(
+    name: str,
+    pixels: int = 0,
+    verbose: bool = False,
+    **metadata
+) -> Iterator[StepRecord]:
+    """
+    Times a block of code and dispatches a `StepRecord` to the registered
+    callbacks when it completes.
+
+    Parameters
+    ----------
+    name: str
+        Name of the step.
+    pixels: int, optional
+        Number of pixels processed. Can also be set on the yielded record
+        inside the block.
+    verbose: bool, optional
+        If True, the runtime is printed with `pretty_print_runtime`.
+    **metadata
+        Additional information stored with the record.
+
+    Yields
+    ------
+    record: StepRecord
+        The record being filled in. It is complete once the block exits.
+    """
+    record = StepRecord(name=name, pixels=pixels, metadata=dict(metadata))
+    if _active_steps:
+        record.parent = _active_steps[-1].record.name
+
+    track = _memory_tracked()
+    if track:
+        current, peak = tracemalloc.get_traced_memory()
+        # Keep the enclosing step's peak before resetting it for this one.
+        if _active_steps:
+            _active_steps[-1].peak = max(_active_steps[-1].peak, peak)
+        tracemalloc.reset_peak()
+        active = _ActiveStep(record, current)
+    else:
+        active = _ActiveStep(record, 0)
+    _active_steps.append(active)
+
+    record.start_time = time()
+    start = perf_counter()
+    try:
+        yield record
+    finally:
+        record.wall_time = perf_counter() - start
+        _active_steps.pop()
+
+        if track and tracemalloc.is_tracing():
+            current, peak = tracemalloc.get_traced_memory()
+            active.peak = max(active.peak, peak)
+            record.bytes_allocated = current - active.start_memory
+            record.peak_memory = active.peak - active.start_memory
+            if _active_steps:
+                _active_steps[-1].peak = max(
+                    _active_steps[-1].peak, active.peak
+                )
+
+        if record.wall_time > 0:
+            record.pixels_per_second = record.pixels / record.wall_time
+
+    for callback in list(_callbacks):
+        callback(record)
+
+    if verbose:
+        pretty_print_runtime(record.wall_time, name)
+
+
+def profiled(
+    name: Optional[str] = None,
+    verbose: bool = False
+) -> Callable:
+    """
+    Decorator that runs a cube function inside `profile_step`. The number of
+    pixels is taken from the first two axes of the first argument.
+
+    Parameters
+    ----------
+    name: str, optional
+        Name of the step. Defaults to the function name.
+    verbose: bool, optional
+        If True, the runtime is printed with `pretty_print_runtime`.
+    """
+    def decorator(func: Callable) -> Callable:
+        step_name = func.__name__ if name is None else name
+
+        @wraps(func)
+        def wrapper(cube, *args, **kwargs):
+            pixels = cube.shape[0] * cube.shape[1] if cube.ndim == 3 else 1
+            with profile_step(step_name, pixels, verbose=verbose):
+                return func(cube, *args, **kwargs)
+
+        return wrapper
+
+    return decorator
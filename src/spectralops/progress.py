@@ -0,0 +1,331 @@
+# progress.py
+
+"""
+Chunked execution of cube kernels with progress reporting and cooperative
+cancellation.
+
+A compiled `prange` kernel cannot be interrupted once it starts, so
+`run_in_chunks` calls it on blocks of rows and, between blocks, reports
+progress to a callback and checks a `CancellationToken`.
+
+Both can skip masked pixels: `run_masked` gathers the valid pixels of a
+block into a compact batch, so the kernel never computes masked spectra and
+the extra memory is bounded by the block rather than the cube.
+"""
+
+# Standard Libraries
+import threading
+from dataclasses import dataclass
+from time import monotonic
+from typing import Callable, Optional
+
+# External Imports
+import numba
+import numpy as np
+
+
+DEFAULT_CHUNK_PIXELS = 16384
+# Kernels run their rows in parallel, so every chunk has at least this many
+# rows per thread to keep all threads busy on wide cubes.
+MIN_ROWS_PER_THREAD = 4
+
+
+class OperationCancelled(RuntimeError):
+    """
+    Raised when a chunked operation is cancelled or passes its deadline.
+
+    Attributes
+    ----------
+    partial_result: np.ndarray or None
+        Output array, valid for the first `rows_completed` rows.
+    rows_completed: int
+        Number of rows processed before cancellation.
+    """
+    def __init__(
+        self,
+        message: str,
+        partial_result: Optional[np.ndarray] = None,
+        rows_completed: int = 0
+    ) -> None:
+        super().__init__(message)
+        self.partial_result = partial_result
+        self.rows_completed = rows_completed
+
+
+class CancellationToken():
+    """
+    Thread-safe flag used to cancel chunked operations, optionally with a
+    deadline.
+
+    Parameters
+    ----------
+    timeout: float, optional
+        Seconds from creation after which the token counts as cancelled. If
+        None (default), there is no deadline.
+    """
+    def __init__(self, timeout: Optional[float] = None) -> None:
+        self._event = threading.Event()
+        self.deadline = None if timeout is None else monotonic() + timeout
+
+    def cancel(self) -> None:
+        """Requests cancellation of every operation using this token."""
+        self._event.set()
+
+    @property
+    def cancelled(self) -> bool:
+        if self._event.is_set():
+            return True
+        return self.deadline is not None and monotonic() >= self.deadline
+
+    @property
+    def reason(self) -> str:
+        if self._event.is_set():
+            return "cancelled"
+        return "deadline exceeded"
+
+
+@dataclass
+class ProgressInfo:
+    """
+    Progress of a chunked operation, passed to progress callbacks.
+
+    Attributes
+    ----------
+    step: str
+        Name of the operation.
+    pixels_done: int
+        Number of pixels processed so far.
+    pixels_total: int
+        Total number of pixels to process.
+    elapsed: float
+        Seconds since the operation started.
+    rate: float
+        Throughput so far in pixels per second.
+    eta: float
+        Estimated seconds remaining.
+    """
+    step: str
+    pixels_done: int
+    pixels_total: int
+    elapsed: float
+    rate: float
+    eta: float
+
+    @property
+    def fraction(self) -> float:
+        if self.pixels_total == 0:
+            return 1.0
+        return self.pixels_done / self.pixels_total
+
+
+def print_progress(info: ProgressInfo) -> None:
+    """
+    Progress callback that prints a single, updating line.
+    """
+    end = "\n" if info.pixels_done == info.pixels_total else ""
+    print(
+        f"\r{info.step}: {info.pixels_done} of {info.pixels_total} "
+        f"({info.fraction:.2%}) {info.rate:.0f} px/s, "
+        f"ETA {info.eta:.1f} s",
+        end=end
+    )
+
+
+def chunk_rows_for(ncols: int, chunk_pixels: int = DEFAULT_CHUNK_PIXELS):
+    """
+    Number of rows that holds roughly `chunk_pixels` pixels, and at least
+    `MIN_ROWS_PER_THREAD` rows for every thread of the calling thread's
+    numba settings.
+    """
+    min_rows = MIN_ROWS_PER_THREAD * numba.get_num_threads()
+    return max(chunk_pixels // max(ncols, 1), min_rows)
+
+
+def _fill_value(dtype: np.dtype):
+    return np.nan if np.issubdtype(dtype, np.inexact) else 0
+
+
+def run_masked(
+    kernel: Callable[..., np.ndarray],
+    block: np.ndarray,
+    *args,
+    mask: np.ndarray,
+    row_axis: int = 0,
+    pixel_args: int = 0
+) -> np.ndarray:
+    """
+    Runs a cube kernel on the pixels of `block` where `mask` is False.
+
+    The valid spectra are gathered into an `(N, 1, bands)` batch, so the
+    kernel does no work for masked pixels. Masked pixels of the result are
+    NaN (zero for integer results).
+
+    Parameters
+    ----------
+    kernel: Callable
+        Cube kernel, see `run_in_chunks`.
+    block: np.ndarray
+        Block of a cube with the spectral dimension in the third axis.
+    *args
+        Remaining arguments to pass to `kernel`.
+    mask: np.ndarray
+        Boolean array of the block's rows and columns, True for the pixels
+        to skip.
+    row_axis: int, optional
+        Axis of the kernel result that corresponds to rows. Default is 0.
+    pixel_args: int, optional
+        Number of leading `args` with the block's rows and columns in their
+        first two axes, which are gathered along with it. Default is 0.
+
+    Returns
+    -------
+    result: np.ndarray
+        The kernel's result for the whole block.
+    """
+    valid = ~mask
+    nvalid = np.count_nonzero(valid)
+    if nvalid == valid.size:
+        return kernel(block, *args)
+
+    def take(values: np.ndarray) -> np.ndarray:
+        # A fully masked block still needs the result's shape and dtype,
+        # which a single pixel provides.
+        if nvalid == 0:
+            return values[:1, :1]
+        return values[valid][:, np.newaxis]
+
+    pixel = tuple(take(values) for values in args[:pixel_args])
+    values = kernel(take(block), *pixel, *args[pixel_args:])
+
+    shape = list(values.shape)
+    shape[row_axis:row_axis + 2] = block.shape[:2]
+    result = np.full(shape, _fill_value(values.dtype), dtype=values.dtype)
+    if nvalid:
+        axes = (slice(None),) * row_axis
+        result[axes + (valid,)] = values[axes + (slice(None), 0)]
+    return result
+
+
+def run_in_chunks(
+    kernel: Callable[..., np.ndarray],
+    cube: np.ndarray,
+    *args,
+    chunk_rows: Optional[int] = None,
+    progress: Optional[Callable[[ProgressInfo], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    step: str = "Processing",
+    row_axis: int = 0,
+    row_offset: bool = False,
+    mask: Optional[np.ndarray] = None,
+    pixel_args: int = 0
+) -> np.ndarray:
+    """
+    Runs a cube kernel over blocks of rows of `cube`.
+
+    Parameters
+    ----------
+    kernel: Callable
+        Cube kernel such as `apply_smoothing_over_cube`. Its first argument
+        is the cube and its result must have the cube's spatial axes at
+        `row_axis` and `row_axis + 1`.
+    cube: np.ndarray
+        Spectral cube with the spectral dimension in the third axis.
+    *args
+        Remaining arguments to pass to `kernel`.
+    chunk_rows: int, optional
+        Rows per chunk. If None (default), chunks hold roughly
+        `DEFAULT_CHUNK_PIXELS` pixels, see `chunk_rows_for`.
+    progress: Callable, optional
+        Called with a `ProgressInfo` after every chunk.
+    cancel_token: CancellationToken, optional
+        Checked before every chunk. If it is cancelled or past its deadline,
+        `OperationCancelled` is raised.
+    step: str, optional
+        Name of the operation reported in `ProgressInfo`.
+    row_axis: int, optional
+        Axis of the kernel result that corresponds to cube rows. Default
+        is 0.
+    row_offset: bool, optional
+        If True, the index of the first row of each chunk is passed to
+        `kernel` as its last argument, so it can index full-size arrays in
+        `args`. Default is False.
+    mask: np.ndarray, optional
+        Boolean array of the cube's rows and columns, True for pixels to
+        skip (see `run_masked`). They are NaN (zero for integer results) in
+        the result.
+    pixel_args: int, optional
+        Number of leading `args` that are full-size per-pixel arrays. They
+        are cut to every chunk like the cube (and gathered with it under a
+        `mask`), so the row offset of `row_offset` kernels is zero. Required
+        for `row_offset` kernels to be masked. Default is 0.
+
+    Returns
+    -------
+    result: np.ndarray
+        The kernel's result for the whole cube.
+    """
+    xsize, ysize = cube.shape[:2]
+    if chunk_rows is None:
+        chunk_rows = chunk_rows_for(ysize)
+    if mask is not None and row_offset and pixel_args == 0:
+        raise ValueError(
+            "Masked `row_offset` kernels need their per-pixel arrays given "
+            "by `pixel_args`."
+        )
+
+    pixels_total = xsize * ysize
+    result = None
+    start = monotonic()
+
+    for row0 in range(0, xsize, chunk_rows):
+        if cancel_token is not None and cancel_token.cancelled:
+            raise OperationCancelled(
+                f"{step} {cancel_token.reason} after {row0} of {xsize} rows.",
+                partial_result=result,
+                rows_completed=row0
+            )
+
+        row1 = min(row0 + chunk_rows, xsize)
+        axes = (slice(None),) * row_axis
+        # Per-pixel arrays are cut to the chunk like the cube, so they
+        # start at row zero.
+        pixel = tuple(values[row0:row1] for values in args[:pixel_args])
+        if mask is None:
+            extra = (row0 if pixel_args == 0 else 0,) if row_offset else ()
+            chunk = kernel(
+                cube[row0:row1], *pixel, *args[pixel_args:], *extra
+            )
+        else:
+            chunk = run_masked(
+                kernel,
+                cube[row0:row1],
+                *pixel,
+                *args[pixel_args:],
+                *((0,) if row_offset else ()),
+                mask=mask[row0:row1],
+                row_axis=row_axis,
+                pixel_args=pixel_args
+            )
+        if result is None:
+            shape = list(chunk.shape)
+            shape[row_axis] = xsize
+            result = np.empty(shape, dtype=chunk.dtype)
+        result[axes + (slice(row0, row1),)] = chunk
+
+        if progress is not None:
+            elapsed = monotonic() - start
+            done = row1 * ysize
+            rate = done / elapsed if elapsed > 0 else np.inf
+            progress(ProgressInfo(
+                step=step,
+                pixels_done=done,
+                pixels_total=pixels_total,
+                elapsed=elapsed,
+                rate=rate,
+                eta=(pixels_total - done) / rate if rate > 0 else np.inf
+            ))
+
+    if result is None:
+        result = kernel(cube, *args, *((0,) if row_offset else ()))
+
+    return result
@@ -0,0 +1,180 @@
+# ragged.py
+
+"""
+Compact per-pixel lists of variable length.
+
+Results such as the local minima of every spectrum have a different number
+of entries per pixel. `RaggedMap` stores them in CSR form: the entries of
+all pixels are concatenated in row-major pixel order into flat field
+arrays, and `offsets[p]:offsets[p + 1]` are the entries of pixel `p`. This
+avoids padded cubes and keeps every field contiguous for fast queries.
+"""
+
+# Standard Libraries
+from dataclasses import dataclass
+from typing import Dict, Tuple
+
+# External Imports
+import numpy as np
+
+# Local Imports
+from spectralops.roi import ROI
+from spectralops.utils import get_options_errors
+
+
+REDUCTIONS = {
+    "max": np.fmax,
+    "min": np.fmin,
+    "sum": np.add
+}
+
+
+def offsets_from_counts(counts: np.ndarray) -> np.ndarray:
+    """
+    CSR offsets for a map of per-pixel entry counts, `(counts.size + 1,)`.
+    """
+    offsets = np.zeros(counts.size + 1, dtype=np.int64)
+    np.cumsum(counts.ravel(), out=offsets[1:])
+    return offsets
+
+
+@dataclass
+class RaggedMap:
+    """
+    Variable-length lists of entries for every pixel of an image.
+
+    Attributes
+    ----------
+    offsets: np.ndarray
+        `(npixels + 1,)` start of the entries of every pixel in row-major
+        order, ending with the total number of entries.
+    fields: dict[str, np.ndarray]
+        Flat array of every field, one value per entry.
+    image_shape: tuple[int, int]
+        Rows and columns of the image.
+    """
+    offsets: np.ndarray
+    fields: Dict[str, np.ndarray]
+    image_shape: Tuple[int, int]
+
+    def __post_init__(self) -> None:
+        npixels = self.image_shape[0] * self.image_shape[1]
+        if self.offsets.size != npixels + 1:
+            raise ValueError(
+                f"Expected {npixels + 1} offsets for an image of "
+                f"{tuple(self.image_shape)}, got {self.offsets.size}."
+            )
+        for name, values in self.fields.items():
+            if values.size != self.size:
+                raise ValueError(
+                    f"Field {name!r} has {values.size} values for "
+                    f"{self.size} entries."
+                )
+
+    @property
+    def size(self) -> int:
+        """Total number of entries."""
+        return int(self.offsets[-1])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.fields[name]
+
+    def counts(self) -> np.ndarray:
+        """2-D map of the number of entries of every pixel."""
+        return np.diff(self.offsets).reshape(self.image_shape)
+
+    def pixel(self, x: int, y: int) -> Dict[str, np.ndarray]:
+        """Views of every field for the entries of pixel `(x, y)`."""
+        xsize, ysize = self.image_shape
+        if not (0 <= x < xsize and 0 <= y < ysize):
+            raise IndexError(
+                f"Pixel ({x}, {y}) is outside the image ({xsize}, {ysize})."
+            )
+        p = x * ysize + y
+        start, stop = self.offsets[p], self.offsets[p + 1]
+        return {
+            name: values[start:stop] for name, values in self.fields.items()
+        }
+
+    def entry_pixels(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Row and column of the pixel of every entry."""
+        pixel = np.repeat(
+            np.arange(self.offsets.size - 1), np.diff(self.offsets)
+        )
+        return np.divmod(pixel, self.image_shape[1])
+
+    def select(self, keep: np.ndarray) -> "RaggedMap":
+        """
+        Keeps the entries where the boolean array `keep` is True.
+        """
+        kept = np.zeros(self.size + 1, dtype=np.int64)
+        np.cumsum(keep, out=kept[1:])
+        offsets = kept[self.offsets]
+        fields = {name: values[keep] for name, values in self.fields.items()}
+        return type(self)(offsets, fields, self.image_shape)
+
+    def in_range(self, field: str, lo: float, hi: float) -> "RaggedMap":
+        """Keeps the entries with `lo <= field < hi`."""
+        values = self.fields[field]
+        return self.select((values >= lo) & (values < hi))
+
+    def reduce(
+        self,
+        field: str,
+        reduce: str = "max",
+        fill: float = np.nan
+    ) -> np.ndarray:
+        """
+        2-D map of one field reduced over the entries of every pixel with
+        `"max"`, `"min"`, `"sum"` or `"count"`. Pixels without entries are
+        `fill` (zero for `"count"` and `"sum"`).
+        """
+        if reduce == "count":
+            return self.counts()
+        if reduce not in REDUCTIONS:
+            raise ValueError(
+                get_options_errors(
+                    reduce, list(REDUCTIONS) + ["count"], "reduction"
+                )
+            )
+
+        counts = np.diff(self.offsets)
+        if reduce == "sum":
+            fill = 0.0
+        result = np.full(counts.size, fill, dtype=np.float64)
+        nonempty = counts > 0
+        if self.size > 0:
+            # Empty pixels are skipped, so every segment ends where the
+            # next non-empty pixel starts.
+            result[nonempty] = REDUCTIONS[reduce].reduceat(
+                self.fields[field], self.offsets[:-1][nonempty]
+            )
+        return result.reshape(self.image_shape)
+
+    def scatter(self, roi: ROI) -> "RaggedMap":
+        """
+        Places a map over the `(N, 1)` batch of a region's pixels back at
+        the pixels of the whole image.
+        """
+        if tuple(self.image_shape) != (roi.size, 1):
+            raise ValueError(
+                f"Expected a batch of {roi.size} pixels, got an image of "
+                f"{tuple(self.image_shape)}."
+            )
+        ysize = roi.image_shape[1]
+        pixels = roi.rows * ysize + roi.cols
+        order = np.argsort(pixels, kind="stable")
+
+        counts = np.diff(self.offsets)[order]
+        starts = self.offsets[:-1][order]
+        shift = np.cumsum(counts) - counts
+        entries = np.repeat(starts - shift, counts) + np.arange(self.size)
+
+        image_counts = np.zeros(roi.image_shape, dtype=np.int64)
+        image_counts.ravel()[pixels[order]] = counts
+        fields = {
+            name: values[entries] for name, values in self.fields.items()
+        }
+        return type(self)(
+            offsets_from_counts(image_counts), fields, tuple(roi.image_shape)
+        )
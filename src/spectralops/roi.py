@@ -0,0 +1,182 @@
+# roi.py
+
+"""
+Regions of interest for processing only part of a cube.
+
+A region (bounding box, boolean mask or list of pixel coordinates) is
+turned into an `ROI` of pixel coordinates. `gather` copies those spectra
+into a compact `(N, 1, bands)` batch that the cube kernels process like any
+other cube, and `scatter` places batch results back into a full-size,
+NaN-filled array.
+"""
+
+# Standard Libraries
+from dataclasses import dataclass
+from typing import Optional, Sequence, Tuple, Union
+
+# External Imports
+import numpy as np
+
+
+@dataclass(frozen=True)
+class ROI:
+    """
+    Pixels of a region of interest, in row-major order.
+
+    Attributes
+    ----------
+    rows, cols: np.ndarray
+        Row and column of every pixel in the region.
+    image_shape: tuple[int, int]
+        Rows and columns of the image the region belongs to.
+    bbox: tuple[int, int, int, int] or None
+        `(row0, row1, col0, col1)` if the region is a full bounding box,
+        which is gathered with a slice instead of fancy indexing.
+    """
+    rows: np.ndarray
+    cols: np.ndarray
+    image_shape: Tuple[int, int]
+    bbox: Optional[Tuple[int, int, int, int]] = None
+
+    @classmethod
+    def from_bbox(
+        cls,
+        image_shape: Sequence[int],
+        row0: int,
+        row1: int,
+        col0: int,
+        col1: int
+    ) -> "ROI":
+        """Region of rows `row0:row1` and columns `col0:col1`."""
+        xsize, ysize = image_shape[:2]
+        row0, row1, _ = slice(row0, row1).indices(xsize)
+        col0, col1, _ = slice(col0, col1).indices(ysize)
+        rows, cols = np.mgrid[row0:row1, col0:col1]
+        return cls(
+            rows.ravel(),
+            cols.ravel(),
+            (xsize, ysize),
+            (row0, row1, col0, col1)
+        )
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> "ROI":
+        """Region of the pixels where `mask` is True."""
+        rows, cols = np.nonzero(mask)
+        return cls(rows, cols, mask.shape[:2])
+
+    @classmethod
+    def from_coords(
+        cls,
+        image_shape: Sequence[int],
+        coords: np.ndarray
+    ) -> "ROI":
+        """Region of an `(N, 2)` array of `(row, col)` coordinates."""
+        coords = np.asarray(coords, dtype=np.intp).reshape(-1, 2)
+        xsize, ysize = image_shape[:2]
+        rows, cols = coords[:, 0], coords[:, 1]
+        if np.any((rows < 0) | (rows >= xsize) | (cols < 0) | (cols >= ysize)):
+            raise IndexError(
+                f"Coordinates fall outside the image ({xsize}, {ysize})."
+            )
+        return cls(rows, cols, (xsize, ysize))
+
+    @property
+    def size(self) -> int:
+        return self.rows.size
+
+
+RegionLike = Union[ROI, np.ndarray, Sequence[int]]
+
+
+def _is_bbox(region: RegionLike) -> bool:
+    # Four integer scalars; four `(row, col)` pairs are a coordinate list.
+    return (
+        isinstance(region, tuple)
+        and len(region) == 4
+        and all(isinstance(v, (int, np.integer)) for v in region)
+    )
+
+
+def as_roi(image_shape: Sequence[int], region: RegionLike) -> ROI:
+    """
+    Converts a region to an `ROI`.
+
+    Parameters
+    ----------
+    image_shape: Sequence[int]
+        Shape of the image. Only the first two axes are used.
+    region: ROI, np.ndarray or tuple
+        An `ROI`, a boolean mask of the image, an `(N, 2)` array of
+        `(row, col)` coordinates or a `(row0, row1, col0, col1)` bounding
+        box. Only a tuple of four integers is a bounding box; other
+        sequences are coordinates.
+
+    Returns
+    -------
+    roi: ROI
+    """
+    if isinstance(region, ROI):
+        roi = region
+    elif _is_bbox(region):
+        roi = ROI.from_bbox(image_shape, *region)
+    else:
+        region = np.asarray(region)
+        if region.dtype == bool:
+            roi = ROI.from_mask(region)
+        else:
+            roi = ROI.from_coords(image_shape, region)
+
+    if tuple(roi.image_shape) != tuple(image_shape[:2]):
+        raise ValueError(
+            f"Region is for an image of {roi.image_shape}, not "
+            f"{tuple(image_shape[:2])}."
+        )
+    return roi
+
+
+def gather(cube: np.ndarray, roi: ROI) -> np.ndarray:
+    """
+    Copies the spectra of a region into a compact `(N, 1, bands)` batch.
+    Only the region is read from memory-mapped cubes.
+    """
+    if roi.bbox is not None:
+        row0, row1, col0, col1 = roi.bbox
+        block = np.asarray(cube[row0:row1, col0:col1])
+        return block.reshape(roi.size, 1, *cube.shape[2:])
+    return np.asarray(cube[roi.rows, roi.cols])[:, np.newaxis]
+
+
+def scatter(
+    batch: np.ndarray,
+    roi: ROI,
+    axis: int = 0,
+    fill: float = np.nan
+) -> np.ndarray:
+    """
+    Places batch results back at the pixels of a region.
+
+    Parameters
+    ----------
+    batch: np.ndarray
+        Results with the `(N, 1)` batch axes at `axis` and `axis + 1`.
+    roi: ROI
+        Region the batch was gathered from.
+    axis: int, optional
+        Position of the batch axes. Default is 0.
+    fill: float, optional
+        Value outside the region. Default is NaN.
+
+    Returns
+    -------
+    scattered: np.ndarray
+        Array with the batch axes replaced by the image's rows and columns.
+    """
+    shape = (
+        batch.shape[:axis] + tuple(roi.image_shape) + batch.shape[axis + 2:]
+    )
+    dtype = np.result_type(batch.dtype, type(fill))
+    scattered = np.full(shape, fill, dtype=dtype)
+    index = (slice(None),) * axis + (roi.rows, roi.cols)
+    scattered[index] = batch[(slice(None),) * axis + (slice(None), 0)]
+    return scattered
@@ -1,9 +1,23 @@
 from .moving_average import moving_average_nb, moving_average
 from .outlier_removal import outlier_removal_nb, outlier_removal
+from .savitzky_golay import savgol_coefficients
+from .savitzky_golay import savitzky_golay_nb, savitzky_golay
+from .hampel import hampel_nb, hampel_filter_nb
+from .fft_smoothing import fft_convolve_bands, apply_fft_smoothing_over_cube
+from .spatial_filter import spatial_filter_nb, spatial_filter
 
 __all__ = [
     "moving_average_nb",
     "moving_average",
     "outlier_removal_nb",
-    "outlier_removal"
+    "outlier_removal",
+    "hampel_nb",
+    "hampel_filter_nb",
+    "savgol_coefficients",
+    "savitzky_golay_nb",
+    "savitzky_golay",
+    "fft_convolve_bands",
+    "apply_fft_smoothing_over_cube",
+    "spatial_filter_nb",
+    "spatial_filter"
 ]
@@ -0,0 +1,101 @@
+# smoothing/fft_smoothing.py
+
+# External Imports
+import numpy as np
+import numba
+from scipy import fft as sp_fft
+
+
+def _mirror_pad(cube: np.ndarray, pad: int) -> np.ndarray:
+    """
+    Mirrors `pad` bands at both ends of the spectral axis.
+    """
+    nbands = cube.shape[-1]
+    if pad >= nbands:
+        raise ValueError(
+            f"Window is too large for a spectrum of {nbands} bands."
+        )
+    return np.concatenate([
+        cube[..., pad:0:-1],
+        cube,
+        cube[..., -2:-pad - 2:-1]
+    ], axis=-1)
+
+
+def fft_convolve_bands(
+    cube: np.ndarray,
+    weights: np.ndarray,
+    workers: int = -1
+) -> np.ndarray:
+    """
+    Correlates every spectrum of a cube with a centered, odd-length kernel
+    using FFTs along the band axis. Edges are mirrored.
+
+    Parameters
+    ----------
+    cube: np.ndarray
+        Spectral cube (or tile) with the spectral dimension in the last axis.
+    weights: np.ndarray
+        Odd-length kernel weights.
+    workers: int, optional
+        Number of threads used by `scipy.fft`. Default is -1 (all cores).
+
+    Returns
+    -------
+    filtered: np.ndarray
+        Filtered cube with the same shape as `cube`.
+    """
+    window_size = weights.size
+    half = window_size // 2
+    nbands = cube.shape[-1]
+
+    padded = _mirror_pad(np.asarray(cube, dtype=np.float64), half)
+    nfft = sp_fft.next_fast_len(padded.shape[-1] + window_size - 1, real=True)
+
+    spec_fft = sp_fft.rfft(padded, nfft, axis=-1, workers=workers)
+    spec_fft *= sp_fft.rfft(weights[::-1], nfft)
+    full = sp_fft.irfft(spec_fft, nfft, axis=-1, workers=workers)
+
+    return full[..., window_size - 1:window_size - 1 + nbands]
+
+
+def apply_fft_smoothing_over_cube(
+    cube: np.ndarray,
+    weights: np.ndarray
+) -> np.ndarray:
+    """
+    FFT-based smoothing of a cube with a centered kernel. Pixels with NaN in
+    the first band are left as NaN.
+
+    Parameters
+    ----------
+    cube: np.ndarray
+        Spectral cube (or tile of rows) with the spectral dimension in the
+        third axis.
+    weights: np.ndarray
+        Odd-length smoothing kernel, e.g. the center row of
+        `savgol_coefficients`.
+
+    Returns
+    -------
+    analysis_result: np.ndarray
+        `(xsize, ysize, nbands, 2)` array of the smoothed spectra and the root
+        mean square residual over the window, matching
+        `apply_smoothing_over_cube`.
+    """
+    workers = numba.get_num_threads()
+    window_size = weights.size
+
+    analysis_result = np.empty((*cube.shape, 2), dtype=cube.dtype)
+    mu = fft_convolve_bands(cube, weights, workers)
+    resid_sq = (cube - mu) ** 2
+    box = np.full(window_size, 1 / window_size)
+    sigma = np.sqrt(
+        np.maximum(fft_convolve_bands(resid_sq, box, workers), 0)
+    )
+
+    analysis_result[..., 0] = mu
+    analysis_result[..., 1] = sigma
+    analysis_result[np.isnan(cube[:, :, 0])] = np.nan
+
+    return analysis_result
@@ -0,0 +1,166 @@
+# smoothing/savitzky_golay.py
+
+# Standard Libraries
+from functools import lru_cache
+from math import factorial
+
+# External Imports
+import numpy as np
+from numba import njit
+
+import spectralops.utils as utils
+
+
+@lru_cache(maxsize=64)
+def savgol_coefficients(
+    window_size: int,
+    polyorder: int,
+    deriv: int = 0
+) -> np.ndarray:
+    """
+    Computes Savitzky-Golay filter coefficients for every position of a
+    window. Results are cached, so coefficients are computed once per window
+    size, order and derivative.
+
+    Parameters
+    ----------
+    window_size: int
+        Odd number of bands in the filter window.
+    polyorder: int
+        Order of the local polynomial. Must be less than `window_size`.
+    deriv: int, optional
+        Order of the derivative to evaluate. Default is 0 (smoothing).
+
+    Returns
+    -------
+    coeffs: np.ndarray
+        `(window_size, window_size)` array. Row `r` holds the weights that
+        evaluate the local fit at position `r` of the window, so the
+        centered filter is row `window_size // 2` and the edge rows are used
+        for the first and last half window of a spectrum. Derivatives are per
+        band; divide by the band spacing to the power of `deriv` to convert
+        to wavelength units.
+    """
+    if window_size % 2 == 0 or window_size < 1:
+        raise ValueError(f"Window size must be odd, got {window_size}.")
+    if polyorder >= window_size:
+        raise ValueError(
+            f"Polynomial order ({polyorder}) must be less than the window "
+            f"size ({window_size})."
+        )
+    if deriv > polyorder:
+        coeffs = np.zeros((window_size, window_size))
+        coeffs.setflags(write=False)
+        return coeffs
+
+    half = window_size // 2
+    x = np.arange(window_size, dtype=np.float64) - half
+    projection = np.linalg.pinv(np.vander(x, polyorder + 1, increasing=True))
+
+    # d^deriv/dx^deriv of x^c at every position of the window.
+    powers = np.arange(polyorder + 1)
+    scale = np.array([
+        factorial(c) / factorial(c - deriv) if c >= deriv else 0.0
+        for c in powers
+    ])
+    basis = scale * x[:, None] ** np.maximum(powers - deriv, 0)
+
+    coeffs = basis @ projection
+    coeffs.setflags(write=False)
+    return coeffs
+
+
+@njit
+def savitzky_golay_nb(
+    original_spectrum: np.ndarray,
+    coeffs: np.ndarray
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Numba-optimized Savitzky-Golay smoothing.
+
+    The first and last half window of the spectrum are evaluated from the
+    local fit to the first and last full window, so no padding is needed.
+
+    Parameters
+    ----------
+    original_spectrum: np.ndarray
+        Non-smooth spectrum. Must have at least as many bands as the window.
+    coeffs: np.ndarray
+        Coefficients from `savgol_coefficients`.
+
+    Returns
+    -------
+    mu: np.ndarray
+        Smoothed spectrum.
+    sigma: np.ndarray
+        Root mean square residual between the spectrum and `mu` over the
+        window around each band.
+    """
+    nbands = original_spectrum.size
+    window_size = coeffs.shape[0]
+    half = window_size // 2
+
+    mu = np.empty(nbands)
+    for n in range(nbands):
+        if n < half:
+            row = n
+            start = 0
+        elif n >= nbands - half:
+            row = window_size - (nbands - n)
+            start = nbands - window_size
+        else:
+            row = half
+            start = n - half
+        acc = 0.0
+        for k in range(window_size):
+            acc += coeffs[row, k] * original_spectrum[start + k]
+        mu[n] = acc
+
+    sigma = np.empty(nbands)
+    for n in range(nbands):
+        start = max(n - half, 0)
+        stop = min(n + half + 1, nbands)
+        acc = 0.0
+        for k in range(start, stop):
+            resid = original_spectrum[k] - mu[k]
+            acc += resid * resid
+        sigma[n] = np.sqrt(acc / (stop - start))
+
+    return mu, sigma
+
+
+def savitzky_golay(
+    original_spectrum: np.ndarray,
+    window_size: int = 5,
+    polyorder: int = 2
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Smoothes a spectrum with a Savitzky-Golay filter.
+
+    Parameters
+    ----------
+    original_spectrum: np.ndarray
+        Non-smooth spectrum.
+    window_size: optional, int
+        Window size of the filter. Even sizes are rounded to the nearest odd
+        size. Default is 5.
+    polyorder: optional, int
+        Order of the local polynomial. Default is 2.
+
+    Returns
+    -------
+    mu: np.ndarray
+        Smoothed spectrum.
+    sigma: np.ndarray
+        Local root mean square residual of the smoothing.
+    """
+    window_size = utils.round_to_odd(window_size)
+    if window_size > original_spectrum.size:
+        raise ValueError(
+            f"Window size ({window_size}) is larger than the spectrum "
+            f"({original_spectrum.size} bands)."
+        )
+    coeffs = savgol_coefficients(window_size, polyorder)
+    return savitzky_golay_nb(
+        np.ascontiguousarray(original_spectrum, dtype=np.float64), coeffs
+    )
@@ -0,0 +1,259 @@
+# smoothing/spatial_filter.py
+
+# Standard Libraries
+from typing import Callable, Optional, Sequence
+
+# External Imports
+import numpy as np
+from numba import njit, prange
+
+# Local Imports
+from spectralops.tiling import Tile, run_tile_pipeline, DEFAULT_PREFETCH
+from spectralops.progress import CancellationToken, ProgressInfo
+from spectralops.utils import get_options_errors
+
+
+SPATIAL_FILTER_METHODS = ["median", "mean"]
+
+
+@njit
+def _select(buf: np.ndarray, n: int, k: int) -> float:
+    """
+    Partially sorts the first `n` elements of `buf` in place so that
+    `buf[k]` is the `k`-th smallest, and returns it.
+    """
+    lo = 0
+    hi = n - 1
+    while lo < hi:
+        pivot = buf[(lo + hi) // 2]
+        i = lo
+        j = hi
+        while i <= j:
+            while buf[i] < pivot:
+                i += 1
+            while buf[j] > pivot:
+                j -= 1
+            if i <= j:
+                tmp = buf[i]
+                buf[i] = buf[j]
+                buf[j] = tmp
+                i += 1
+                j -= 1
+        if k <= j:
+            hi = j
+        elif k >= i:
+            lo = i
+        else:
+            break
+    return buf[k]
+
+
+@njit
+def _window_median(buf: np.ndarray, n: int) -> float:
+    upper = _select(buf, n, n // 2)
+    if n % 2 == 1:
+        return upper
+    lower = buf[0]
+    for k in range(1, n // 2):
+        if buf[k] > lower:
+            lower = buf[k]
+    return (lower + upper) / 2
+
+
+@njit(parallel=True, nogil=True)
+def spatial_filter_nb(
+    block: np.ndarray,
+    row0: int,
+    row1: int,
+    col0: int,
+    col1: int,
+    row_radius: int,
+    col_radius: int,
+    band_radius: int,
+    use_median: bool,
+    mask: np.ndarray
+) -> np.ndarray:
+    """
+    Median or mean filters part of a cube over a spatial or spatial-spectral
+    window, ignoring NaN values and masked pixels.
+
+    Windows are truncated at the edges of `block`, so if `block` holds the
+    filtered region with a halo of at least the window radius (clipped to
+    the image), the result equals filtering the whole image.
+
+    Parameters
+    ----------
+    block: np.ndarray
+        Cube or tile with the spectral dimension in the third axis.
+    row0, row1, col0, col1: int
+        Region of `block` to filter (`row1` and `col1` exclusive).
+    row_radius, col_radius, band_radius: int
+        Half widths of the window along each axis.
+    use_median: bool
+        If True, the window median is taken, otherwise the mean.
+    mask: np.ndarray
+        Boolean array of the rows and columns of `block`, True for masked
+        pixels, which are left out of every window.
+
+    Returns
+    -------
+    filtered: np.ndarray
+        `(row1 - row0, col1 - col0, nbands)` filtered region. Masked pixels
+        and pixels with NaN in the first band are NaN.
+    """
+    xsize, ysize, nbands = block.shape
+    nrows = row1 - row0
+    ncols = col1 - col0
+    window_len = (
+        (2 * row_radius + 1) * (2 * col_radius + 1) * (2 * band_radius + 1)
+    )
+
+    filtered = np.empty((nrows, ncols, nbands), dtype=block.dtype)
+
+    for i in prange(nrows):
+        buf = np.empty(window_len)
+        x = row0 + i
+        x0 = max(x - row_radius, 0)
+        x1 = min(x + row_radius + 1, xsize)
+        for j in range(ncols):
+            y = col0 + j
+            if mask[x, y] or np.isnan(block[x, y, 0]):
+                for b in range(nbands):
+                    filtered[i, j, b] = np.nan
+                continue
+
+            y0 = max(y - col_radius, 0)
+            y1 = min(y + col_radius + 1, ysize)
+            for b in range(nbands):
+                b0 = max(b - band_radius, 0)
+                b1 = min(b + band_radius + 1, nbands)
+                n = 0
+                total = 0.0
+                for xx in range(x0, x1):
+                    for yy in range(y0, y1):
+                        if mask[xx, yy]:
+                            continue
+                        for bb in range(b0, b1):
+                            value = block[xx, yy, bb]
+                            if not np.isnan(value):
+                                buf[n] = value
+                                total += value
+                                n += 1
+                if n == 0:
+                    filtered[i, j, b] = np.nan
+                elif use_median:
+                    filtered[i, j, b] = _window_median(buf, n)
+                else:
+                    filtered[i, j, b] = total / n
+
+    return filtered
+
+
+def spatial_filter(
+    cube: np.ndarray,
+    window_size: int = 3,
+    band_window: int = 1,
+    method: str = "median",
+    tile_shape: Optional[Sequence[Optional[int]]] = None,
+    out: Optional[np.ndarray] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+    progress: Optional[Callable[[ProgressInfo], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Median or mean filters a cube over a spatial (`band_window=1`) or
+    spatial-spectral window, one tile at a time.
+
+    Each tile is read with a halo of half the window, so the result matches
+    filtering the whole image at once while only a few tiles are held in
+    memory. Tiles are read and written on background threads while others
+    are filtered, so `cube` and `out` may be memory-mapped.
+
+    Parameters
+    ----------
+    cube: np.ndarray
+        Spectral cube with the spectral dimension in the third axis.
+    window_size: int or tuple of int, optional
+        Odd spatial window size, either one size for both axes or
+        `(rows, cols)`. Default is 3.
+    band_window: int, optional
+        Odd number of bands in the window. Default is 1 (spatial only).
+    method: str, optional
+        `"median"` (default) or `"mean"`. NaN values are ignored.
+    tile_shape: Sequence[int], optional
+        Rows and columns per tile. See `spectralops.tiling.iter_tiles`.
+    out: np.ndarray, optional
+        Array to write the result into, e.g. a memory-mapped file. Must have
+        the shape of `cube`. If None (default), a new array is created.
+    prefetch: int, optional
+        Tiles read ahead of the one being filtered. See
+        `spectralops.tiling.run_tile_pipeline`.
+    progress: Callable, optional
+        Called with a `ProgressInfo` after every tile.
+    cancel_token: CancellationToken, optional
+        Checked before every tile.
+    mask: np.ndarray, optional
+        Boolean array of the cube's rows and columns, True for pixels that
+        are left out of the windows of their neighbors and are NaN in the
+        result.
+
+    Returns
+    -------
+    filtered: np.ndarray
+        Filtered cube (`out` if it was given).
+    """
+    if method not in SPATIAL_FILTER_METHODS:
+        raise ValueError(
+            get_options_errors(
+                method, SPATIAL_FILTER_METHODS, option_name="filter method"
+            )
+        )
+    if np.isscalar(window_size):
+        window_size = (window_size, window_size)
+    sizes = (*window_size, band_window)
+    if any(size < 1 or size % 2 == 0 for size in sizes):
+        raise ValueError(f"Window sizes must be odd, got {sizes}.")
+    row_radius, col_radius, band_radius = (size // 2 for size in sizes)
+
+    if mask is not None and mask.shape != cube.shape[:2]:
+        raise ValueError(
+            f"Mask {mask.shape} does not match the image {cube.shape[:2]}."
+        )
+    if out is None:
+        out = np.empty(cube.shape, dtype=cube.dtype)
+    elif out.shape != cube.shape:
+        raise ValueError(
+            f"Output shape {out.shape} does not match cube {cube.shape}."
+        )
+
+    def compute(block: np.ndarray, tile: Tile) -> np.ndarray:
+        rows, cols = tile.core_in_read
+        if mask is None:
+            block_mask = np.zeros(block.shape[:2], dtype=bool)
+        else:
+            block_mask = np.ascontiguousarray(mask[tile.read])
+        return spatial_filter_nb(
+            block,
+            rows.start,
+            rows.stop,
+            cols.start,
+            cols.stop,
+            row_radius,
+            col_radius,
+            band_radius,
+            method == "median",
+            block_mask
+        )
+
+    return run_tile_pipeline(
+        compute,
+        cube,
+        out=out,
+        tile_shape=tile_shape,
+        halo=(row_radius, col_radius),
+        prefetch=prefetch,
+        progress=progress,
+        cancel_token=cancel_token,
+        step=f"Spatial {method} filter"
+    )
@@ -1,7 +1,12 @@
 from .spectral_cube import SpectralCube
 from .spectrum import Spectrum
+from .pixel_query import PixelQuery
+from .spectrum_collection import SpectrumCollection, SpectrumView
 
 __all__ = [
     "Spectrum",
-    "SpectralCube"
+    "SpectralCube",
+    "SpectrumCollection",
+    "SpectrumView",
+    "PixelQuery"
 ]
@@ -0,0 +1,99 @@
+# spectral_classes/pixel_query.py
+
+# Standard Libraries
+from dataclasses import dataclass, field
+from typing import Optional
+
+# External Imports
+import numpy as np
+import matplotlib.pyplot as plt
+
+
+@dataclass
+class PixelQuery:
+    """
+    Processing products for a single pixel and its neighborhood, from
+    `SpectralCube.query_pixel`.
+
+    Spectral arrays are `(rows, cols, bands)` blocks covering rows
+    `row0:row0 + rows` and columns `col0:col0 + cols` of the cube. The
+    queried pixel is at `center_index` in the block.
+
+    Attributes
+    ----------
+    x, y: int
+        Queried pixel.
+    row0, col0: int
+        Position of the block in the cube.
+    wvl: np.ndarray
+        Wavelengths.
+    spectrum, no_outliers, smoothed, err, contrem, continuum: np.ndarray
+        Original spectra and processing products of the block.
+    parameters: dict
+        Band parameter maps of the block for each queried feature, keyed by
+        feature name and then by `PARAMETER_NAMES`.
+    """
+    x: int
+    y: int
+    row0: int
+    col0: int
+    wvl: np.ndarray
+    spectrum: np.ndarray
+    no_outliers: np.ndarray
+    smoothed: np.ndarray
+    err: np.ndarray
+    contrem: np.ndarray
+    continuum: np.ndarray
+    parameters: dict = field(default_factory=dict)
+
+    @property
+    def center_index(self) -> tuple:
+        return self.x - self.row0, self.y - self.col0
+
+    def pixel(self, attr: str = "contrem") -> np.ndarray:
+        """Spectrum `attr` of the queried pixel."""
+        return getattr(self, attr)[self.center_index]
+
+    def pixel_parameters(self, feature: Optional[str] = None) -> dict:
+        """
+        Band parameters of the queried pixel for `feature`, or for the only
+        queried feature if None.
+        """
+        if feature is None:
+            if len(self.parameters) != 1:
+                raise ValueError(
+                    f"Name one of the queried features: "
+                    f"{list(self.parameters)}."
+                )
+            feature = next(iter(self.parameters))
+        i, j = self.center_index
+        return {
+            name: values[i, j]
+            for name, values in self.parameters[feature].items()
+        }
+
+    def plot(self, ax: Optional[np.ndarray] = None):
+        """
+        Plots the queried pixel's spectra and continuum-removed spectrum.
+        """
+        if ax is None:
+            fig, ax = plt.subplots(1, 2, figsize=(13, 5))
+            fig.suptitle(f"X: {self.x}, Y: {self.y}")
+        ax[0].set_ylabel("Reflectance")
+        ax[0].set_xlabel("Wavelength")
+        ax[1].set_ylabel("Continuum-Removed Reflectance")
+        ax[1].set_xlabel("Wavelength")
+
+        for attr in ["spectrum", "no_outliers", "smoothed", "continuum"]:
+            ax[0].plot(self.wvl, self.pixel(attr), label=attr, alpha=0.6)
+        ax[1].plot(self.wvl, self.pixel("contrem"), color="k")
+
+        for feature in self.parameters:
+            center = self.pixel_parameters(feature)["center"]
+            if np.isfinite(center):
+                ax[1].axvline(center, ls="--", alpha=0.6, label=feature)
+
+        ax[0].legend()
+        if self.parameters:
+            ax[1].legend()
+        plt.show()
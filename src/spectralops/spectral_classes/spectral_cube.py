@@ -1,18 +1,43 @@
 # SpectralCube.py
 
 # Standard Libraries
-from typing import Union, Optional
+from typing import Callable, Union, Optional, Sequence, Tuple
 
 # External Imports
 import numpy as np
 import matplotlib.pyplot as plt
-from time import time
 
 # Local Imports
-from spectralops.utils import pretty_print_runtime
+from spectralops.profiling import profile_step
+from spectralops.progress import run_in_chunks
+from spectralops.tiling import run_kernel_tiled
+from spectralops.envi import open_envi
+from spectralops.layout import to_band_last
+from spectralops.roi import ROI, RegionLike, as_roi, gather, scatter
+from spectralops.masking import MaskedView, region_mask, with_fill
+from .pixel_query import PixelQuery
+from spectralops.progress import CancellationToken, ProgressInfo
 from spectralops.cube_ops import apply_remove_outliers_over_cube
+from spectralops.cube_ops import apply_hampel_over_cube
 from spectralops.cube_ops import apply_smoothing_over_cube
+from spectralops.cube_ops import apply_savitzky_golay_over_cube
+from spectralops.smoothing import apply_fft_smoothing_over_cube
+from spectralops.smoothing import savgol_coefficients
+from spectralops.smoothing import spatial_filter
+from spectralops.utils import get_options_errors, round_to_odd
 from spectralops.cube_ops import apply_continuum_removal_over_cube
+from spectralops.cube_ops import apply_bin_bands_over_cube
+from spectralops.binning import BandSelection, band_groups
+from spectralops.binning import binned_resolution, binned_wavelengths
+from spectralops.cube_ops import apply_finite_difference_over_cube
+from spectralops.cube_ops import apply_savgol_derivative_over_cube
+from spectralops.cube_ops import apply_count_extrema_over_cube
+from spectralops.cube_ops import apply_find_extrema_over_cube
+from spectralops.derivatives import DERIVATIVE_METHODS
+from spectralops.derivatives import derivative_coefficients
+from spectralops.derivatives import wavelength_derivatives
+from spectralops.ragged import RaggedMap, offsets_from_counts
+from spectralops.band_math import BandMath
 
 
 class SpectralCube():
@@ -27,7 +52,8 @@ class SpectralCube():
     wvl: np.ndarray
         Wavelength values corresponding to axis=2.
     pixel_mask: np.ndarray, optional
-        Pixels to be masked are =1 and valid pixels are =0.
+        Pixels to be masked are =1 and valid pixels are =0. Processing
+        steps skip masked pixels, which are NaN in their results.
     spectral_resolution: Union[None, np.ndarray, float], optional.
         Spectral resolution of dataset. Can either be a single value or an
         array of values corresponding to spectral resolution of each band.
@@ -36,7 +62,30 @@ class SpectralCube():
         Switch to enable running the pipeline at initialization.
     bands_first: bool, optional
         If True, the spectral domain is assumed to be in the first axis of
-        the array.
+        the array. In-memory cubes that are not band-contiguous are copied
+        into band-contiguous order with `spectralops.layout.to_band_last`.
+    verbose: bool, optional
+        If True (default), the runtime of each processing step is printed.
+        Runtimes are always reported to `spectralops.profiling` callbacks.
+    progress: Callable, optional
+        Default progress callback for every processing step. Called with a
+        `spectralops.progress.ProgressInfo` after every chunk of rows.
+    cancel_token: CancellationToken, optional
+        Default cancellation token for every processing step. Steps stop
+        between chunks with `OperationCancelled` once it is cancelled or
+        past its deadline.
+    ignore_value: float, optional
+        Fill value of the data, e.g. an ENVI data ignore value. Pixels whose
+        every band equals it are added to the pixel mask on the first access
+        of `mask`, which reads the whole cube once. `query_pixel` only
+        checks the pixels it reads.
+
+    Every processing step also accepts `roi`, a region of interest given as
+    a `(row0, row1, col0, col1)` bounding box, boolean mask, `(N, 2)` array
+    of pixel coordinates or `spectralops.roi.ROI`. Only those spectra are
+    processed. With `compact=True`, results are returned as `(N, 1, ...)`
+    batches, which can be passed back as `starting_data` without an `roi`;
+    otherwise they are placed into NaN-filled arrays the size of the cube.
 
     Attributes
     ----------
@@ -49,12 +98,37 @@ class SpectralCube():
 
     Methods
     -------
-    remove_outliers(starting_data=None)
+    from_envi(path, mode="r", **kwargs)
+        Creates a SpectralCube from a memory-mapped ENVI file.
+    bin_bands(bin_size=1, bad_bands=None, bad_ranges=None, ...)
+        New SpectralCube with bad bands removed and adjacent bands
+        averaged.
+    remove_outliers(starting_data=None, method="zscore", ...)
         Remove spectral outliers from starting_data (or `cube` attribute if
         `starting_data` is None).
-    smooth_spectra(starting_data=None)
+    smooth_spectra(starting_data=None, method="moving_average", ...)
         Smooths spectra in the starting_data (or `cube` attribute if
         `starting_data` is None).
+    spatial_filter(starting_data=None, window_size=3, method="median", ...)
+        Median or mean filters starting_data (or `cube` attribute if
+        `starting_data` is None) over a spatial or spatial-spectral window.
+    remove_continuum(starting_data=None, progress=None, cancel_token=None)
+        Removes the continuum from starting_data (or `cube` attribute if
+        `starting_data` is None).
+    derivatives(starting_data=None, method="savitzky_golay", ...)
+        First and second derivatives of starting_data (or `cube` attribute
+        if `starting_data` is None) with respect to wavelength.
+    with_mask(attr, lazy=False)
+        Copy (or lazy view) of an attribute with the masked pixels as NaN.
+    find_extrema(first, second)
+        Local minima and inflection points of every pixel from its
+        derivatives, as compact `RaggedMap`s.
+    band_math(expressions, starting_data=None, contrem=None, ...)
+        Evaluates band math indices such as `"R(950) / R(750)"` in a
+        single pass.
+    query_pixel(x, y, radius=0, features=None, ...)
+        Processes one pixel (or a small neighborhood) without touching the
+        rest of the cube.
     plot_test_spectrum()
         Plots a random test spectrum from within the cube.
     """
@@ -65,71 +139,655 @@ class SpectralCube():
         pixel_mask: Optional[np.ndarray] = None,
         spectral_resolution: Union[None, np.ndarray, float] = None,
         init_pipeline: bool = False,
-        bands_first: bool = False
+        bands_first: bool = False,
+        verbose: bool = True,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        ignore_value: Optional[float] = None
     ):
-        if bands_first:
-            self.cube = np.moveaxis(cube, 0, 2)
+        bands_axis = 0 if bands_first else 2
+        if isinstance(cube, np.memmap):
+            # Memory-mapped tiles are transposed as they are read.
+            self.cube = np.moveaxis(cube, bands_axis, 2)
         else:
-            self.cube = cube
+            self.cube = to_band_last(cube, bands_axis)
         self.wvl = wvl
+        if pixel_mask is not None and pixel_mask.shape != self.cube.shape[:2]:
+            raise ValueError(
+                f"Pixel mask {pixel_mask.shape} does not match the image "
+                f"{self.cube.shape[:2]}."
+            )
         self.mask = pixel_mask
+        self.ignore_value = ignore_value
+        self._fill_masked = ignore_value is None
+        self.verbose = verbose
+        self.progress = progress
+        self.cancel_token = cancel_token
         if spectral_resolution is None:
             self.spec_res = (wvl.max() - wvl.min()) / wvl.size
         else:
             self.spec_res = spectral_resolution
 
         if init_pipeline:
-            print("Running spectral processing pipeline...")
-            pipeline_start = time()
+            if self.verbose:
+                print("Running spectral processing pipeline...")
+
+            with profile_step("Pipeline", self.npixels, self.verbose):
+                self.no_outliers = self.remove_outliers()
+                self.smoothed, self.err = self.smooth_spectra(
+                    self.no_outliers
+                )
+                self.contrem, self.continuum = self.remove_continuum(
+                    self.smoothed
+                )
+
+    @classmethod
+    def from_envi(cls, path, mode: str = "r", **kwargs) -> "SpectralCube":
+        """
+        Creates a SpectralCube from a memory-mapped ENVI file, taking `wvl`
+        and `spectral_resolution` from the header's wavelength and FWHM, and
+        `ignore_value` from its data ignore value, so every step skips fill
+        pixels. Remaining keyword arguments are passed to the constructor.
+        """
+        envi_cube = open_envi(path, mode)
+        if envi_cube.wvl is None:
+            raise ValueError(f"{envi_cube.header_path} has no wavelengths.")
+        kwargs.setdefault("spectral_resolution", envi_cube.spectral_resolution)
+        kwargs.setdefault("ignore_value", envi_cube.header.ignore_value)
+        return cls(envi_cube.cube, envi_cube.wvl, **kwargs)
+
+    @property
+    def npixels(self) -> int:
+        return self.cube.shape[0] * self.cube.shape[1]
+
+    @property
+    def mask(self) -> Optional[np.ndarray]:
+        """
+        Pixel mask, =1 for masked pixels, including the fill pixels of
+        `ignore_value`. Those are found on first access.
+        """
+        if not self._fill_masked:
+            self._mask = with_fill(self._mask, self.cube, self.ignore_value)
+            self._fill_masked = True
+        return self._mask
+
+    @mask.setter
+    def mask(self, pixel_mask: Optional[np.ndarray]) -> None:
+        self._mask = pixel_mask
+
+    def _block_mask(self, rows: slice, cols: slice) -> Optional[np.ndarray]:
+        """
+        Pixel mask of a block of the image. Until the whole image has been
+        checked for fill pixels, only the block is.
+        """
+        if self._fill_masked:
+            return None if self._mask is None else self._mask[rows, cols]
+        return with_fill(
+            None if self._mask is None else self._mask[rows, cols],
+            self.cube[rows, cols],
+            self.ignore_value
+        )
+
+    @property
+    def masked_pixels(self) -> Optional[np.ndarray]:
+        """Boolean map of the masked pixels, or None without a mask."""
+        if self.mask is None:
+            return None
+        return np.asarray(self.mask) == 1
+
+    def _step_mask(
+        self,
+        data: np.ndarray,
+        roi: Optional[ROI]
+    ) -> Optional[np.ndarray]:
+        """
+        Masked pixels of the data a step runs on: the pixel mask itself, or
+        its `(N, 1)` batch for a region. Data that is not the size of the
+        image (e.g. a compact batch) is not masked.
+        """
+        mask = self.masked_pixels
+        if mask is None or data.shape[:2] != mask.shape:
+            return None
+        return region_mask(mask, roi)
+
+    def _run_step(
+        self,
+        step_name: str,
+        kernel: Callable[..., np.ndarray],
+        starting_data: Optional[np.ndarray],
+        *args,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        roi: Optional[RegionLike] = None,
+        compact: bool = False
+    ) -> np.ndarray:
+        """
+        Runs a cube kernel in chunks of rows, reporting progress and
+        honoring cancellation between chunks. Memory-mapped data is read and
+        the results written on background threads while chunks compute.
+        Masked pixels are not computed and are NaN in the result.
+
+        If `roi` is given, only its spectra are gathered and processed. The
+        result is the compact `(N, 1, ...)` batch if `compact`, otherwise it
+        is scattered into a NaN-filled array the size of the cube.
+        """
+        data = self.cube if starting_data is None else starting_data
+        npixels = self.npixels
+        if roi is not None:
+            roi = as_roi(data.shape, roi)
+        mask = self._step_mask(data, roi)
+        if roi is not None:
+            data = gather(data, roi)
+            npixels = roi.size
+
+        if isinstance(data, np.memmap):
+            runner = run_kernel_tiled
+        else:
+            runner = run_in_chunks
+        with profile_step(step_name, npixels, self.verbose):
+            result = runner(
+                kernel,
+                data,
+                *args,
+                progress=self.progress if progress is None else progress,
+                cancel_token=(
+                    self.cancel_token if cancel_token is None
+                    else cancel_token
+                ),
+                step=step_name,
+                mask=mask
+            )
+
+        if roi is not None and not compact:
+            result = scatter(result, roi)
+        return result
+
+    def bin_bands(
+        self,
+        bin_size: int = 1,
+        bad_bands: Optional[BandSelection] = None,
+        bad_ranges: Optional[Sequence[Tuple[float, float]]] = None,
+        starting_data=None,
+        init_pipeline: bool = False,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ) -> "SpectralCube":
+        """
+        Removes bad bands from starting_data (or `cube` attribute if
+        `starting_data` is None) and averages groups of `bin_size` adjacent
+        bands, returning a new SpectralCube with the reduced bands.
+
+        Bands are reduced in one parallel pass (tile by tile for
+        memory-mapped cubes), so every later step processes and stores
+        fewer bands. Wavelengths are the mean of every group and the
+        spectral resolution is widened by the span of the group. Groups
+        never span removed bands. See `spectralops.binning.band_groups`.
 
-            self.no_outliers = self.remove_outliers()
-            self.smoothed, self.err = self.smooth_spectra(self.no_outliers)
-            self.contrem, self.continuum = self.remove_continuum(self.smoothed)
+        Parameters
+        ----------
+        bin_size: int, optional
+            Number of adjacent bands averaged into one. Default is 1 (no
+            binning).
+        bad_bands: np.ndarray or Sequence[int], optional
+            Bands to remove, as indices or a boolean array that is True for
+            bad bands.
+        bad_ranges: Sequence[tuple[float, float]], optional
+            Wavelength ranges `(lo, hi)` to remove.
+        starting_data: np.ndarray, optional
+            Data to reduce. Defaults to the `cube` attribute.
+        init_pipeline: bool, optional
+            If True, the processing pipeline is run on the reduced cube.
 
-            pipeline_runtime = time() - pipeline_start
-            pretty_print_runtime(pipeline_runtime, "Pipeline")
+        Returns
+        -------
+        reduced: SpectralCube
+            float64 cube with the same pixel mask, verbosity, progress
+            callback and cancellation token.
+        """
+        bands, offsets = band_groups(self.wvl, bin_size, bad_bands, bad_ranges)
+        reduced = self._run_step(
+            "Band binning",
+            apply_bin_bands_over_cube,
+            starting_data,
+            bands,
+            offsets,
+            progress=progress,
+            cancel_token=cancel_token
+        )
+        return SpectralCube(
+            reduced,
+            binned_wavelengths(self.wvl, bands, offsets),
+            pixel_mask=self.mask,
+            spectral_resolution=binned_resolution(
+                self.wvl, self.spec_res, bands, offsets
+            ),
+            init_pipeline=init_pipeline,
+            verbose=self.verbose,
+            progress=self.progress,
+            cancel_token=self.cancel_token
+        )
 
-    def remove_outliers(self, starting_data=None):
-        step_start = time()
+    def remove_outliers(
+        self,
+        starting_data=None,
+        method: str = "zscore",
+        threshold: Optional[float] = None,
+        window_size: int = 7,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        roi: Optional[RegionLike] = None,
+        compact: bool = False
+    ):
+        """
+        Removes outliers with one of the following methods:
 
-        if starting_data is None:
-            step = apply_remove_outliers_over_cube(self.cube)
+        - `"zscore"`: moving average z-score, replacing outliers with the
+          mean of their neighbors (default, `threshold` defaults to 2).
+        - `"hampel"`: sliding median/MAD filter over `window_size` bands,
+          replacing outliers with the median (`threshold` defaults to 3).
+        """
+        outlier_methods = ["zscore", "hampel"]
+        if method not in outlier_methods:
+            raise ValueError(
+                get_options_errors(
+                    method, outlier_methods, option_name="outlier method"
+                )
+            )
+
+        if method == "zscore":
+            kernel = apply_remove_outliers_over_cube
+            args = (2 if threshold is None else threshold,)
         else:
-            step = apply_remove_outliers_over_cube(starting_data)
+            kernel = apply_hampel_over_cube
+            args = (window_size, 3 if threshold is None else threshold)
+
+        return self._run_step(
+            "Outlier removal",
+            kernel,
+            starting_data,
+            *args,
+            progress=progress,
+            cancel_token=cancel_token,
+            roi=roi,
+            compact=compact
+        )
 
-        step_runtime = time() - step_start
-        pretty_print_runtime(step_runtime, "Outlier removal")
-        return step
+    def smooth_spectra(
+        self,
+        starting_data=None,
+        method: str = "moving_average",
+        window_size: int = 5,
+        polyorder: int = 2,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        roi: Optional[RegionLike] = None,
+        compact: bool = False
+    ):
+        """
+        Smooths spectra with one of the following methods:
 
-    def smooth_spectra(self, starting_data=None):
-        step_start = time()
+        - `"moving_average"`: box-car moving average (default).
+        - `"savitzky_golay"`: Savitzky-Golay filter with polynomial fits at
+          the spectrum edges.
+        - `"fft"`: Savitzky-Golay filter applied with FFTs over tiles of
+          rows, with mirrored edges. Faster for large windows.
 
-        if starting_data is None:
-            step = apply_smoothing_over_cube(self.cube)
+        `polyorder` is only used by the Savitzky-Golay methods. Returns the
+        smoothed cube and the local spread around it.
+        """
+        smoothing_methods = ["moving_average", "savitzky_golay", "fft"]
+        if method not in smoothing_methods:
+            raise ValueError(
+                get_options_errors(
+                    method, smoothing_methods, option_name="smoothing method"
+                )
+            )
+
+        if method == "moving_average":
+            kernel, args = apply_smoothing_over_cube, (window_size,)
         else:
-            step = apply_smoothing_over_cube(starting_data)
+            window_size = round_to_odd(window_size)
+            data = self.cube if starting_data is None else starting_data
+            if window_size > data.shape[2]:
+                raise ValueError(
+                    f"Window size ({window_size}) is larger than the spectrum "
+                    f"({data.shape[2]} bands)."
+                )
+            coeffs = savgol_coefficients(window_size, polyorder)
+            if method == "savitzky_golay":
+                kernel, args = apply_savitzky_golay_over_cube, (coeffs,)
+            else:
+                kernel = apply_fft_smoothing_over_cube
+                args = (np.ascontiguousarray(coeffs[window_size // 2]),)
+
+        step = self._run_step(
+            "Spectral smoothing",
+            kernel,
+            starting_data,
+            *args,
+            progress=progress,
+            cancel_token=cancel_token,
+            roi=roi,
+            compact=compact
+        )
+        return step[:, :, :, 0], step[:, :, :, 1]
+
+    def spatial_filter(
+        self,
+        starting_data=None,
+        window_size: int = 3,
+        band_window: int = 1,
+        method: str = "median",
+        tile_shape: Optional[tuple] = None,
+        out: Optional[np.ndarray] = None,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None
+    ):
+        """
+        Median or mean filters the cube over a spatial window of
+        `window_size` pixels and `band_window` bands, processed in tiles.
+        Masked pixels are left out of their neighbors' windows. See
+        `spectralops.smoothing.spatial_filter`.
+        """
+        data = self.cube if starting_data is None else starting_data
+        with profile_step("Spatial filtering", self.npixels, self.verbose):
+            return spatial_filter(
+                data,
+                window_size=window_size,
+                band_window=band_window,
+                method=method,
+                tile_shape=tile_shape,
+                out=out,
+                progress=self.progress if progress is None else progress,
+                cancel_token=(
+                    self.cancel_token if cancel_token is None
+                    else cancel_token
+                ),
+                mask=self._step_mask(data, None)
+            )
 
-        step_runtime = time() - step_start
-        pretty_print_runtime(step_runtime, "Spectral smoothing")
+    def remove_continuum(
+        self,
+        starting_data=None,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        roi: Optional[RegionLike] = None,
+        compact: bool = False
+    ):
+        step = self._run_step(
+            "Continuum removal",
+            apply_continuum_removal_over_cube,
+            starting_data,
+            self.wvl,
+            progress=progress,
+            cancel_token=cancel_token,
+            roi=roi,
+            compact=compact
+        )
         return step[:, :, :, 0], step[:, :, :, 1]
 
-    def remove_continuum(self, starting_data=None):
-        step_start = time()
+    def derivatives(
+        self,
+        starting_data=None,
+        method: str = "savitzky_golay",
+        window_size: int = 5,
+        polyorder: int = 2,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        roi: Optional[RegionLike] = None,
+        compact: bool = False
+    ):
+        """
+        First and second derivatives with respect to wavelength, with one of
+        the following methods:
 
-        if starting_data is None:
-            step = apply_continuum_removal_over_cube(self.cube, self.wvl)
+        - `"savitzky_golay"`: Savitzky-Golay derivative filters of
+          `window_size` bands and order `polyorder` (default). The filters
+          smooth while they differentiate, so unsmoothed data (e.g.
+          `no_outliers`) can be used without a separate smoothing pass.
+        - `"finite_difference"`: three-point differences, for data that is
+          already smooth (e.g. `smoothed`).
+
+        Returns the first and second derivative cubes.
+        """
+        if method not in DERIVATIVE_METHODS:
+            raise ValueError(
+                get_options_errors(
+                    method, DERIVATIVE_METHODS, option_name="derivative method"
+                )
+            )
+
+        wvl = np.asarray(self.wvl, dtype=np.float64)
+        if method == "finite_difference":
+            kernel, args = apply_finite_difference_over_cube, (wvl,)
         else:
-            step = apply_continuum_removal_over_cube(starting_data, self.wvl)
+            coeffs = derivative_coefficients(window_size, polyorder)
+            kernel = apply_savgol_derivative_over_cube
+            args = (coeffs, wavelength_derivatives(wvl, coeffs))
 
-        step_runtime = time() - step_start
-        pretty_print_runtime(step_runtime, "Continuum removal")
+        step = self._run_step(
+            "Spectral derivatives",
+            kernel,
+            starting_data,
+            *args,
+            progress=progress,
+            cancel_token=cancel_token,
+            roi=roi,
+            compact=compact
+        )
         return step[:, :, :, 0], step[:, :, :, 1]
 
-    def with_mask(self, attr: str):
-        data_nomask = getattr(self, attr)
-        data_withmask = data_nomask.copy()
-        data_withmask[self.mask == 1] = np.nan
-        return data_withmask
+    def find_extrema(
+        self,
+        first: np.ndarray,
+        second: np.ndarray
+    ) -> tuple[RaggedMap, RaggedMap]:
+        """
+        Finds the local minima (first derivative turning from negative to
+        non-negative) and inflection points (second derivative changing
+        sign) of every pixel, e.g. from the results of `derivatives`.
+
+        Both are returned as `RaggedMap`s over the image of `first` with the
+        fields `"band"` (band index) and `"wvl"` (wavelength). Pixels are
+        counted in one parallel pass and filled in a second, so no padded
+        cube is allocated. Masked pixels have no entries.
+
+        Returns
+        -------
+        minima, inflections: RaggedMap
+        """
+        image_shape = first.shape[:2]
+        with profile_step(
+            "Extremum detection", image_shape[0] * image_shape[1],
+            self.verbose
+        ):
+            counts = run_in_chunks(
+                apply_count_extrema_over_cube,
+                first,
+                second,
+                progress=self.progress,
+                cancel_token=self.cancel_token,
+                step="Extremum detection",
+                row_axis=1,
+                mask=self._step_mask(first, None),
+                pixel_args=1
+            )
+            minima_offsets = offsets_from_counts(counts[0])
+            inflection_offsets = offsets_from_counts(counts[1])
+            minima, inflections = apply_find_extrema_over_cube(
+                first, second, minima_offsets, inflection_offsets
+            )
+
+        wvl = np.asarray(self.wvl)
+        return (
+            RaggedMap(
+                minima_offsets,
+                {"band": minima, "wvl": wvl[minima]},
+                image_shape
+            ),
+            RaggedMap(
+                inflection_offsets,
+                {"band": inflections, "wvl": wvl[inflections]},
+                image_shape
+            )
+        )
+
+    def band_math(
+        self,
+        expressions,
+        starting_data=None,
+        contrem=None,
+        progress: Optional[Callable[[ProgressInfo], None]] = None,
+        cancel_token: Optional[CancellationToken] = None,
+        roi: Optional[RegionLike] = None,
+        compact: bool = False
+    ) -> dict:
+        """
+        Evaluates band math expressions (see `spectralops.band_math`) over
+        starting_data (or `cube` attribute if `starting_data` is None) in a
+        single pass. `C()` and `IBD()` read `contrem`, which defaults to the
+        `contrem` attribute.
+
+        Returns a dict of 2-D maps by expression name.
+        """
+        band_math = BandMath(expressions, self.wvl)
+        if contrem is None and band_math.uses_contrem:
+            contrem = getattr(self, "contrem", None)
+        reflectance = self.cube if starting_data is None else starting_data
+        return band_math.evaluate(
+            reflectance,
+            contrem,
+            verbose=self.verbose,
+            progress=self.progress if progress is None else progress,
+            cancel_token=(
+                self.cancel_token if cancel_token is None else cancel_token
+            ),
+            roi=roi,
+            compact=compact,
+            mask=self._step_mask(reflectance, None)
+        )
+
+    def query_pixel(
+        self,
+        x: int,
+        y: int,
+        radius: int = 0,
+        features: Optional[dict] = None,
+        fit_order: int = 4,
+        outlier_method: str = "zscore",
+        smoothing_method: str = "moving_average",
+        window_size: int = 5
+    ) -> PixelQuery:
+        """
+        Runs the processing pipeline on a single pixel, or on the pixels
+        within `radius` of it, and returns the results immediately.
+
+        Only the queried block is read from `cube`, so this is fast even for
+        large memory-mapped cubes and does not require any product to have
+        been computed for the whole cube.
+
+        Parameters
+        ----------
+        x, y: int
+            Pixel to query.
+        radius: int, optional
+            Half width of the square neighborhood to process, clipped to the
+            cube. Default is 0 (only the queried pixel).
+        features: dict, optional
+            Absorption features to calculate band parameters for, as
+            `{name: wvl_search_range}`.
+        fit_order: int, optional
+            Order of the absorption feature fits. Default is 4.
+        outlier_method: str, optional
+            Method passed to `remove_outliers`. Default is `"zscore"`.
+        smoothing_method: str, optional
+            Method passed to `smooth_spectra`. Default is
+            `"moving_average"`.
+        window_size: int, optional
+            Smoothing window size. Default is 5.
+
+        Returns
+        -------
+        query: PixelQuery
+
+        Raises
+        ------
+        ValueError
+            If the pixel is masked. Masked neighbors are NaN in the
+            results.
+        """
+        # Imported here because band_parameters depends on spectral_classes.
+        from spectralops.band_parameters import AbsorptionFeatureCube
+        from spectralops.band_parameters import PARAMETER_NAMES
+
+        xsize, ysize = self.cube.shape[:2]
+        if not (0 <= x < xsize and 0 <= y < ysize):
+            raise IndexError(
+                f"Pixel ({x}, {y}) is outside the cube ({xsize}, {ysize})."
+            )
+        row0, col0 = max(x - radius, 0), max(y - radius, 0)
+        rows = slice(row0, x + radius + 1)
+        cols = slice(col0, y + radius + 1)
+        pixel_mask = self._block_mask(rows, cols)
+        if pixel_mask is not None and pixel_mask[x - row0, y - col0] == 1:
+            raise ValueError(f"Pixel ({x}, {y}) is masked.")
+
+        local = SpectralCube(
+            to_band_last(self.cube[rows, cols], copy=True),
+            self.wvl,
+            pixel_mask=pixel_mask,
+            spectral_resolution=self.spec_res,
+            verbose=False
+        )
+        local.no_outliers = local.remove_outliers(method=outlier_method)
+        local.smoothed, local.err = local.smooth_spectra(
+            local.no_outliers, method=smoothing_method, window_size=window_size
+        )
+        local.contrem, local.continuum = local.remove_continuum(
+            local.smoothed
+        )
+
+        parameters = {}
+        for name, wvl_search_range in (features or {}).items():
+            feature = AbsorptionFeatureCube(
+                local, wvl_search_range, fit_order, verbose=False
+            )
+            parameters[name] = dict(zip(PARAMETER_NAMES, feature.parameters))
+
+        return PixelQuery(
+            x=x,
+            y=y,
+            row0=row0,
+            col0=col0,
+            wvl=self.wvl,
+            spectrum=local.cube,
+            no_outliers=local.no_outliers,
+            smoothed=local.smoothed,
+            err=local.err,
+            contrem=local.contrem,
+            continuum=local.continuum,
+            parameters=parameters
+        )
+
+    def with_mask(
+        self,
+        attr: str,
+        lazy: bool = False
+    ) -> Union[np.ndarray, MaskedView]:
+        """
+        Copy of an attribute (e.g. `"cube"`) with the masked pixels set to
+        NaN. Integer data is promoted to floating point (at least float32).
+        Results of processing steps are already NaN at masked pixels.
+
+        If `lazy` is True, a `MaskedView` is returned instead, which copies
+        nothing until it is indexed or converted with `np.asarray`.
+        """
+        data = getattr(self, attr)
+        mask = self.masked_pixels
+        if mask is None:
+            mask = np.zeros(data.shape[:2], dtype=bool)
+        view = MaskedView(data, mask)
+        return view if lazy else np.asarray(view)
 
     def plot_test_spectrum(self):
         attr_list = ["cube", "no_outliers", "smoothed", "contrem"]
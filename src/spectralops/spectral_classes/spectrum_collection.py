@@ -0,0 +1,266 @@
+# spectral_classes/spectrum_collection.py
+
+# Standard Libraries
+from typing import Iterator, Optional, Union, Tuple
+
+# External Imports
+import numpy as np
+import matplotlib.pyplot as plt
+
+# Local Imports
+from .spectral_cube import SpectralCube
+
+
+class SpectrumView():
+    """
+    Lightweight view of one spectrum of a `SpectrumCollection`. Exposes the
+    same data attributes as `Spectrum` without copying.
+    """
+    __slots__ = ("collection", "index")
+
+    def __init__(self, collection: "SpectrumCollection", index: int):
+        self.collection = collection
+        self.index = index
+
+    @property
+    def spectrum(self) -> np.ndarray:
+        return self.collection.spectra[self.index]
+
+    @property
+    def wvl(self) -> np.ndarray:
+        return self.collection.wvl
+
+    @property
+    def spec_res(self) -> Union[float, np.ndarray]:
+        return self.collection.spec_res
+
+    @property
+    def nbands(self) -> int:
+        return self.collection.nbands
+
+    @property
+    def no_outliers(self) -> np.ndarray:
+        return self.collection.no_outliers[self.index]
+
+    @property
+    def smoothed(self) -> np.ndarray:
+        return self.collection.smoothed[self.index]
+
+    @property
+    def contrem(self) -> np.ndarray:
+        return self.collection.contrem[self.index]
+
+    @property
+    def continuum(self) -> np.ndarray:
+        return self.collection.continuum[self.index]
+
+    @property
+    def metadata(self) -> dict:
+        return {
+            key: column[self.index]
+            for key, column in self.collection.metadata.items()
+        }
+
+    def plot(
+        self,
+        fig=None,
+        ax=None,
+        to_plot: dict = {
+            "original": True,
+            "outliers_removed": True,
+            "smooth": True
+        }
+    ):
+        """
+        Plots the original and processed spectra. See `Spectrum.plot`.
+        """
+        if (fig is None) or (ax is None):
+            fig, ax = plt.subplots(1, 1)
+            ax.set_xlabel("Wavelength")
+            ax.set_ylabel("Reflectance")
+
+        if to_plot.get("original"):
+            ax.plot(self.wvl, self.spectrum, label="Original", alpha=0.6)
+
+        if to_plot.get("outliers_removed"):
+            ax.plot(
+                self.wvl, self.no_outliers, label="No Outliers", alpha=0.6
+            )
+
+        if to_plot.get("smooth"):
+            ax.plot(self.wvl, self.smoothed, label="Smoothed", alpha=0.6)
+        ax.legend()
+
+    def __repr__(self) -> str:
+        return f"SpectrumView(index={self.index}, nbands={self.nbands})"
+
+
+class SpectrumCollection():
+    """
+    Stores many spectra with a shared wavelength axis as one contiguous
+    `(N, bands)` array and processes them in parallel with the cube
+    kernels.
+
+    Spectra are processed as an `(N, 1, bands)` cube, so every
+    `SpectralCube` processing option is available. Indexing with an integer
+    returns a `SpectrumView`; slices, index arrays and boolean masks return
+    a new collection.
+
+    Parameters
+    ----------
+    spectra: np.ndarray
+        `(N, bands)` array of spectra.
+    wvl: np.ndarray
+        Wavelength values corresponding to the bands.
+    spectral_resolution: Union[None, np.ndarray, float], optional
+        Spectral resolution, either constant or by band. If None (default),
+        a constant resolution will be calculated.
+    metadata: dict, optional
+        Per-spectrum metadata as columns of length N, e.g.
+        `{"sample_id": ids, "grain_size": sizes}`.
+    init_pipeline: bool, optional
+        If True (default), outlier removal, smoothing and continuum removal
+        are run at initialization, like `Spectrum`.
+    verbose: bool, optional
+        If True, the runtime of each processing step is printed. Default is
+        False.
+
+    Attributes
+    ----------
+    spectra: 2-D Array
+        Original spectra.
+    no_outliers, smoothed, err, contrem, continuum: 2-D Array
+        Processing products, set by `run_pipeline`.
+    metadata: dict
+        Metadata columns.
+    """
+    def __init__(
+        self,
+        spectra: np.ndarray,
+        wvl: np.ndarray,
+        spectral_resolution: Union[None, np.ndarray, float] = None,
+        metadata: Optional[dict] = None,
+        init_pipeline: bool = True,
+        verbose: bool = False
+    ):
+        spectra = np.ascontiguousarray(spectra)
+        if spectra.ndim != 2 or spectra.shape[1] != wvl.size:
+            raise ValueError(
+                f"Spectra must be (N, {wvl.size}), got {spectra.shape}."
+            )
+
+        self.spectra = spectra
+        self.wvl = wvl
+        self.metadata = {}
+        for key, column in ({} if metadata is None else metadata).items():
+            column = np.asarray(column)
+            if column.shape[:1] != (len(spectra),):
+                raise ValueError(
+                    f"Metadata \"{key}\" has {column.shape[:1]} values for "
+                    f"{len(spectra)} spectra."
+                )
+            self.metadata[key] = column
+
+        self.spectral_cube = SpectralCube(
+            spectra[:, np.newaxis, :],
+            wvl,
+            spectral_resolution=spectral_resolution,
+            verbose=verbose
+        )
+        self.spec_res = self.spectral_cube.spec_res
+
+        if init_pipeline:
+            self.run_pipeline()
+
+    def run_pipeline(self, **smoothing_kwargs) -> None:
+        """
+        Removes outliers, smooths and removes the continuum of every
+        spectrum. Keyword arguments are passed to
+        `SpectralCube.smooth_spectra`.
+        """
+        cube = self.spectral_cube
+        no_outliers = cube.remove_outliers()
+        smoothed, err = cube.smooth_spectra(no_outliers, **smoothing_kwargs)
+        contrem, continuum = cube.remove_continuum(smoothed)
+
+        # Kept on the cube as well so band parameters can be computed from it.
+        cube.no_outliers, cube.smoothed, cube.err = no_outliers, smoothed, err
+        cube.contrem, cube.continuum = contrem, continuum
+
+        self.no_outliers = no_outliers[:, 0]
+        self.smoothed = smoothed[:, 0]
+        self.err = err[:, 0]
+        self.contrem = contrem[:, 0]
+        self.continuum = continuum[:, 0]
+
+    def band_parameters(
+        self,
+        wvl_search_range: Tuple,
+        fit_order: int = 4
+    ) -> dict:
+        """
+        Calculates the band parameters of an absorption feature for every
+        spectrum.
+
+        Returns
+        -------
+        parameters: dict
+            1-D arrays of each band parameter, keyed by `PARAMETER_NAMES`.
+        """
+        # Imported here because band_parameters depends on spectral_classes.
+        from spectralops.band_parameters import AbsorptionFeatureCube
+        from spectralops.band_parameters import PARAMETER_NAMES
+
+        if not hasattr(self, "contrem"):
+            self.run_pipeline()
+        feature = AbsorptionFeatureCube(
+            self.spectral_cube,
+            wvl_search_range,
+            fit_order,
+            verbose=self.spectral_cube.verbose
+        )
+        return {
+            name: feature.parameters[n, :, 0]
+            for n, name in enumerate(PARAMETER_NAMES)
+        }
+
+    @property
+    def nbands(self) -> int:
+        return self.spectra.shape[1]
+
+    def __len__(self) -> int:
+        return self.spectra.shape[0]
+
+    def __iter__(self) -> Iterator[SpectrumView]:
+        for index in range(len(self)):
+            yield SpectrumView(self, index)
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, np.integer)):
+            if key < 0:
+                key += len(self)
+            if not 0 <= key < len(self):
+                raise IndexError(f"Index {key} out of range.")
+            return SpectrumView(self, int(key))
+        return self.select(key)
+
+    def select(self, key) -> "SpectrumCollection":
+        """
+        Returns a new collection of the spectra selected by a slice, index
+        array or boolean mask, with their metadata and processing products.
+        """
+        subset = SpectrumCollection(
+            self.spectra[key],
+            self.wvl,
+            spectral_resolution=self.spectral_cube.spec_res,
+            metadata={k: v[key] for k, v in self.metadata.items()},
+            init_pipeline=False,
+            verbose=self.spectral_cube.verbose
+        )
+        products = ["no_outliers", "smoothed", "err", "contrem", "continuum"]
+        for name in products:
+            if hasattr(self, name):
+                data = getattr(self, name)[key]
+                setattr(subset, name, data)
+                setattr(subset.spectral_cube, name, data[:, np.newaxis])
+        return subset
@@ -0,0 +1,304 @@
+# tiling.py
+
+"""
+Spatial tiling of spectral cubes with overlapping halos.
+
+Neighborhood operations need pixels from around each tile. `iter_tiles`
+yields tiles whose read region is the tile grown by a halo on every side,
+clipped to the image, so each tile can be processed on its own and still
+give the same result as processing the whole image.
+
+`run_tile_pipeline` processes tiles with double-buffered I/O: the next
+tiles are read and the previous results written on background threads
+while the current tile is computed, which hides most of the latency of
+memory-mapped and file-backed cubes.
+"""
+
+# Standard Libraries
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from time import monotonic
+from typing import Callable, Iterator, Optional, Sequence, Tuple
+
+# External Imports
+import numpy as np
+
+# Local Imports
+from spectralops.layout import to_band_last
+from spectralops.progress import CancellationToken, OperationCancelled
+from spectralops.progress import ProgressInfo
+from spectralops.progress import chunk_rows_for, run_masked
+
+
+DEFAULT_TILE_SHAPE = (128, 128)
+DEFAULT_PREFETCH = 2
+
+
+@dataclass(frozen=True)
+class Tile:
+    """
+    A spatial tile of a cube.
+
+    Attributes
+    ----------
+    row0, row1, col0, col1: int
+        Bounds of the tile in the image (`row1` and `col1` exclusive). Tiles
+        from `iter_tiles` cover the image without overlapping.
+    read_row0, read_row1, read_col0, read_col1: int
+        Bounds of the tile grown by the halo and clipped to the image.
+    """
+    row0: int
+    row1: int
+    col0: int
+    col1: int
+    read_row0: int
+    read_row1: int
+    read_col0: int
+    read_col1: int
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.row1 - self.row0, self.col1 - self.col0
+
+    @property
+    def npixels(self) -> int:
+        return (self.row1 - self.row0) * (self.col1 - self.col0)
+
+    @property
+    def core(self) -> Tuple[slice, slice]:
+        """Slices of the tile in the image."""
+        return slice(self.row0, self.row1), slice(self.col0, self.col1)
+
+    @property
+    def read(self) -> Tuple[slice, slice]:
+        """Slices of the tile and its halo in the image."""
+        return (
+            slice(self.read_row0, self.read_row1),
+            slice(self.read_col0, self.read_col1)
+        )
+
+    @property
+    def core_in_read(self) -> Tuple[slice, slice]:
+        """Slices of the tile within the array read with `read`."""
+        r0 = self.row0 - self.read_row0
+        c0 = self.col0 - self.read_col0
+        return (
+            slice(r0, r0 + self.row1 - self.row0),
+            slice(c0, c0 + self.col1 - self.col0)
+        )
+
+
+def iter_tiles(
+    image_shape: Sequence[int],
+    tile_shape: Optional[Sequence[Optional[int]]] = None,
+    halo: Sequence[int] = (0, 0)
+) -> Iterator[Tile]:
+    """
+    Yields tiles covering an image in row-major order.
+
+    Row-major order walks a C-ordered, band-last cube (and memory-mapped
+    files of one) in the order it is stored, so consecutive tiles read
+    neighboring memory and halos are shared through the cache.
+
+    Parameters
+    ----------
+    image_shape: Sequence[int]
+        Shape of the image. Only the first two axes are used.
+    tile_shape: Sequence[int], optional
+        Rows and columns per tile. A None entry spans the whole axis. If
+        None (default), `DEFAULT_TILE_SHAPE` is used.
+    halo: Sequence[int], optional
+        Rows and columns added on each side of a tile's read region.
+        Default is no halo.
+
+    Yields
+    ------
+    tile: Tile
+    """
+    xsize, ysize = image_shape[:2]
+    if tile_shape is None:
+        tile_shape = DEFAULT_TILE_SHAPE
+    tile_rows = xsize if tile_shape[0] is None else tile_shape[0]
+    tile_cols = ysize if tile_shape[1] is None else tile_shape[1]
+    if tile_rows < 1 or tile_cols < 1:
+        raise ValueError(f"Tile shape must be positive, got {tile_shape}.")
+    halo_rows, halo_cols = halo
+
+    for row0 in range(0, xsize, tile_rows):
+        row1 = min(row0 + tile_rows, xsize)
+        for col0 in range(0, ysize, tile_cols):
+            col1 = min(col0 + tile_cols, ysize)
+            yield Tile(
+                row0=row0,
+                row1=row1,
+                col0=col0,
+                col1=col1,
+                read_row0=max(row0 - halo_rows, 0),
+                read_row1=min(row1 + halo_rows, xsize),
+                read_col0=max(col0 - halo_cols, 0),
+                read_col1=min(col1 + halo_cols, ysize)
+            )
+
+
+def run_tile_pipeline(
+    compute: Callable[[np.ndarray, Tile], np.ndarray],
+    cube: np.ndarray,
+    out: Optional[np.ndarray] = None,
+    tile_shape: Optional[Sequence[Optional[int]]] = None,
+    halo: Sequence[int] = (0, 0),
+    prefetch: int = DEFAULT_PREFETCH,
+    progress: Optional[Callable[[ProgressInfo], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    step: str = "Processing"
+) -> np.ndarray:
+    """
+    Processes a cube tile by tile, overlapping reads, computation and
+    writes.
+
+    A reader thread loads up to `prefetch` tiles ahead of the one being
+    computed and a writer thread stores finished tiles into `out`, with at
+    most `prefetch` writes pending. At most `2 * prefetch + 2` tiles are
+    held in memory at once. Compiled kernels should release the GIL
+    (`nogil=True`) for the threads to overlap with them.
+
+    Parameters
+    ----------
+    compute: Callable
+        Called as `compute(block, tile)` on the main thread, where `block` is
+        a band-contiguous copy of `cube[tile.read]` (see
+        `spectralops.layout.to_band_last`). Must return the result for
+        the tile's core, with the tile's rows and columns in the first two
+        axes.
+    cube: np.ndarray
+        Spectral cube with the spectral dimension in the third axis. May be
+        memory-mapped.
+    out: np.ndarray, optional
+        Array to write results into, e.g. a memory-mapped file. If None
+        (default), it is created from the shape and dtype of the first
+        result.
+    tile_shape: Sequence[int], optional
+        Rows and columns per tile. See `iter_tiles`.
+    halo: Sequence[int], optional
+        Rows and columns read around each tile. Default is no halo.
+    prefetch: int, optional
+        Number of tiles read ahead and writes left pending. Default is
+        `DEFAULT_PREFETCH`.
+    progress: Callable, optional
+        Called with a `ProgressInfo` after every tile.
+    cancel_token: CancellationToken, optional
+        Checked before every tile. Pending writes are finished before
+        `OperationCancelled` is raised.
+    step: str, optional
+        Name of the operation reported in `ProgressInfo`.
+
+    Returns
+    -------
+    out: np.ndarray
+        The results for the whole cube.
+    """
+    if prefetch < 1:
+        raise ValueError(f"Prefetch must be at least 1, got {prefetch}.")
+
+    tiles = list(iter_tiles(cube.shape, tile_shape, halo))
+    pixels_total = cube.shape[0] * cube.shape[1]
+    pixels_done = 0
+    start = monotonic()
+
+    def read(tile: Tile) -> np.ndarray:
+        return to_band_last(cube[tile.read], copy=True)
+
+    def write(tile: Tile, result: np.ndarray) -> None:
+        out[tile.core] = result
+
+    reads = deque()
+    writes = deque()
+    next_read = 0
+
+    with ThreadPoolExecutor(1) as reader, ThreadPoolExecutor(1) as writer:
+        try:
+            for tile in tiles:
+                while next_read < len(tiles) and len(reads) <= prefetch:
+                    reads.append(reader.submit(read, tiles[next_read]))
+                    next_read += 1
+
+                if cancel_token is not None and cancel_token.cancelled:
+                    wait(writes)
+                    raise OperationCancelled(
+                        f"{step} {cancel_token.reason} after {pixels_done} "
+                        f"of {pixels_total} pixels.",
+                        partial_result=out,
+                        rows_completed=tile.row0
+                    )
+
+                result = compute(reads.popleft().result(), tile)
+                if out is None:
+                    out = np.empty(
+                        cube.shape[:2] + result.shape[2:], dtype=result.dtype
+                    )
+
+                if len(writes) >= prefetch:
+                    writes.popleft().result()
+                writes.append(writer.submit(write, tile, result))
+
+                pixels_done += tile.npixels
+                if progress is not None:
+                    elapsed = monotonic() - start
+                    rate = pixels_done / elapsed if elapsed > 0 else np.inf
+                    progress(ProgressInfo(
+                        step=step,
+                        pixels_done=pixels_done,
+                        pixels_total=pixels_total,
+                        elapsed=elapsed,
+                        rate=rate,
+                        eta=(
+                            (pixels_total - pixels_done) / rate if rate > 0
+                            else np.inf
+                        )
+                    ))
+
+            while writes:
+                writes.popleft().result()
+        finally:
+            for future in reads:
+                future.cancel()
+
+    return out
+
+
+def run_kernel_tiled(
+    kernel: Callable[..., np.ndarray],
+    cube: np.ndarray,
+    *args,
+    chunk_rows: Optional[int] = None,
+    out: Optional[np.ndarray] = None,
+    prefetch: int = DEFAULT_PREFETCH,
+    progress: Optional[Callable[[ProgressInfo], None]] = None,
+    cancel_token: Optional[CancellationToken] = None,
+    step: str = "Processing",
+    mask: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """
+    Runs a per-pixel cube kernel such as `apply_smoothing_over_cube` over
+    blocks of full rows with `run_tile_pipeline`. The drop-in equivalent of
+    `spectralops.progress.run_in_chunks` for memory-mapped cubes, including
+    skipping the pixels where `mask` is True.
+    """
+    if chunk_rows is None:
+        chunk_rows = chunk_rows_for(cube.shape[1])
+
+    def compute(block: np.ndarray, tile: Tile) -> np.ndarray:
+        if mask is None:
+            return kernel(block, *args)
+        return run_masked(kernel, block, *args, mask=mask[tile.core])
+
+    return run_tile_pipeline(
+        compute,
+        cube,
+        out=out,
+        tile_shape=(chunk_rows, None),
+        prefetch=prefetch,
+        progress=progress,
+        cancel_token=cancel_token,
+        step=step
+    )
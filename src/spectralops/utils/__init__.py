@@ -6,6 +6,7 @@ from .pretty_print_runtime import pretty_print_runtime
 from .linear_interpolation import linear_interpolation
 from .create_synthetic_spectra import create_synthetic_spectral_cube
 from .create_synthetic_spectra import create_synthetic_lunar_spectrum
+from .create_synthetic_spectra import SyntheticTruth
 from .normalize_image import normalize_image
 from .rgb_composite import rgb_composite
 
@@ -18,6 +19,7 @@ __all__ = [
     "linear_interpolation",
     "create_synthetic_spectral_cube",
     "create_synthetic_lunar_spectrum",
+    "SyntheticTruth",
     "normalize_image",
     "rgb_composite"
 ]
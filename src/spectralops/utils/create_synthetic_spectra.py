@@ -1,10 +1,13 @@
 # utils/create_synthetic_spectra.py
 
 # Standard Libraries
-# from typing import Union
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Union
 
 # External Imports
 import numpy as np
+from numpy.typing import DTypeLike
 # import matplotlib.pyplot as plt
 # import h5py as h5
 
@@ -76,30 +79,177 @@ def create_synthetic_lunar_spectrum(
     return wvl_arr, rfl_arr
 
 
-def create_synthetic_spectral_cube(
+@dataclass
+class SyntheticTruth:
+    """
+    Ground-truth absorption parameters of a synthetic spectral cube.
+
+    Attributes
+    ----------
+    center_1um: 2-D Array
+        Center wavelength of the 1 micron band for each pixel.
+    depth_1um: 2-D Array
+        Continuum-removed depth of the 1 micron band at its center.
+    center_2um: 2-D Array
+        Center wavelength of the 2 micron band for each pixel.
+    depth_2um: 2-D Array
+        Continuum-removed depth of the 2 micron band at its center.
+    noise_level: 2-D Array
+        Noise level (fraction of reflectance) of each pixel.
+    """
+    center_1um: np.ndarray
+    depth_1um: np.ndarray
+    center_2um: np.ndarray
+    depth_2um: np.ndarray
+    noise_level: np.ndarray
+
+
+def _draw_synthetic_parameters(
+    rng: np.random.Generator,
+    ncols: int,
+    nbands: int,
+    center_jitter: float
+) -> np.ndarray:
+    """
+    Draws the spectral parameters and unit noise for one row of a synthetic
+    cube. Returns a `(ncols, 7 + nbands)` array.
+    """
+    params = np.empty((ncols, 7 + nbands))
+    params[:, 0] = rng.uniform(0.06, 0.14, ncols)
+    params[:, 1] = params[:, 0] + rng.uniform(0.1, 0.2, ncols)
+    params[:, 2] = rng.uniform(0.01, 0.04, ncols)
+    params[:, 3] = rng.uniform(50, 100, ncols)
+    params[:, 4] = rng.uniform(0, 50, ncols)
+    params[:, 5:7] = rng.normal(0, 1, (ncols, 2)) * center_jitter
+    params[:, 7:] = rng.normal(0, 1, (ncols, nbands))
+    return params
+
+
+def _synthetic_tile(
     wvl_arr: np.ndarray,
-    cube_shape: tuple[int, int]
-):
+    params: np.ndarray,
+    band_width: float
+) -> tuple[np.ndarray, ...]:
     """
-    Creates an entire spectral cube with various characteristics.
+    Builds the spectra and ground truth for a tile of drawn parameters with
+    shape `(rows, cols, 7 + nbands)`.
     """
-    N = cube_shape[0] * cube_shape[1]
-    spec_arr = np.zeros((N, len(wvl_arr)))
-    rng = np.random.default_rng()
+    shortwvl, longwvl, noise_level, area_1um, area_2um, jitter_1um, \
+        jitter_2um = np.moveaxis(params[..., :7], -1, 0)
+    noise = params[..., 7:]
+
+    center_1um = 1000 + jitter_1um
+    center_2um = 2000 + jitter_2um
+
+    frac = (wvl_arr - wvl_arr.min()) / (wvl_arr.max() - wvl_arr.min())
+    continuum = shortwvl[..., None] + (longwvl - shortwvl)[..., None] * frac
+
+    contrem = 1 -\
+        gaussian(wvl_arr, center_1um[..., None], band_width) *\
+        area_1um[..., None] -\
+        gaussian(wvl_arr, center_2um[..., None], band_width) *\
+        area_2um[..., None]
 
-    for i in range(N):
-        print(f'\r{i+1} of {N} ({i/N:.2%})', end="")
-        shortwvl = rng.uniform(0.06, 0.14)
-        spec_config = {
-            "wvl_arr": wvl_arr,
-            "short_wvl_rfl": shortwvl,
-            "long_wvl_rfl": shortwvl + rng.uniform(0.1, 0.2),
-            "noise_level": rng.uniform(0.01, 0.04),
-            "depth_1um": rng.uniform(50, 100),
-            "depth_2um": rng.uniform(0, 50)
-        }
-        _, spec_arr[i, :] = create_synthetic_lunar_spectrum(**spec_config)
-
-    spec_arr = np.reshape(spec_arr, (*cube_shape, len(wvl_arr)))
+    # Depth at each band center, including the wing of the other band.
+    depth_1um = area_1um * gaussian(center_1um, center_1um, band_width) +\
+        area_2um * gaussian(center_1um, center_2um, band_width)
+    depth_2um = area_2um * gaussian(center_2um, center_2um, band_width) +\
+        area_1um * gaussian(center_2um, center_1um, band_width)
+
+    spectra = continuum * contrem * (1 + noise * noise_level[..., None])
+
+    return spectra, center_1um, depth_1um, center_2um, depth_2um, noise_level
+
+
+def create_synthetic_spectral_cube(
+    wvl_arr: np.ndarray,
+    cube_shape: tuple[int, int],
+    seed: Optional[int] = None,
+    tile_rows: int = 64,
+    out_path: Union[None, str, Path] = None,
+    dtype: DTypeLike = np.float64,
+    return_truth: bool = False,
+    band_width: float = 200,
+    center_jitter: float = 0
+) -> Union[np.ndarray, tuple[np.ndarray, SyntheticTruth]]:
+    """
+    Creates an entire spectral cube of synthetic lunar spectra with a 1 and
+    2 micron absorption band.
+
+    Spectra are generated a tile of rows at a time. Every row draws from its
+    own random stream derived from `seed`, so the cube is reproducible and
+    does not depend on `tile_rows`.
+
+    Parameters
+    ----------
+    wvl_arr: np.ndarray
+        Wavelength values (in nm) of the spectral bands.
+    cube_shape: tuple[int, int]
+        Spatial shape of the cube.
+    seed: int, optional
+        Random seed. If None (default), fresh entropy is used.
+    tile_rows: int, optional
+        Number of rows generated at once. Default is 64.
+    out_path: str or Path, optional
+        If specified, the cube is streamed into a memory-mapped `.npy` file
+        at this path and the memory map is returned.
+    dtype: data-type, optional
+        Data type of the cube. Default is float64.
+    return_truth: bool, optional
+        If True, a `SyntheticTruth` with the band centers and depths of each
+        pixel is also returned. Default is False.
+    band_width: float, optional
+        Standard deviation (in nm) of the gaussian absorption bands. Default
+        is 200.
+    center_jitter: float, optional
+        Standard deviation (in nm) of the random shift applied to the band
+        centers at 1000 and 2000 nm. Default is 0.
+
+    Returns
+    -------
+    spec_arr: np.ndarray
+        Synthetic cube with shape `(*cube_shape, wvl_arr.size)`.
+    truth: SyntheticTruth
+        Only returned if `return_truth` is True.
+    """
+    xsize, ysize = cube_shape
+    shape = (xsize, ysize, wvl_arr.size)
+
+    if out_path is None:
+        spec_arr = np.empty(shape, dtype=dtype)
+    else:
+        spec_arr = np.lib.format.open_memmap(
+            out_path, mode="w+", dtype=dtype, shape=shape
+        )
+
+    truth = SyntheticTruth(
+        *[np.empty(cube_shape, dtype=np.float64) for _ in range(5)]
+    )
 
+    seed_seq = np.random.SeedSequence(seed)
+    params = np.empty((tile_rows, ysize, 7 + wvl_arr.size))
+    for row0 in range(0, xsize, tile_rows):
+        row1 = min(row0 + tile_rows, xsize)
+        for row in range(row0, row1):
+            rng = np.random.default_rng(
+                np.random.SeedSequence(seed_seq.entropy, spawn_key=(row,))
+            )
+            params[row - row0] = _draw_synthetic_parameters(
+                rng, ysize, wvl_arr.size, center_jitter
+            )
+
+        (
+            spec_arr[row0:row1],
+            truth.center_1um[row0:row1],
+            truth.depth_1um[row0:row1],
+            truth.center_2um[row0:row1],
+            truth.depth_2um[row0:row1],
+            truth.noise_level[row0:row1]
+        ) = _synthetic_tile(wvl_arr, params[:row1 - row0], band_width)
+
+    if isinstance(spec_arr, np.memmap):
+        spec_arr.flush()
+
+    if return_truth:
+        return spec_arr, truth
     return spec_arr